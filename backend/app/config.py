@@ -21,8 +21,53 @@ class Settings(BaseSettings):
     GMAIL_TOKEN_PATH: str = "token.json"
     GMAIL_POLL_INTERVAL: int = 120
     GMAIL_QUERY: str = "is:unread is:important"
+    GMAIL_SYNC_MODE: str = "history"  # "history" (incremental) or "query" (re-list every poll)
+    GMAIL_PROCESSED_RETENTION_DAYS: int = 90
+    GMAIL_PROCESSED_CAPACITY: int = 200_000  # Bloom filter sizing for the processed-id store
     DRY_RUN: bool = True
 
+    # Filesystem watcher: quiet time before an Inbox file is picked up, batch size,
+    # and parallel batches for the startup catch-up scan
+    FS_DEBOUNCE_SECONDS: float = 0.25
+    FS_BATCH_SIZE: int = 256
+    FS_CATCHUP_WORKERS: int = 4
+
+    # Vault index / frontmatter parse cache (entries)
+    PARSE_CACHE_SIZE: int = 16384
+
+    # Batch processing: "serial", "thread" or "process", and the worker limit
+    PROCESS_EXECUTOR: str = "thread"
+    PROCESS_WORKERS: int = 8
+
+    # Background jobs: concurrent jobs, and finished jobs kept for polling
+    JOB_WORKERS: int = 2
+    JOB_HISTORY_SIZE: int = 100
+
+    # Thread pools for blocking vault I/O behind the async route handlers
+    IO_READ_WORKERS: int = 16
+    IO_WRITE_WORKERS: int = 4
+
+    # fsync vault writes and journal records before renaming (crash-safe against power loss, slower)
+    VAULT_FSYNC: bool = False
+
+    # Mirror vault metadata into SQLite (.state/metadata.db) and answer list/dashboard queries from it
+    METADATA_STORE: bool = False
+
+    # Full-text search index (.state/search) behind GET /api/search
+    SEARCH_INDEX: bool = True
+
+    # Archival: Done/Plans/Approved/Rejected items older than this go into monthly packs under Archive/
+    ARCHIVE_AFTER_DAYS: int = 30
+
+    # Responses at least this large are gzip/brotli-compressed for clients that accept it
+    COMPRESS_MIN_BYTES: int = 1024
+
+    # Bulk email simulation: writer threads, largest batch, and largest batch answered inline
+    # (bigger ones must run with ?background=true)
+    SIMULATOR_WRITERS: int = 8
+    SIMULATOR_MAX_BATCH: int = 100_000
+    SIMULATOR_SYNC_BATCH: int = 10_000
+
     # CORS
     CORS_ORIGINS: str = '["http://localhost:3000"]'
 
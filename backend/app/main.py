@@ -3,11 +3,16 @@ import json
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 from app.config import settings
-from app.routers import vault, needs_action, approvals, dashboard, handbook, simulate
+from app.routers import vault, needs_action, approvals, dashboard, handbook, simulate, jobs, watchers, search
+from app.services import events, io_executor, metadata_store, metrics, search_index, vault_journal
+from app.services.job_queue import jobs as job_queue
+from app.services.serialization import GZIP_LEVEL, FastJSONResponse
 
 logging.basicConfig(
     level=logging.INFO,
@@ -19,13 +24,30 @@ logger = logging.getLogger("app")
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Start background watchers on startup, cancel on shutdown."""
+    """Start background watchers and job workers on startup, cancel on shutdown."""
     tasks: list[asyncio.Task] = []
 
+    # Finish or roll back vault transitions interrupted by the last shutdown, before anything writes
+    await io_executor.run_write(vault_journal.recover)
+    # Open and reconcile the metadata store (when enabled) before the first query needs it
+    await io_executor.run_write(metadata_store.get_store)
+    # Load and reconcile the search index in the background; the first search waits for it
+    asyncio.get_running_loop().run_in_executor(None, search_index.get_search_index)
+
+    # Background job workers (process-all, batch simulation, dashboard refresh)
+    tasks.append(asyncio.create_task(job_queue.run(settings.JOB_WORKERS)))
+    logger.info("Job queue started (%d workers)", settings.JOB_WORKERS)
+
     # Filesystem watcher — always starts
     from watchers.filesystem_watcher import run_filesystem_watcher_async
     fs_task = asyncio.create_task(
-        run_filesystem_watcher_async(settings.vault_dir, dry_run=settings.DRY_RUN)
+        run_filesystem_watcher_async(
+            settings.vault_dir,
+            dry_run=settings.DRY_RUN,
+            debounce=settings.FS_DEBOUNCE_SECONDS,
+            batch_size=settings.FS_BATCH_SIZE,
+            catch_up_workers=settings.FS_CATCHUP_WORKERS,
+        )
     )
     tasks.append(fs_task)
     logger.info("Filesystem watcher started (vault/Inbox/)")
@@ -41,6 +63,9 @@ async def lifespan(app: FastAPI):
                 poll_interval=settings.GMAIL_POLL_INTERVAL,
                 query=settings.GMAIL_QUERY,
                 dry_run=settings.DRY_RUN,
+                sync_mode=settings.GMAIL_SYNC_MODE,
+                processed_retention_days=settings.GMAIL_PROCESSED_RETENTION_DAYS,
+                processed_capacity=settings.GMAIL_PROCESSED_CAPACITY,
             )
         )
         tasks.append(gmail_task)
@@ -58,10 +83,13 @@ async def lifespan(app: FastAPI):
     for t in tasks:
         t.cancel()
     await asyncio.gather(*tasks, return_exceptions=True)
+    io_executor.shutdown()
+    metadata_store.shutdown()
+    search_index.shutdown()
     logger.info("Background watchers stopped")
 
 
-app = FastAPI(title="AI Employee Dashboard API", lifespan=lifespan)
+app = FastAPI(title="AI Employee Dashboard API", lifespan=lifespan, default_response_class=FastJSONResponse)
 
 # Parse CORS origins from settings (JSON string -> list)
 try:
@@ -75,7 +103,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+# Compresses everything else; the cached read endpoints set Content-Encoding themselves
+# (brotli when available) and pass through untouched, as does the event stream.
+app.add_middleware(GZipMiddleware, minimum_size=settings.COMPRESS_MIN_BYTES, compresslevel=GZIP_LEVEL)
+# Outermost, so request latency includes compression and CORS handling
+app.add_middleware(metrics.MetricsMiddleware)
 
 app.include_router(vault.router)
 app.include_router(needs_action.router)
@@ -83,8 +117,31 @@ app.include_router(approvals.router)
 app.include_router(dashboard.router)
 app.include_router(handbook.router)
 app.include_router(simulate.router)
+app.include_router(jobs.router)
+app.include_router(watchers.router)
+app.include_router(search.router)
 
 
 @app.get("/api/health")
-def health():
+async def health():
     return {"status": "ok"}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint: request latencies, processing, watcher and vault I/O metrics."""
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
+@app.get("/api/events")
+async def event_stream(request: Request):
+    """Server-Sent Events stream of vault changes (items, approvals, dashboard deltas)."""
+    last_event_id = request.headers.get("last-event-id")
+    return StreamingResponse(
+        events.stream(
+            request.is_disconnected,
+            int(last_event_id) if last_event_id and last_event_id.isdigit() else None,
+        ),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
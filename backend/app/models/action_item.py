@@ -16,3 +16,8 @@ class ActionItem(BaseModel):
 class ProcessResult(BaseModel):
     processed: int
     actions: list[str]
+    failed: int = 0
+    mode: str = "serial"
+    workers: int = 1
+    duration_ms: float = 0.0
+    items_per_second: float = 0.0
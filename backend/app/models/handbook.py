@@ -15,3 +15,15 @@ class HandbookData(BaseModel):
 
 class HandbookUpdate(BaseModel):
     content: str
+
+
+class ApprovalThresholdInfo(BaseModel):
+    type: str
+    amount: float
+    inclusive: bool
+
+
+class HandbookRulesInfo(BaseModel):
+    source: str  # "handbook" or "defaults"
+    approval_thresholds: list[ApprovalThresholdInfo]
+    keyword_categories: dict[str, list[str]]
@@ -0,0 +1,21 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class JobProgress(BaseModel):
+    done: int = 0
+    total: int = 0
+    failed: int = 0
+
+
+class Job(BaseModel):
+    id: str
+    kind: str
+    status: str  # "queued", "running", "succeeded", "failed" or "cancelled"
+    progress: JobProgress
+    created: str
+    started: str | None = None
+    finished: str | None = None
+    result: Any = None
+    error: str | None = None
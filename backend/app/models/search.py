@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    folder: str
+    filename: str
+    id: str
+    type: str
+    subject: str
+    sender: str
+    date: str
+    score: float
+    snippet: str = ""
+    archived: bool = False
+    month: str | None = None  # archive pack month (YYYY-MM) of an archived item
+
+
+class SearchResult(BaseModel):
+    query: str
+    total: int
+    hits: list[SearchHit]
+    took_ms: float
+
+
+class SearchStats(BaseModel):
+    enabled: bool
+    documents: int = 0
+    segments: int = 0
+    live_documents: int = 0
+    deleted: int = 0
+    pending: int = 0
+    size_bytes: int = 0
@@ -0,0 +1,11 @@
+from pydantic import BaseModel
+
+
+class BulkSimulationResult(BaseModel):
+    message: str
+    count: int  # files written
+    skipped: int = 0  # files that already existed (same seed as an earlier run)
+    files: list[str]  # the first filenames generated, not all of them
+    seed: int
+    duration_ms: float
+    items_per_second: float
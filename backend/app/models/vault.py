@@ -4,6 +4,7 @@ from pydantic import BaseModel
 class FolderStatus(BaseModel):
     name: str
     count: int
+    archived: int = 0  # of count, items rolled into Archive/ packs
 
 
 class CoreFileStatus(BaseModel):
@@ -17,6 +18,35 @@ class VaultStatus(BaseModel):
     core_files: list[CoreFileStatus]
 
 
+class MetadataStoreStatus(BaseModel):
+    enabled: bool
+    path: str
+    journal_mode: str | None = None
+    items: int = 0
+    folders: dict[str, int] = {}
+
+
+class ArchivePack(BaseModel):
+    folder: str
+    month: str
+    items: int
+    bytes: int
+
+
+class ArchiveStatus(BaseModel):
+    after_days: int
+    items: int
+    bytes: int
+    packs: list[ArchivePack]
+
+
+class ArchiveResult(BaseModel):
+    message: str
+    archived: int
+    packs: int
+    duration_ms: float
+
+
 class VaultInitRequest(BaseModel):
     owner: str = "AI Employee"
     business: str = "My Business"
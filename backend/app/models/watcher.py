@@ -0,0 +1,42 @@
+from pydantic import BaseModel
+
+
+class IntakeLatency(BaseModel):
+    p50: float = 0.0
+    p95: float = 0.0
+    p99: float = 0.0
+    max: float = 0.0
+
+
+class IntakeMetrics(BaseModel):
+    files: int = 0
+    batches: int = 0
+    files_per_second: float = 0.0
+    latency_ms: IntakeLatency = IntakeLatency()
+    events: int = 0
+    coalesced: int = 0
+    pending: int = 0
+
+
+class CatchUpStatus(BaseModel):
+    state: str  # "idle", "scanning", "running", "done" or "failed"
+    inbox_files: int = 0
+    gap: int = 0
+    processed: int = 0
+    created: int = 0
+    started: str | None = None
+    finished: str | None = None
+    duration_ms: float = 0.0
+    error: str | None = None
+
+
+class FilesystemWatcherStatus(BaseModel):
+    running: bool
+    dry_run: bool
+    inbox: str
+    intake: IntakeMetrics
+    catch_up: CatchUpStatus
+
+
+class WatchersStatus(BaseModel):
+    filesystem: FilesystemWatcherStatus
@@ -1,108 +1,160 @@
-import shutil
-from pathlib import Path
+import time
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 
 from app.config import settings
 from app.models.approval import Approval
-from app.services.file_processor import _parse_frontmatter, _get_body
+from app.services import events, io_executor, listing, metrics
+from app.services.vault_index import IndexEntry, get_index
+from app.services.vault_journal import Transition, TransitionConflict
 
 router = APIRouter(prefix="/api/approvals", tags=["approvals"])
 
 
-def _read_approvals() -> list[Approval]:
-    """Read all approval files from Pending_Approval folder."""
-    approval_dir = settings.vault_dir / "Pending_Approval"
-    if not approval_dir.exists():
-        return []
-
-    approvals: list[Approval] = []
-    for filepath in sorted(approval_dir.glob("*.md")):
-        text = filepath.read_text(encoding="utf-8")
-        meta = _parse_frontmatter(text)
-
-        approval = Approval(
-            id=meta.get("id", filepath.stem),
-            filename=filepath.name,
-            action=meta.get("action", "review_and_respond"),
-            source_file=meta.get("source_file", ""),
-            created=meta.get("created", ""),
-            expires=meta.get("expires", "24h"),
-            status=meta.get("status", "pending"),
-            priority=meta.get("priority", "normal"),
-            subject=meta.get("subject", filepath.stem),
-            reason=meta.get("reason", ""),
-        )
-        approvals.append(approval)
+def _entry_to_approval(entry: IndexEntry) -> Approval:
+    """Build an Approval from an indexed Pending_Approval file."""
+    meta = entry.meta
+    return Approval(
+        id=meta.get("id", entry.stem),
+        filename=entry.name,
+        action=meta.get("action", "review_and_respond"),
+        source_file=meta.get("source_file", ""),
+        created=meta.get("created", ""),
+        expires=meta.get("expires", "24h"),
+        status=meta.get("status", "pending"),
+        priority=meta.get("priority", "normal"),
+        subject=meta.get("subject", entry.stem),
+        reason=meta.get("reason", ""),
+    )
+
+
+events.register_folder("Pending_Approval", "approval", _entry_to_approval)
+
+
+def _approval_sort_key(entry: IndexEntry) -> tuple:
+    # Filename order
+    return ()
 
-    return approvals
+
+APPROVALS = listing.Listing(
+    folder="Pending_Approval",
+    model=Approval,
+    to_model=_entry_to_approval,
+    sort_key=_approval_sort_key,
+    attrs={
+        "priority": lambda e: e.meta.get("priority", "normal"),
+        "type": lambda e: e.meta.get("action", "review_and_respond"),
+        "sender": lambda e: e.meta.get("from", ""),
+        "date": lambda e: e.meta.get("created", ""),
+    },
+)
+
+
+# HTTP status raised by _decide -> approvals_total outcome label
+_OUTCOMES = {404: "not_found", 409: "conflict"}
 
 
 def _move_approval(approval_id: str, destination: str) -> str:
-    """Move an approval file to Approved or Rejected folder."""
-    approval_dir = settings.vault_dir / "Pending_Approval"
-    dest_dir = settings.vault_dir / destination
-    dest_dir.mkdir(parents=True, exist_ok=True)
-
-    # Find the file by id
-    target_file: Path | None = None
-    if approval_dir.exists():
-        for filepath in approval_dir.glob("*.md"):
-            text = filepath.read_text(encoding="utf-8")
-            meta = _parse_frontmatter(text)
-            if meta.get("id") == approval_id:
-                target_file = filepath
-                break
-
-    if target_file is None:
-        # Try matching by filename pattern
-        pattern_file = approval_dir / f"APPROVAL_{approval_id}.md"
-        if pattern_file.exists():
-            target_file = pattern_file
-
-    if target_file is None:
+    """Move an approval file to Approved or Rejected folder, together with its source item.
+
+    Both moves are one journaled transition claimed on the approval, so a crash
+    cannot leave one without the other and a concurrent approve/reject gets 409.
+    """
+    decision = destination.lower()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        filename = _decide(approval_id, destination)
+        outcome = "ok"
+        return filename
+    except HTTPException as e:
+        outcome = _OUTCOMES.get(e.status_code, "error")
+        raise
+    finally:
+        metrics.APPROVALS.labels(decision, outcome).inc()
+        metrics.APPROVAL_SECONDS.labels(decision).observe(time.perf_counter() - start)
+
+
+def _decide(approval_id: str, destination: str) -> str:
+    index = get_index()
+    vault = settings.vault_dir
+
+    # Find the file by id (frontmatter id, or the APPROVAL_{id}.md filename)
+    target = index.find_by_id("Pending_Approval", approval_id)
+    if target is None:
         raise HTTPException(status_code=404, detail=f"Approval {approval_id} not found")
 
     # Also move the source file from In_Progress to Done (if approving) or back to Needs_Action (if rejecting)
-    text = target_file.read_text(encoding="utf-8")
-    meta = _parse_frontmatter(text)
-    source_filename = meta.get("source_file", "")
-
-    # Move approval file
-    shutil.move(str(target_file), str(dest_dir / target_file.name))
-
-    # Move source file if it exists in In_Progress
-    if source_filename:
-        in_progress_dir = settings.vault_dir / "In_Progress"
-        source_path = in_progress_dir / source_filename
-        if source_path.exists():
-            if destination == "Approved":
-                done_dir = settings.vault_dir / "Done"
-                done_dir.mkdir(parents=True, exist_ok=True)
-                shutil.move(str(source_path), str(done_dir / source_filename))
-            elif destination == "Rejected":
-                needs_action_dir = settings.vault_dir / "Needs_Action"
-                needs_action_dir.mkdir(parents=True, exist_ok=True)
-                shutil.move(str(source_path), str(needs_action_dir / source_filename))
-
+    source_filename = target.meta.get("source_file", "")
+    if not source_filename:
+        source = index.find_by_id("In_Progress", target.meta.get("id", approval_id))
+        source_filename = source.name if source else ""
+    target_file = vault / "Pending_Approval" / target.name
+
+    try:
+        with Transition(f"approval_{destination.lower()}", f"Pending_Approval/{target.name}") as tx:
+            if not target_file.exists():
+                # Decided by another request between the lookup and the claim.
+                raise HTTPException(status_code=404, detail=f"Approval {approval_id} not found")
+            tx.move(target_file, vault / destination / target_file.name)
+
+            # Move source file if it exists in In_Progress
+            source_path = vault / "In_Progress" / source_filename
+            arrived = None
+            if source_filename and source_path.exists():
+                if destination == "Approved":
+                    arrived = source_path.stat().st_mtime  # renames keep it: the arrival in Needs_Action
+                    tx.move(source_path, vault / "Done" / source_filename)
+                elif destination == "Rejected":
+                    tx.move(source_path, vault / "Needs_Action" / source_filename)
+            tx.commit()
+        if arrived is not None:
+            metrics.PIPELINE_LAG.labels("approval").observe(time.time() - arrived)
+    except TransitionConflict:
+        raise HTTPException(status_code=409, detail=f"Approval {approval_id} is already being decided")
+
+    events.publish(
+        f"approval_{destination.lower()}",
+        id=approval_id, filename=target_file.name, source_file=source_filename,
+    )
     return target_file.name
 
 
 @router.get("", response_model=list[Approval])
-def list_approvals():
-    """List all pending approval requests."""
-    return _read_approvals()
+async def list_approvals(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=listing.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    priority: str | None = None,
+    type: str | None = None,
+    sender: str | None = None,
+    since: str | None = None,
+    fields: str | None = None,
+):
+    """List pending approval requests, in filename order.
+
+    Takes the same paging and filter parameters as GET /api/needs-action; here
+    type matches the approval's action, sender the original item's sender and
+    since its created time.
+    """
+    try:
+        return await listing.query_page_cached(
+            request, APPROVALS, fields,
+            limit=limit, cursor=cursor, priority=priority, type=type, sender=sender, since=since,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/{approval_id}/approve")
-def approve_item(approval_id: str):
+async def approve_item(approval_id: str):
     """Approve a pending item - moves it to Approved folder."""
-    filename = _move_approval(approval_id, "Approved")
+    filename = await io_executor.run_write(_move_approval, approval_id, "Approved")
     return {"message": f"Approved: {filename}. Source file moved to Done."}
 
 
 @router.post("/{approval_id}/reject")
-def reject_item(approval_id: str):
+async def reject_item(approval_id: str):
     """Reject a pending item - moves it to Rejected folder."""
-    filename = _move_approval(approval_id, "Rejected")
+    filename = await io_executor.run_write(_move_approval, approval_id, "Rejected")
     return {"message": f"Rejected: {filename}. Source file returned to Needs_Action."}
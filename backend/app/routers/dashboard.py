@@ -1,22 +1,28 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
 from app.models.dashboard import DashboardMetrics
-from app.services import dashboard_service
+from app.routers.jobs import start_job
+from app.services import dashboard_service, response_cache
 
 router = APIRouter(prefix="/api/dashboard", tags=["dashboard"])
 
 
 @router.get("", response_model=DashboardMetrics)
-def get_dashboard():
-    """Get current dashboard metrics computed from vault state."""
-    return dashboard_service.get_metrics()
+async def get_dashboard(request: Request):
+    """Get current dashboard metrics computed from vault state (conditional: ETag / If-None-Match)."""
+    return await response_cache.conditional(request, dashboard_service.metrics_version, dashboard_service.metrics_payload)
 
 
 @router.post("/refresh")
-def refresh_dashboard():
-    """Refresh the Dashboard.md file in the vault with current metrics."""
+async def refresh_dashboard(background: bool = False):
+    """Refresh the Dashboard.md file in the vault with current metrics.
+
+    With ?background=true, returns 202 and a job to poll at /api/jobs/{id}.
+    """
+    if background:
+        return start_job("refresh_dashboard", lambda job: {"message": dashboard_service.refresh_dashboard()})
     try:
-        message = dashboard_service.refresh_dashboard()
+        message = await dashboard_service.refresh_dashboard_async()
         return {"message": message}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,7 +1,15 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 
 from app.config import settings
-from app.models.handbook import HandbookData, HandbookUpdate, SectionValidation
+from app.models.handbook import (
+    ApprovalThresholdInfo,
+    HandbookData,
+    HandbookRulesInfo,
+    HandbookUpdate,
+    SectionValidation,
+)
+from app.services import handbook_rules, io_executor, response_cache
+from app.services.vault_journal import atomic_write
 
 router = APIRouter(prefix="/api/handbook", tags=["handbook"])
 
@@ -45,36 +53,67 @@ def _read_handbook() -> str:
     return handbook_path.read_text(encoding="utf-8")
 
 
-@router.get("", response_model=HandbookData)
-def get_handbook():
-    """Get the handbook content with validation status."""
+def _write_handbook(content: str) -> bool:
+    """Write Company_Handbook.md. Returns False if the vault does not exist."""
+    handbook_path = settings.vault_dir / "Company_Handbook.md"
+    if not handbook_path.parent.exists():
+        return False
+    atomic_write(handbook_path, content)
+    handbook_rules.invalidate()
+    return True
+
+
+def _rules_info() -> HandbookRulesInfo:
+    rules = handbook_rules.get_rules()
+    return HandbookRulesInfo(
+        source=rules.source,
+        approval_thresholds=[
+            ApprovalThresholdInfo(type=item_type, amount=t.amount, inclusive=t.inclusive)
+            for item_type, t in sorted(rules.approval_thresholds.items())
+        ],
+        keyword_categories={name: list(kws) for name, kws in rules.keyword_categories.items()},
+    )
+
+
+def _handbook_data() -> response_cache.Payload:
     content = _read_handbook()
     if not content:
         raise HTTPException(status_code=404, detail="Company_Handbook.md not found. Initialize the vault first.")
 
     validations, is_complete = _validate_content(content)
-    return HandbookData(
+    return response_cache.Payload(HandbookData(
         content=content,
         validation=validations,
         is_complete=is_complete,
+    ))
+
+
+@router.get("", response_model=HandbookData)
+async def get_handbook(request: Request):
+    """Get the handbook content with validation status."""
+    return await response_cache.conditional(
+        request, lambda: response_cache.file_version(settings.vault_dir / "Company_Handbook.md"), _handbook_data,
     )
 
 
 @router.put("")
-def update_handbook(update: HandbookUpdate):
+async def update_handbook(update: HandbookUpdate):
     """Update the Company_Handbook.md file."""
-    handbook_path = settings.vault_dir / "Company_Handbook.md"
-    if not handbook_path.parent.exists():
+    if not await io_executor.run_write(_write_handbook, update.content):
         raise HTTPException(status_code=404, detail="Vault not initialized. Run vault init first.")
-
-    handbook_path.write_text(update.content, encoding="utf-8")
     return {"message": "Handbook updated successfully."}
 
 
+@router.get("/rules", response_model=HandbookRulesInfo)
+async def get_handbook_rules():
+    """Return the routing rules compiled from the handbook (or the defaults if there is none)."""
+    return await io_executor.run_read(_rules_info)
+
+
 @router.post("/validate", response_model=HandbookData)
-def validate_handbook():
+async def validate_handbook():
     """Validate the current handbook against required sections."""
-    content = _read_handbook()
+    content = await io_executor.run_read(_read_handbook)
     if not content:
         raise HTTPException(status_code=404, detail="Company_Handbook.md not found. Initialize the vault first.")
 
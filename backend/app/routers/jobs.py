@@ -0,0 +1,46 @@
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse
+
+from app.models.job import Job
+from app.services.job_queue import FINISHED_STATUSES, JobFn, jobs
+
+router = APIRouter(prefix="/api/jobs", tags=["jobs"])
+
+
+def start_job(kind: str, fn: JobFn) -> JSONResponse:
+    """Queue fn as a background job and answer 202 Accepted with the job to poll."""
+    try:
+        job = jobs.submit(kind, fn)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return JSONResponse(
+        status_code=202,
+        content=job.model_dump(),
+        headers={"Location": f"/api/jobs/{job.id}"},
+    )
+
+
+@router.get("", response_model=list[Job])
+async def list_jobs():
+    """List retained jobs, newest first."""
+    return jobs.list()
+
+
+@router.get("/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    """Get a job's status, progress and (once finished) result."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    return job
+
+
+@router.post("/{job_id}/cancel", response_model=Job)
+async def cancel_job(job_id: str):
+    """Cancel a queued job, or ask a running job to stop after its current item."""
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job not found: {job_id}")
+    if job.status in FINISHED_STATUSES:
+        raise HTTPException(status_code=409, detail=f"Job already {job.status}")
+    return jobs.cancel(job_id)
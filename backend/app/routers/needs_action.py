@@ -1,32 +1,64 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
 
 from app.models.action_item import ActionItem, ProcessResult
-from app.services import file_processor
+from app.routers.jobs import start_job
+from app.services import file_processor, listing
 
 router = APIRouter(prefix="/api/needs-action", tags=["needs-action"])
 
 
 class ProcessRequest(BaseModel):
-    filename: str
+    filename: str = ""
+    id: str = ""
 
 
 @router.get("", response_model=list[ActionItem])
-def list_action_items():
-    """List all items in Needs_Action folder, sorted by priority."""
-    return file_processor.get_action_items()
+async def list_action_items(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=listing.MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    priority: str | None = None,
+    type: str | None = None,
+    sender: str | None = None,
+    since: str | None = None,
+    fields: str | None = None,
+):
+    """List items in Needs_Action folder, sorted by priority.
+
+    Without limit, returns every matching item. With limit, the cursor for the
+    next page (if any) is returned in the X-Next-Cursor header. priority/type
+    take comma-separated values, sender matches a substring, since an ISO date,
+    and fields selects which item fields to return.
+    """
+    try:
+        return await listing.query_page_cached(
+            request, file_processor.ACTION_ITEMS, fields,
+            limit=limit, cursor=cursor, priority=priority, type=type, sender=sender, since=since,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/process")
-def process_single(request: ProcessRequest):
-    """Process a single item from Needs_Action."""
-    result = file_processor.process_item(request.filename)
+async def process_single(request: ProcessRequest):
+    """Process a single item from Needs_Action, by filename or item id."""
+    if not (request.filename or request.id):
+        raise HTTPException(status_code=422, detail="Provide a filename or an id")
+    result = await file_processor.process_item_async(request.filename or request.id)
     if result.startswith("File not found"):
         raise HTTPException(status_code=404, detail=result)
+    if result.startswith("Already being processed"):
+        raise HTTPException(status_code=409, detail=result)
     return {"action": result}
 
 
 @router.post("/process-all", response_model=ProcessResult)
-def process_all_items():
-    """Process all items currently in Needs_Action."""
-    return file_processor.process_all()
+async def process_all_items(background: bool = False):
+    """Process all items currently in Needs_Action.
+
+    With ?background=true, returns 202 and a job to poll at /api/jobs/{id}.
+    """
+    if background:
+        return start_job("process_all", lambda job: file_processor.process_all(job=job))
+    return await file_processor.process_all_async()
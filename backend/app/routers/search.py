@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from app.models.search import SearchResult, SearchStats
+from app.services import io_executor, search_index
+
+router = APIRouter(prefix="/api/search", tags=["search"])
+
+
+@router.get("", response_model=SearchResult)
+async def search(
+    q: str,
+    folder: str | None = None,
+    type: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = Query(20, ge=1, le=search_index.MAX_RESULTS),
+):
+    """Full-text search over subject, sender and body of every vault folder, ranked by BM25.
+
+    Terms are ANDed; "invoic*" matches a prefix, subject:x / from:x match one field,
+    and folder:, type:, after: and before: filter inline. folder/type take
+    comma-separated values, since/until ISO dates.
+    """
+    try:
+        return await io_executor.run_read(
+            search_index.search, q, folder=folder, type=type, since=since, until=until, limit=limit,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.get("/stats", response_model=SearchStats)
+async def search_stats():
+    """Documents, segments and on-disk size of the search index."""
+    return await io_executor.run_read(search_index.status)
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
+from app.config import settings
+from app.routers.jobs import start_job
 from app.services import email_simulator
 
 router = APIRouter(prefix="/api/simulate", tags=["simulate"])
@@ -15,14 +17,16 @@ class EmailRequest(BaseModel):
 
 
 class BatchRequest(BaseModel):
-    count: int = 5
+    count: int = Field(5, ge=1, le=settings.SIMULATOR_MAX_BATCH)
+    seed: int | None = None  # reproducible templates and variables
+    bulk: bool = False  # precompiled templates + pooled writer, for load testing
 
 
 @router.post("/email")
-def simulate_single_email(request: EmailRequest):
+async def simulate_single_email(request: EmailRequest):
     """Simulate a single incoming email by writing it to Needs_Action."""
     try:
-        message, filename = email_simulator.simulate_email(
+        message, filename = await email_simulator.simulate_email_async(
             sender=request.sender,
             subject=request.subject,
             body=request.body,
@@ -34,11 +38,37 @@ def simulate_single_email(request: EmailRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _batch_job(request: BatchRequest):
+    def run(job):
+        if request.bulk:
+            return email_simulator.simulate_bulk(request.count, request.seed, job=job).model_dump()
+        message, count_written, files = email_simulator.simulate_batch(
+            count=request.count, job=job, seed=request.seed,
+        )
+        return {"message": message, "count": count_written, "files": files}
+    return run
+
+
 @router.post("/batch")
-def simulate_batch_emails(request: BatchRequest):
-    """Generate a batch of random realistic simulated emails."""
+async def simulate_batch_emails(request: BatchRequest, background: bool = False):
+    """Generate a batch of random realistic simulated emails.
+
+    With "bulk": true, templates are precompiled and files written by a pooled
+    writer (100k+ emails a minute); the response lists only the first filenames
+    plus the seed and throughput. With ?background=true, returns 202 and a job
+    to poll at /api/jobs/{id}; batches above SIMULATOR_SYNC_BATCH must run that way.
+    """
+    if background:
+        return start_job("simulate_batch", _batch_job(request))
+    if request.count > settings.SIMULATOR_SYNC_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batches above {settings.SIMULATOR_SYNC_BATCH} emails must run with ?background=true",
+        )
     try:
-        message, count, files = email_simulator.simulate_batch(count=request.count)
+        if request.bulk:
+            return await email_simulator.simulate_bulk_async(request.count, request.seed)
+        message, count, files = await email_simulator.simulate_batch_async(count=request.count, seed=request.seed)
         return {"message": message, "count": count, "files": files}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
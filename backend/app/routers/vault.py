@@ -1,22 +1,90 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 
-from app.models.vault import VaultStatus, VaultInitRequest
-from app.services import vault_service
+from app.config import settings
+from app.models.vault import ArchiveResult, ArchiveStatus, MetadataStoreStatus, VaultStatus, VaultInitRequest
+from app.routers.jobs import start_job
+from app.services import archive, io_executor, metadata_store, response_cache, vault_service
 
 router = APIRouter(prefix="/api/vault", tags=["vault"])
 
 
 @router.get("/status", response_model=VaultStatus)
-def vault_status():
+async def vault_status(request: Request):
     """Return the current vault status including folder counts and core file existence."""
-    return vault_service.get_vault_status()
+    return await response_cache.conditional(
+        request, vault_service.status_version, lambda: response_cache.Payload(vault_service.get_vault_status()),
+    )
 
 
 @router.post("/init")
-def vault_init(request: VaultInitRequest):
+async def vault_init(request: VaultInitRequest):
     """Initialize the vault with all folders and core template files."""
     try:
-        message = vault_service.init_vault(owner=request.owner, business=request.business)
+        message = await vault_service.init_vault_async(owner=request.owner, business=request.business)
         return {"message": message}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/metadata", response_model=MetadataStoreStatus)
+async def metadata_status():
+    """Report whether the SQLite metadata store is enabled, and its row counts per folder."""
+    return await io_executor.run_read(metadata_store.status)
+
+
+@router.post("/metadata/rebuild")
+async def rebuild_metadata(background: bool = False):
+    """Recreate the metadata store from the vault's Markdown files.
+
+    With ?background=true, returns 202 and a job to poll at /api/jobs/{id}.
+    """
+    if not settings.METADATA_STORE:
+        raise HTTPException(status_code=409, detail="Metadata store is disabled (set METADATA_STORE=true)")
+    if background:
+        return start_job("rebuild_metadata", lambda job: {"message": metadata_store.rebuild(job)})
+    return {"message": await io_executor.run_write(metadata_store.rebuild)}
+
+
+@router.get("/archive", response_model=ArchiveStatus)
+async def archive_status():
+    """List the archive packs (one per folder and month) with their item counts and sizes."""
+    return await io_executor.run_read(archive.status)
+
+
+@router.post("/archive", response_model=ArchiveResult)
+async def archive_old_items(older_than_days: int | None = Query(None, ge=1), background: bool = False):
+    """Move Done/Plans/Approved/Rejected items older than N days (default ARCHIVE_AFTER_DAYS) into packs.
+
+    With ?background=true, returns 202 and a job to poll at /api/jobs/{id}.
+    """
+    if background:
+        return start_job("archive", lambda job: archive.archive(older_than_days, job).model_dump())
+    return await io_executor.run_write(archive.archive, older_than_days)
+
+
+@router.get("/archive/{folder}/{filename}")
+async def archived_item(folder: str, filename: str):
+    """Return the Markdown of an archived item (its most recent month when the name was archived more than once)."""
+    return await _archived_item(folder, filename)
+
+
+@router.get("/archive/{folder}/{month}/{filename}")
+async def archived_item_in_month(folder: str, month: str, filename: str):
+    """Return the Markdown of the item archived as `filename` in the folder's pack for `month` (YYYY-MM)."""
+    return await _archived_item(folder, filename, month)
+
+
+def _read_archived(folder: str, filename: str, month: str | None) -> tuple[str, str] | None:
+    # get_archive() loads every pack index on first use, so the lookup stays off the event loop too.
+    store = archive.get_archive()
+    item = store.get(folder, filename, month)
+    return (item.month, store.read(item)) if item is not None else None
+
+
+async def _archived_item(folder: str, filename: str, month: str | None = None) -> dict:
+    found = await io_executor.run_read(_read_archived, folder, filename, month)
+    if found is None:
+        where = f"{folder}/{month}/{filename}" if month else f"{folder}/{filename}"
+        raise HTTPException(status_code=404, detail=f"Not archived: {where}")
+    month, content = found
+    return {"folder": folder, "month": month, "filename": filename, "content": content}
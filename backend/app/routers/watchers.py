@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+
+from app.models.watcher import WatchersStatus
+
+router = APIRouter(prefix="/api/watchers", tags=["watchers"])
+
+
+@router.get("/status", response_model=WatchersStatus)
+async def watchers_status():
+    """Return intake metrics and startup catch-up progress of the filesystem watcher."""
+    from watchers import filesystem_watcher
+
+    return {"filesystem": filesystem_watcher.status.snapshot()}
@@ -0,0 +1,279 @@
+"""
+archive.py — Roll old items out of the append-only folders into monthly packs.
+
+Done/, Plans/, Approved/ and Rejected/ only ever grow. archive() moves items
+whose file is older than ARCHIVE_AFTER_DAYS into one pack per folder and
+month (by file mtime, UTC), so the hot folders stay small:
+
+    Archive/Done_2026-09.pack   the items' Markdown, one gzip member each
+                                (the whole pack is a valid .gz: zcat lists every item)
+    Archive/Done_2026-09.idx    JSON Lines offset index, one line per item:
+                                name, offset, length, mtime_ns, size, meta, snippet
+
+Items are keyed by (month, name): Inbox-derived names repeat, so a later item
+with the name of an archived one lands in its own month's pack beside it. A
+clash within one month (rare: the first item must already be archived) is
+stored as "<stem>~2.md", "~3", ...
+
+Members are appended to the pack, then the index is rewritten atomically,
+then the source files are deleted, so a crash at any point leaves each item
+either still in its folder or fully archived (an item found in both is
+simply deleted from its folder on the next run). Bytes appended by an
+interrupted run are never referenced and are harmless.
+
+Read paths include archived items: vault status counts add count(folder),
+and the search index keeps archived documents searchable (reading their
+content back with read()).
+"""
+
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.models.vault import ArchivePack, ArchiveResult, ArchiveStatus
+from app.services.job_queue import JobContext
+from app.services.vault_index import IndexEntry, get_index
+from app.services.vault_journal import atomic_write
+
+logger = logging.getLogger("archive")
+
+ARCHIVE_DIR = "Archive"
+ARCHIVE_FOLDERS = ("Done", "Plans", "Approved", "Rejected")
+META_KEYS = ("id", "type", "subject", "from", "sender", "received", "created", "source_file", "status")
+
+
+@dataclass(slots=True)
+class ArchivedItem:
+    folder: str
+    name: str
+    month: str
+    offset: int
+    length: int
+    mtime_ns: int
+    size: int
+    meta: dict[str, Any] = field(default_factory=dict)
+    snippet: str = ""
+
+    @property
+    def stem(self) -> str:
+        return self.name.removesuffix(".md")
+
+    def to_line(self) -> str:
+        return json.dumps({
+            "name": self.name, "offset": self.offset, "length": self.length,
+            "mtime_ns": self.mtime_ns, "size": self.size, "meta": self.meta, "snippet": self.snippet,
+        })
+
+
+def _month(mtime_ns: int) -> str:
+    return datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc).strftime("%Y-%m")
+
+
+class Archive:
+    """The packs of one vault, with every pack index held in memory."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.directory = root / ARCHIVE_DIR
+        self._lock = threading.RLock()
+        self._items: dict[str, dict[tuple[str, str], ArchivedItem]] = {folder: {} for folder in ARCHIVE_FOLDERS}
+        self._load()
+
+    def _paths(self, folder: str, month: str) -> tuple[Path, Path]:
+        stem = self.directory / f"{folder}_{month}"
+        return stem.with_suffix(".pack"), stem.with_suffix(".idx")
+
+    def _load(self):
+        if not self.directory.is_dir():
+            return
+        for idx in sorted(self.directory.glob("*.idx")):
+            folder, _, month = idx.stem.rpartition("_")
+            if folder not in self._items:
+                continue
+            with open(idx, encoding="utf-8") as fh:
+                for line in fh:
+                    row = json.loads(line)
+                    self._items[folder][(month, row["name"])] = ArchivedItem(folder=folder, month=month, **row)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def count(self, folder: str) -> int:
+        with self._lock:
+            return len(self._items.get(folder, ()))
+
+    def get(self, folder: str, name: str, month: str | None = None) -> ArchivedItem | None:
+        """The item archived under `name` in `month`'s pack, or its most recent month when month is None."""
+        with self._lock:
+            items = self._items.get(folder, {})
+            if month is not None:
+                return items.get((month, name))
+            matches = [item for (_, n), item in items.items() if n == name]
+            return max(matches, key=lambda item: item.month, default=None)
+
+    def find(self, folder: str, name: str, mtime_ns: int, size: int) -> ArchivedItem | None:
+        """The archived copy of the file `name` had with this (mtime, size), if there is one."""
+        month = _month(mtime_ns)
+        stem = name.removesuffix(".md")
+        with self._lock:
+            items = self._items.get(folder, {})
+            n = 1
+            while (item := items.get((month, name if n == 1 else f"{stem}~{n}.md"))) is not None:
+                if (item.mtime_ns, item.size) == (mtime_ns, size):
+                    return item
+                n += 1
+            return None
+
+    def _free_name(self, folder: str, month: str, name: str) -> str:
+        items, stem, n = self._items[folder], name.removesuffix(".md"), 1
+        while (month, name) in items:
+            n += 1
+            name = f"{stem}~{n}.md"
+        return name
+
+    def items(self, folder: str) -> list[ArchivedItem]:
+        with self._lock:
+            return list(self._items.get(folder, {}).values())
+
+    def read(self, item: ArchivedItem) -> str:
+        """The item's original Markdown, decompressed from its pack."""
+        pack, _ = self._paths(item.folder, item.month)
+        with open(pack, "rb") as fh:
+            fh.seek(item.offset)
+            return gzip.decompress(fh.read(item.length)).decode("utf-8")
+
+    def packs(self) -> list[ArchivePack]:
+        with self._lock:
+            counts: dict[tuple[str, str], int] = defaultdict(int)
+            for folder, items in self._items.items():
+                for item in items.values():
+                    counts[(folder, item.month)] += 1
+        packs = []
+        for (folder, month), items in sorted(counts.items()):
+            pack, _ = self._paths(folder, month)
+            size = pack.stat().st_size if pack.exists() else 0
+            packs.append(ArchivePack(folder=folder, month=month, items=items, bytes=size))
+        return packs
+
+    # ── Archiving ────────────────────────────────────────────────────────────
+
+    def add(self, folder: str, month: str, entries: list[IndexEntry]) -> list[Path]:
+        """Append entries to the folder's pack for `month`; return the source files now safe to delete."""
+        pack, idx = self._paths(folder, month)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        archived: list[ArchivedItem] = []
+        done: list[Path] = []
+        with self._lock, open(pack, "ab") as fh:
+            offset = fh.seek(0, os.SEEK_END)
+            for entry in entries:
+                if self.find(folder, entry.name, entry.mtime_ns, entry.size) is not None:
+                    done.append(entry.path)  # archived by an interrupted run, source not yet deleted
+                    continue
+                try:
+                    data = entry.path.read_bytes()
+                except FileNotFoundError:
+                    continue
+                member = gzip.compress(data, mtime=0)
+                fh.write(member)
+                meta = {k: v for k, v in entry.meta.items() if k in META_KEYS}
+                name = self._free_name(folder, month, entry.name)
+                archived.append(ArchivedItem(
+                    folder, name, month, offset, len(member), entry.mtime_ns, entry.size, meta, entry.snippet,
+                ))
+                offset += len(member)
+                done.append(entry.path)
+            fh.flush()
+            if settings.VAULT_FSYNC:
+                os.fsync(fh.fileno())
+
+            items = self._items[folder]
+            for item in archived:
+                items[(month, item.name)] = item
+            month_items = [i for i in items.values() if i.month == month]
+            atomic_write(idx, "".join(item.to_line() + "\n" for item in month_items))
+        return done
+
+
+_archive: Archive | None = None
+_archive_lock = threading.Lock()
+
+
+def get_archive(root: Path | None = None) -> Archive:
+    """Return the archive of the current vault (loading its pack indexes on first use)."""
+    global _archive
+    root = root or settings.vault_dir
+    with _archive_lock:
+        if _archive is None or _archive.root != root:
+            _archive = Archive(root)
+        return _archive
+
+
+def count(folder: str) -> int:
+    return get_archive().count(folder) if folder in ARCHIVE_FOLDERS else 0
+
+
+def archive(older_than_days: int | None = None, job: JobContext | None = None) -> ArchiveResult:
+    """Move items older than `older_than_days` (default ARCHIVE_AFTER_DAYS) into monthly packs."""
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    start = time.perf_counter()
+    cutoff_ns = int((datetime.now(timezone.utc) - timedelta(days=days)).timestamp() * 1e9)
+    store, index = get_archive(), get_index()
+    index.sync(*ARCHIVE_FOLDERS)
+
+    groups: dict[tuple[str, str], list[IndexEntry]] = defaultdict(list)
+    for folder in ARCHIVE_FOLDERS:
+        for entry in index.entries(folder):
+            if entry.mtime_ns < cutoff_ns:
+                groups[(folder, _month(entry.mtime_ns))].append(entry)
+    if job:
+        job.set_total(sum(len(entries) for entries in groups.values()))
+
+    archived = 0
+    for (folder, month), entries in sorted(groups.items()):
+        if job and job.cancelled:
+            break
+        done = store.add(folder, month, sorted(entries, key=lambda e: e.name))
+        for path in done:
+            path.unlink(missing_ok=True)
+        index.touch(*done)
+        archived += len(done)
+        if job:
+            job.advance(count=len(entries))
+
+    message = f"Archived {archived} items older than {days} days into {len(groups)} packs"
+    logger.info("[Archive] %s", message)
+    return ArchiveResult(
+        message=message, archived=archived, packs=len(groups),
+        duration_ms=round((time.perf_counter() - start) * 1000, 1),
+    )
+
+
+def status() -> ArchiveStatus:
+    packs = get_archive().packs()
+    return ArchiveStatus(
+        after_days=settings.ARCHIVE_AFTER_DAYS,
+        items=sum(p.items for p in packs),
+        bytes=sum(p.bytes for p in packs),
+        packs=packs,
+    )
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Archive old vault items into monthly packs.")
+    parser.add_argument("--days", type=int, default=None, help="archive items older than this (default ARCHIVE_AFTER_DAYS)")
+    args = parser.parse_args()
+    print(archive(args.days).message)
+
+
+if __name__ == "__main__":
+    main()
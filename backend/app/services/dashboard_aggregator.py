@@ -0,0 +1,275 @@
+"""
+dashboard_aggregator.py — Incrementally maintained dashboard metrics.
+
+Subscribes to VaultIndex change events and keeps everything the dashboard shows
+up to date as files are created, moved or removed:
+
+- per-folder counters
+- a per-day histogram of Done completions
+- age-ordered heaps for the alert thresholds (approvals > 24h, needs-action > 12h)
+- a bounded buffer of the most recent Done/Approved/Rejected activity
+
+Alerts and the "done today" count also change with the clock alone;
+next_change_ns() says when that next happens, so a cached dashboard knows
+how long it stays valid while the vault is idle.
+
+A dashboard read only syncs the tracked folders (one directory stat each) and
+copies the current aggregates, so its cost does not grow with the vault size.
+
+With the metadata store enabled, StoreDashboard answers the same reads with
+indexed SQL over the store instead, and no in-memory aggregates are kept.
+"""
+
+import heapq
+import threading
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+
+from app.services.vault_index import IndexEntry, VaultIndex, get_index
+
+TRACKED_FOLDERS = ("Needs_Action", "Pending_Approval", "Plans", "Done", "Approved", "Rejected")
+
+# folder -> (max age before alerting, alert message template)
+ALERT_THRESHOLDS = {
+    "Pending_Approval": (timedelta(hours=24), "Approval pending > 24h: {}"),
+    "Needs_Action": (timedelta(hours=12), "Needs action > 12h: {}"),
+}
+
+ACTIVITY_FOLDERS = ("Done", "Approved", "Rejected")
+ACTIVITY_PER_FOLDER = 5
+ACTIVITY_LIMIT = 10
+
+
+def _utc_date(mtime_ns: int) -> date:
+    return datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc).date()
+
+
+class _AgeTracker:
+    """Min-heap of (mtime_ns, name) with lazy deletion; items older than a cutoff become overdue."""
+
+    def __init__(self):
+        self.live: dict[str, int] = {}
+        self.heap: list[tuple[int, str]] = []
+        self.overdue: dict[str, int] = {}
+
+    def add(self, name: str, mtime_ns: int):
+        self.discard(name)
+        self.live[name] = mtime_ns
+        heapq.heappush(self.heap, (mtime_ns, name))
+
+    def discard(self, name: str):
+        self.live.pop(name, None)
+        self.overdue.pop(name, None)
+        # Stale heap entries are skipped when popped; compact if they pile up.
+        if len(self.heap) > 2 * len(self.live) + 64:
+            self.heap = [(m, n) for n, m in self.live.items() if n not in self.overdue]
+            heapq.heapify(self.heap)
+
+    def advance(self, cutoff_ns: int) -> bool:
+        """Move every live item older than cutoff_ns to overdue. Returns True if any moved."""
+        moved = False
+        while self.heap and self.heap[0][0] < cutoff_ns:
+            mtime_ns, name = heapq.heappop(self.heap)
+            if self.live.get(name) == mtime_ns and name not in self.overdue:
+                self.overdue[name] = mtime_ns
+                moved = True
+        return moved
+
+    def oldest_pending(self) -> int | None:
+        """mtime_ns of the oldest live item not yet overdue (dropping stale heap entries on the way)."""
+        while self.heap:
+            mtime_ns, name = self.heap[0]
+            if self.live.get(name) == mtime_ns and name not in self.overdue:
+                return mtime_ns
+            heapq.heappop(self.heap)
+        return None
+
+
+def _next_midnight_ns(now_ns: int) -> int:
+    day = 86_400 * 1_000_000_000
+    return (now_ns // day + 1) * day
+
+
+def _age_ns(max_age: timedelta) -> int:
+    return int(max_age.total_seconds() * 1e9)
+
+
+class DashboardAggregator:
+    """Dashboard counters and derived lists, updated from VaultIndex events."""
+
+    def __init__(self, index: VaultIndex):
+        self.index = index
+        self._lock = threading.RLock()
+        self._counts: Counter[str] = Counter()
+        self._done_by_day: Counter[date] = Counter()
+        self._ages = {folder: _AgeTracker() for folder in ALERT_THRESHOLDS}
+        self._recent: dict[str, list[tuple[int, str]]] = {f: [] for f in ACTIVITY_FOLDERS}
+        self._recent_dirty: set[str] = set()
+        index.subscribe(self._on_event)
+
+    # ── Event handling ───────────────────────────────────────────────────────
+
+    def _on_event(self, kind: str, folder: str, entry: IndexEntry):
+        if folder not in TRACKED_FOLDERS:
+            return
+        with self._lock:
+            if kind == "removed":
+                self._remove(folder, entry)
+            else:
+                self._add(folder, entry)
+
+    def _add(self, folder: str, entry: IndexEntry):
+        self._counts[folder] += 1
+        if folder == "Done":
+            self._done_by_day[_utc_date(entry.mtime_ns)] += 1
+        if folder in self._ages:
+            self._ages[folder].add(entry.name, entry.mtime_ns)
+        if folder in self._recent:
+            recent = self._recent[folder]
+            item = (entry.mtime_ns, entry.stem)
+            if len(recent) < ACTIVITY_PER_FOLDER:
+                heapq.heappush(recent, item)
+            elif item > recent[0]:
+                heapq.heapreplace(recent, item)
+
+    def _remove(self, folder: str, entry: IndexEntry):
+        self._counts[folder] -= 1
+        if folder == "Done":
+            day = _utc_date(entry.mtime_ns)
+            self._done_by_day[day] -= 1
+            if self._done_by_day[day] <= 0:
+                del self._done_by_day[day]
+        if folder in self._ages:
+            self._ages[folder].discard(entry.name)
+        if folder in self._recent and (entry.mtime_ns, entry.stem) in self._recent[folder]:
+            # A buffered item left the folder; the next-most-recent one must be looked up.
+            self._recent_dirty.add(folder)
+
+    def _rebuild_folder(self, folder: str):
+        """Recompute the buffered aggregates for one folder from the index (rare path)."""
+        entries = self.index.entries(folder)
+        with self._lock:
+            self._recent[folder] = heapq.nlargest(
+                ACTIVITY_PER_FOLDER, ((e.mtime_ns, e.stem) for e in entries)
+            )
+            heapq.heapify(self._recent[folder])
+            self._recent_dirty.discard(folder)
+
+    # ── Reads ────────────────────────────────────────────────────────────────
+
+    def refresh(self):
+        """Sync tracked folders with disk; events from the sync update the aggregates."""
+        self.index.sync(*TRACKED_FOLDERS)
+        for folder in list(self._recent_dirty):
+            self._rebuild_folder(folder)
+
+    def count(self, folder: str) -> int:
+        with self._lock:
+            return self._counts[folder]
+
+    def done_on(self, day: date) -> int:
+        with self._lock:
+            return self._done_by_day.get(day, 0)
+
+    def alerts(self, now: datetime | None = None) -> list[str]:
+        now = now or datetime.now(timezone.utc)
+        now_ns = int(now.timestamp() * 1e9)
+        alerts: list[str] = []
+        with self._lock:
+            for folder, (max_age, template) in ALERT_THRESHOLDS.items():
+                tracker = self._ages[folder]
+                tracker.advance(now_ns - int(max_age.total_seconds() * 1e9))
+                for name, _ in sorted(tracker.overdue.items(), key=lambda kv: kv[1]):
+                    alerts.append(template.format(name))
+        return alerts
+
+    def next_change_ns(self, now_ns: int | None = None) -> int:
+        """When the metrics next change without any file changing: an alert firing, or the UTC day ending."""
+        now_ns = now_ns or time.time_ns()
+        soonest = _next_midnight_ns(now_ns)
+        with self._lock:
+            for folder, (max_age, _) in ALERT_THRESHOLDS.items():
+                tracker = self._ages[folder]
+                tracker.advance(now_ns - _age_ns(max_age))
+                oldest = tracker.oldest_pending()
+                if oldest is not None:
+                    soonest = min(soonest, oldest + _age_ns(max_age))
+        return soonest
+
+    def recent_activity(self) -> list[str]:
+        with self._lock:
+            return _format_activity({folder: sorted(self._recent[folder], reverse=True) for folder in ACTIVITY_FOLDERS})
+
+
+def _format_activity(recent: dict[str, list[tuple[int, str]]]) -> list[str]:
+    """{folder: [(mtime_ns, stem), ...]} -> the dashboard's "Recent Activity" lines."""
+    activity: list[str] = []
+    for folder, items in recent.items():
+        for mtime_ns, stem in items:
+            mtime = datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc)
+            time_str = mtime.strftime("%Y-%m-%d %H:%M UTC")
+            activity.append(f"[{folder}] {stem} - {time_str}")
+
+    # Sort by most recent and limit
+    activity.sort(reverse=True)
+    return activity[:ACTIVITY_LIMIT]
+
+
+class StoreDashboard:
+    """The DashboardAggregator reads, answered by queries on a metadata_store.MetadataStore."""
+
+    def __init__(self, store):
+        self.store = store
+
+    def refresh(self):
+        self.store.sync(*TRACKED_FOLDERS)
+
+    def count(self, folder: str) -> int:
+        return self.store.count(folder)
+
+    def done_on(self, day: date) -> int:
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        start_ns = int(start.timestamp()) * 1_000_000_000
+        return self.store.count_between("Done", start_ns, start_ns + 86_400 * 1_000_000_000)
+
+    def alerts(self, now: datetime | None = None) -> list[str]:
+        now = now or datetime.now(timezone.utc)
+        now_ns = int(now.timestamp() * 1e9)
+        return [
+            template.format(name)
+            for folder, (max_age, template) in ALERT_THRESHOLDS.items()
+            for name in self.store.older_than(folder, now_ns - int(max_age.total_seconds() * 1e9))
+        ]
+
+    def next_change_ns(self, now_ns: int | None = None) -> int:
+        now_ns = now_ns or time.time_ns()
+        soonest = _next_midnight_ns(now_ns)
+        for folder, (max_age, _) in ALERT_THRESHOLDS.items():
+            oldest = self.store.oldest_since(folder, now_ns - _age_ns(max_age))
+            if oldest is not None:
+                soonest = min(soonest, oldest + _age_ns(max_age))
+        return soonest
+
+    def recent_activity(self) -> list[str]:
+        recent = {}
+        for folder in ACTIVITY_FOLDERS:
+            rows = self.store.most_recent(folder, ACTIVITY_PER_FOLDER)
+            recent[folder] = [(mtime_ns, name.removesuffix(".md")) for mtime_ns, name in rows]
+        return _format_activity(recent)
+
+
+_aggregator: DashboardAggregator | None = None
+_aggregator_lock = threading.Lock()
+
+
+def get_aggregator() -> DashboardAggregator:
+    """Return the aggregator bound to the current process-wide VaultIndex."""
+    global _aggregator
+    index = get_index()
+    with _aggregator_lock:
+        if _aggregator is None or _aggregator.index is not index:
+            if _aggregator is not None:
+                _aggregator.index.unsubscribe(_aggregator._on_event)
+            _aggregator = DashboardAggregator(index)
+        return _aggregator
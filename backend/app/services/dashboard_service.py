@@ -1,42 +1,32 @@
 import re
-from datetime import datetime, timezone, timedelta
-from pathlib import Path
+import time
+from datetime import datetime, timezone
 
 from app.config import settings
 from app.models.dashboard import DashboardMetrics
+from app.services import io_executor, metadata_store, metrics
+from app.services.dashboard_aggregator import TRACKED_FOLDERS, DashboardAggregator, StoreDashboard, get_aggregator
+from app.services.response_cache import Payload, file_version
+from app.services.vault_index import get_index
+from app.services.vault_journal import atomic_write
 from app.services.vault_service import DASHBOARD_TEMPLATE
 
 
-def _count_md_files(folder: Path) -> int:
-    """Count .md files in a folder."""
-    if not folder.exists():
-        return 0
-    return len(list(folder.glob("*.md")))
-
-
-def _count_today_done() -> int:
-    """Count files in Done/ that were modified today (UTC)."""
-    done_dir = settings.vault_dir / "Done"
-    if not done_dir.exists():
-        return 0
-
-    today = datetime.now(timezone.utc).date()
-    count = 0
-    for f in done_dir.glob("*.md"):
-        mtime = datetime.fromtimestamp(f.stat().st_mtime, tz=timezone.utc).date()
-        if mtime == today:
-            count += 1
-    return count
+_revenue_cache: dict[tuple[str, int], tuple[str, str]] = {}
 
 
 def _extract_revenue() -> tuple[str, str]:
-    """Extract MTD revenue and monthly target from Business_Goals.md."""
+    """Extract MTD revenue and monthly target from Business_Goals.md (cached on mtime)."""
     goals_path = settings.vault_dir / "Business_Goals.md"
     mtd_revenue = "$0.00"
     monthly_target = "$5,000.00"
 
-    if not goals_path.exists():
+    try:
+        key = (str(goals_path), goals_path.stat().st_mtime_ns)
+    except FileNotFoundError:
         return mtd_revenue, monthly_target
+    if key in _revenue_cache:
+        return _revenue_cache[key]
 
     content = goals_path.read_text(encoding="utf-8")
 
@@ -49,63 +39,32 @@ def _extract_revenue() -> tuple[str, str]:
         monthly_target = match.group(1)
         mtd_revenue = match.group(2)
 
+    _revenue_cache.clear()
+    _revenue_cache[key] = (mtd_revenue, monthly_target)
     return mtd_revenue, monthly_target
 
 
-def _detect_alerts() -> list[str]:
-    """Detect alert conditions in the vault."""
-    alerts: list[str] = []
-    now = datetime.now(timezone.utc)
-
-    # Check for approvals pending > 24h
-    approval_dir = settings.vault_dir / "Pending_Approval"
-    if approval_dir.exists():
-        for f in approval_dir.glob("*.md"):
-            mtime = datetime.fromtimestamp(f.stat().st_mtime, tz=timezone.utc)
-            if now - mtime > timedelta(hours=24):
-                alerts.append(f"Approval pending > 24h: {f.name}")
-
-    # Check for needs_action items > 12h
-    needs_action_dir = settings.vault_dir / "Needs_Action"
-    if needs_action_dir.exists():
-        for f in needs_action_dir.glob("*.md"):
-            mtime = datetime.fromtimestamp(f.stat().st_mtime, tz=timezone.utc)
-            if now - mtime > timedelta(hours=12):
-                alerts.append(f"Needs action > 12h: {f.name}")
-
-    return alerts
-
-
-def _get_recent_activity() -> list[str]:
-    """Get recent activity from Done and Approved folders."""
-    activity: list[str] = []
-
-    for folder_name in ["Done", "Approved", "Rejected"]:
-        folder = settings.vault_dir / folder_name
-        if not folder.exists():
-            continue
-        files = sorted(folder.glob("*.md"), key=lambda f: f.stat().st_mtime, reverse=True)
-        for f in files[:5]:
-            mtime = datetime.fromtimestamp(f.stat().st_mtime, tz=timezone.utc)
-            time_str = mtime.strftime("%Y-%m-%d %H:%M UTC")
-            activity.append(f"[{folder_name}] {f.stem} - {time_str}")
-
-    # Sort by most recent and limit
-    activity.sort(reverse=True)
-    return activity[:10]
+def _aggregator() -> DashboardAggregator | StoreDashboard:
+    store = metadata_store.get_store()
+    return StoreDashboard(store) if store else get_aggregator()
 
 
 def get_metrics() -> DashboardMetrics:
-    """Compute current dashboard metrics from vault state."""
-    vault = settings.vault_dir
-
-    needs_action = _count_md_files(vault / "Needs_Action")
-    pending_approval = _count_md_files(vault / "Pending_Approval")
-    done_today = _count_today_done()
-    active_plans = _count_md_files(vault / "Plans")
+    """Return current dashboard metrics from the incrementally maintained aggregates
+    (or from SQL queries on the metadata store, when enabled)."""
+    start = time.perf_counter()
+    aggregator = _aggregator()
+    aggregator.refresh()
+
+    needs_action = aggregator.count("Needs_Action")
+    pending_approval = aggregator.count("Pending_Approval")
+    done_today = aggregator.done_on(datetime.now(timezone.utc).date())
+    active_plans = aggregator.count("Plans")  # archived plans are past ARCHIVE_AFTER_DAYS, not active
     mtd_revenue, monthly_target = _extract_revenue()
-    alerts = _detect_alerts()
-    recent_activity = _get_recent_activity()
+    alerts = aggregator.alerts()
+    recent_activity = aggregator.recent_activity()
+    source = "store" if isinstance(aggregator, StoreDashboard) else "aggregator"
+    metrics.DASHBOARD_SECONDS.labels(source).observe(time.perf_counter() - start)
 
     return DashboardMetrics(
         needs_action=needs_action,
@@ -120,6 +79,18 @@ def get_metrics() -> DashboardMetrics:
     )
 
 
+def metrics_version() -> tuple:
+    """Changes whenever a file behind get_metrics() does (the clock is covered by metrics_payload's expiry)."""
+    return get_index().version(*TRACKED_FOLDERS), file_version(settings.vault_dir / "Business_Goals.md")
+
+
+def metrics_payload() -> Payload:
+    """get_metrics() for the response cache, valid until the next alert or UTC midnight."""
+    # Taken first: anything crossing a threshold while the metrics are built only expires the body early.
+    expires_ns = _aggregator().next_change_ns()
+    return Payload(get_metrics(), expires_ns=expires_ns)
+
+
 def refresh_dashboard() -> str:
     """Write an updated Dashboard.md to the vault root."""
     vault = settings.vault_dir
@@ -160,5 +131,12 @@ last_updated: {timestamp}
 
 {activity_text}
 """
-    dashboard_path.write_text(content, encoding="utf-8")
+    atomic_write(dashboard_path, content)
     return f"Dashboard refreshed at {timestamp}"
+
+
+# ── Async variants (run on the dedicated I/O executor) ──────────────────────
+
+
+async def refresh_dashboard_async() -> str:
+    return await io_executor.run_write(refresh_dashboard)
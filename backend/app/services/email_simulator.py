@@ -1,8 +1,21 @@
+import functools
+import itertools
 import random
+import time
 import uuid
+from collections import Counter, deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone, timedelta
+from pathlib import Path
 
 from app.config import settings
+from app.models.simulation import BulkSimulationResult
+from app.services import io_executor
+from app.services.job_queue import JobContext
+from app.services.vault_index import get_index
+from app.services.vault_journal import atomic_write
 
 
 # ---------------------------------------------------------------------------
@@ -16,7 +29,7 @@ EMAIL_TEMPLATES = [
         "body": "Please find attached invoice #{inv_num} for ${amount}. Payment is due within 30 days. If you have any questions regarding this invoice, please contact our billing department.",
         "type": "payment",
         "priority": "normal",
-        "vars": {"inv_num": lambda: str(random.randint(10000, 99999)), "amount": lambda: f"{random.randint(50, 5000):.2f}"},
+        "vars": {"inv_num": lambda rng: str(rng.randint(10000, 99999)), "amount": lambda rng: f"{rng.randint(50, 5000):.2f}"},
     },
     {
         "sender": "angry.customer@email.com",
@@ -32,7 +45,7 @@ EMAIL_TEMPLATES = [
         "body": "Hi, I would like to schedule a meeting to discuss our partnership progress for Q{quarter}. Could we find a time next week? I have availability on Tuesday and Thursday afternoons.",
         "type": "email",
         "priority": "normal",
-        "vars": {"quarter": lambda: str(random.randint(1, 4))},
+        "vars": {"quarter": lambda rng: str(rng.randint(1, 4))},
     },
     {
         "sender": "payments@stripe.com",
@@ -41,9 +54,9 @@ EMAIL_TEMPLATES = [
         "type": "payment",
         "priority": "normal",
         "vars": {
-            "amount": lambda: f"{random.randint(100, 10000):.2f}",
-            "client_id": lambda: str(random.randint(1000, 9999)),
-            "txn_ref": lambda: uuid.uuid4().hex[:8].upper(),
+            "amount": lambda rng: f"{rng.randint(100, 10000):.2f}",
+            "client_id": lambda rng: str(rng.randint(1000, 9999)),
+            "txn_ref": lambda rng: f"{rng.getrandbits(32):08X}",
         },
     },
     {
@@ -60,7 +73,7 @@ EMAIL_TEMPLATES = [
         "body": "Hello, I found your company through a referral and I am interested in learning more about your {service} services. We are a mid-size company looking for a reliable partner. Could you send me your pricing and availability?",
         "type": "email",
         "priority": "normal",
-        "vars": {"service": lambda: random.choice(["consulting", "development", "marketing", "design", "analytics"])},
+        "vars": {"service": lambda rng: rng.choice(["consulting", "development", "marketing", "design", "analytics"])},
     },
     {
         "sender": "billing@saasplatform.com",
@@ -69,8 +82,8 @@ EMAIL_TEMPLATES = [
         "type": "email",
         "priority": "normal",
         "vars": {
-            "days": lambda: str(random.randint(3, 14)),
-            "amount": lambda: f"{random.choice([29, 49, 99, 149, 199]):.2f}",
+            "days": lambda rng: str(rng.randint(3, 14)),
+            "amount": lambda rng: f"{rng.choice([29, 49, 99, 149, 199]):.2f}",
         },
     },
     {
@@ -80,9 +93,9 @@ EMAIL_TEMPLATES = [
         "type": "payment",
         "priority": "normal",
         "vars": {
-            "month": lambda: random.choice(["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]),
-            "year": lambda: "2026",
-            "amount": lambda: f"{random.randint(200, 3000):.2f}",
+            "month": lambda rng: rng.choice(["January", "February", "March", "April", "May", "June", "July", "August", "September", "October", "November", "December"]),
+            "year": lambda rng: "2026",
+            "amount": lambda rng: f"{rng.randint(200, 3000):.2f}",
         },
     },
     {
@@ -92,9 +105,9 @@ EMAIL_TEMPLATES = [
         "type": "payment",
         "priority": "high",
         "vars": {
-            "inv_num": lambda: str(random.randint(10000, 99999)),
-            "amount": lambda: f"{random.randint(500, 8000):.2f}",
-            "days": lambda: str(random.randint(15, 60)),
+            "inv_num": lambda rng: str(rng.randint(10000, 99999)),
+            "amount": lambda rng: f"{rng.randint(500, 8000):.2f}",
+            "days": lambda rng: str(rng.randint(15, 60)),
         },
     },
     {
@@ -108,12 +121,36 @@ EMAIL_TEMPLATES = [
 ]
 
 
-def _render_template(template: dict) -> dict:
+EMAIL_FILE_TEMPLATE = """\
+---
+type: {type}
+id: {email_id}
+from: {sender}
+subject: {subject}
+received: {timestamp}
+priority: {priority}
+status: needs_action
+---
+
+# {subject}
+
+**From**: {sender}
+**Date**: {timestamp}
+**Priority**: {priority}
+
+---
+
+{body}
+"""
+
+
+def _render_template(template: dict, rng: random.Random | None = None) -> dict:
     """Resolve template variables and return a concrete email dict."""
+    source = rng if rng is not None else random  # the random module offers the same methods
     # Generate variable values
     var_values: dict[str, str] = {}
     for key, generator in template["vars"].items():
-        var_values[key] = generator()
+        var_values[key] = generator(source)
 
     # Render subject and body
     subject = template["subject"]
@@ -131,6 +168,10 @@ def _render_template(template: dict) -> dict:
     }
 
 
+def _timestamp() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
 def simulate_email(
     sender: str,
     subject: str,
@@ -147,47 +188,41 @@ def simulate_email(
     needs_action_dir.mkdir(parents=True, exist_ok=True)
 
     email_id = uuid.uuid4().hex[:8]
-    timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
     filename = f"EMAIL_{email_id}.md"
     filepath = needs_action_dir / filename
 
-    content = f"""\
----
-type: {email_type}
-id: {email_id}
-from: {sender}
-subject: {subject}
-received: {timestamp}
-priority: {priority}
-status: needs_action
----
-
-# {subject}
-
-**From**: {sender}
-**Date**: {timestamp}
-**Priority**: {priority}
-
----
-
-{body}
-"""
-    filepath.write_text(content, encoding="utf-8")
+    content = EMAIL_FILE_TEMPLATE.format(
+        type=email_type, email_id=email_id, sender=sender, subject=subject,
+        timestamp=_timestamp(), priority=priority, body=body,
+    )
+    atomic_write(filepath, content)
+    get_index().touch(filepath)
     return f"Email simulated: {filename}", filename
 
 
-def simulate_batch(count: int = 5) -> tuple[str, int, list[str]]:
+def simulate_batch(
+    count: int = 5,
+    job: JobContext | None = None,
+    seed: int | None = None,
+) -> tuple[str, int, list[str]]:
     """
     Generate a batch of random realistic emails.
     Returns (message, count, filenames).
+    A seed makes the chosen templates and their variables reproducible.
+    As a background job, stops early if cancelled and reports the emails written so far.
     """
+    rng = random.Random(seed) if seed is not None else None
     filenames: list[str] = []
 
     # Pick random templates (with possible repeats if count > len(templates))
-    chosen = random.choices(EMAIL_TEMPLATES, k=count)
+    chosen = (rng or random).choices(EMAIL_TEMPLATES, k=count)
+    if job:
+        job.set_total(count)
 
     for template in chosen:
-        rendered = _render_template(template)
+        if job and job.cancelled:
+            break
+        rendered = _render_template(template, rng)
         _, filename = simulate_email(
             sender=rendered["sender"],
             subject=rendered["subject"],
@@ -196,6 +231,157 @@ def simulate_batch(count: int = 5) -> tuple[str, int, list[str]]:
             priority=rendered["priority"],
         )
         filenames.append(filename)
+        if job:
+            job.advance()
 
+    count = len(filenames)
     message = f"Generated {count} simulated emails in Needs_Action/"
     return message, count, filenames
+
+
+# ---------------------------------------------------------------------------
+# Bulk generation (load testing)
+# ---------------------------------------------------------------------------
+
+BULK_CHUNK_SIZE = 2000   # files per writer task
+BULK_FILES_LISTED = 100  # filenames echoed back in a bulk result
+
+
+@dataclass(frozen=True)
+class _CompiledTemplate:
+    fmt: str  # the whole EMAIL_*.md, with {email_id}, {timestamp} and the template's variables left as fields
+    var_names: tuple[str, ...]
+    generators: tuple[Callable[[random.Random], str], ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("{", "{{").replace("}", "}}")
+
+
+@functools.cache
+def _compiled_templates() -> tuple[_CompiledTemplate, ...]:
+    compiled = []
+    for t in EMAIL_TEMPLATES:
+        fmt = EMAIL_FILE_TEMPLATE.format(
+            type=_escape(t["type"]), sender=_escape(t["sender"]), priority=_escape(t["priority"]),
+            subject=t["subject"], body=t["body"], email_id="{email_id}", timestamp="{timestamp}",
+        )
+        compiled.append(_CompiledTemplate(fmt, tuple(t["vars"]), tuple(t["vars"].values())))
+    return tuple(compiled)
+
+
+def generate_emails(count: int, seed: int) -> Iterator[tuple[str, str]]:
+    """Yield (filename, content) for `count` emails, reproducible for a given seed.
+
+    Templates are picked and their variables generated up front, one column
+    per template variable; rendering is then a single str.format per email.
+    Ids are "SIM<seed>_<n>": unique within a run, and apart from the random
+    hex ids of single emails, so only a rerun of the same seed can collide.
+    """
+    rng = random.Random(seed)
+    templates = _compiled_templates()
+    picks = rng.choices(range(len(templates)), k=count)
+
+    columns: dict[int, list[Iterator[str]]] = {}
+    for t_index, n in sorted(Counter(picks).items()):
+        template = templates[t_index]
+        columns[t_index] = [iter([gen(rng) for _ in range(n)]) for gen in template.generators]
+
+    timestamp = _timestamp()
+    for i, t_index in enumerate(picks):
+        template = templates[t_index]
+        email_id = f"SIM{seed}_{i:06d}"
+        values = {name: next(col) for name, col in zip(template.var_names, columns[t_index])}
+        yield f"EMAIL_{email_id}.md", template.fmt.format(email_id=email_id, timestamp=timestamp, **values)
+
+
+def _write_files(directory: Path, chunk: list[tuple[str, str]]) -> int:
+    """Write the chunk's files, never replacing an existing one. Returns how many were written."""
+    return sum(atomic_write(directory / filename, content, exclusive=True) for filename, content in chunk)
+
+
+def simulate_bulk(
+    count: int,
+    seed: int | None = None,
+    workers: int | None = None,
+    job: JobContext | None = None,
+) -> BulkSimulationResult:
+    """Generate `count` emails in Needs_Action/ for load testing.
+
+    Files are written by a pool of writer threads, in chunks, and the index is
+    refreshed once at the end rather than per file. Each file is written
+    atomically and never replaces an existing one: emails whose file already
+    exists (a rerun of the same seed) are skipped and counted as such.
+    Without a seed one is drawn and returned, so any run can be reproduced.
+    """
+    seed = random.randrange(2**32) if seed is None else seed
+    workers = max(1, workers or settings.SIMULATOR_WRITERS)
+    needs_action_dir = settings.vault_dir / "Needs_Action"
+    needs_action_dir.mkdir(parents=True, exist_ok=True)
+    if job:
+        job.set_total(count)
+
+    start = time.perf_counter()
+    written = attempted = 0
+    listed: list[str] = []
+    emails = generate_emails(count, seed)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sim-writer") as pool:
+        in_flight: deque[tuple[Future, int]] = deque()
+        while not (job and job.cancelled):
+            chunk = list(itertools.islice(emails, BULK_CHUNK_SIZE))
+            if not chunk:
+                break
+            if len(listed) < BULK_FILES_LISTED:
+                listed.extend(f for f, _ in chunk[:BULK_FILES_LISTED - len(listed)])
+            attempted += len(chunk)
+            in_flight.append((pool.submit(_write_files, needs_action_dir, chunk), len(chunk)))
+            # Bound memory: at most two chunks per writer rendered ahead of the disk.
+            while len(in_flight) > 2 * workers:
+                written += _finish_chunk(in_flight.popleft(), job)
+        while in_flight:
+            written += _finish_chunk(in_flight.popleft(), job)
+    get_index().invalidate("Needs_Action")
+
+    elapsed = time.perf_counter() - start
+    skipped = attempted - written
+    message = f"Generated {written} simulated emails in Needs_Action/"
+    if skipped:
+        message += f" ({skipped} skipped: already present)"
+    return BulkSimulationResult(
+        message=message,
+        count=written,
+        skipped=skipped,
+        files=listed,
+        seed=seed,
+        duration_ms=round(elapsed * 1000, 2),
+        items_per_second=round(written / elapsed, 1) if elapsed > 0 else 0.0,
+    )
+
+
+def _finish_chunk(item: tuple[Future, int], job: JobContext | None) -> int:
+    future, size = item
+    written = future.result()
+    if job:
+        job.advance(count=size)
+    return written
+
+
+# ── Async variants (run on the dedicated I/O executor) ──────────────────────
+
+
+async def simulate_email_async(
+    sender: str,
+    subject: str,
+    body: str,
+    email_type: str = "email",
+    priority: str = "normal",
+) -> tuple[str, str]:
+    return await io_executor.run_write(simulate_email, sender, subject, body, email_type, priority)
+
+
+async def simulate_batch_async(count: int = 5, seed: int | None = None) -> tuple[str, int, list[str]]:
+    return await io_executor.run_write(simulate_batch, count, None, seed)
+
+
+async def simulate_bulk_async(count: int, seed: int | None = None) -> BulkSimulationResult:
+    return await io_executor.run_write(simulate_bulk, count, seed)
@@ -0,0 +1,235 @@
+"""
+events.py — In-process event bus behind the /api/events Server-Sent Events stream.
+
+Producers (the VaultIndex listener, file_processor, the approvals router) call
+publish() from any thread. Each connected client owns a bounded asyncio queue;
+a client that falls too far behind is dropped and told to resync on reconnect.
+
+Index changes arrive while the VaultIndex lock is held, so the listener only
+queues them; their payloads are built and published on the read pool
+(io_executor), as is the debounced dashboard delta.
+
+Event types:
+    item_created / item_removed          Needs_Action changes (payload: ActionItem / filename)
+    approval_created / approval_removed  Pending_Approval changes (payload: Approval / filename)
+    item_processed                       process_item finished (filename, outcome)
+    approval_approved / approval_rejected
+    job_finished                         a background job ended (id, kind, status)
+    dashboard                            only the DashboardMetrics fields that changed
+    resync                               client missed events; refetch everything
+"""
+
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from typing import AsyncIterator, Callable
+
+from pydantic import BaseModel
+
+from app.services import io_executor
+from app.services.dashboard_aggregator import TRACKED_FOLDERS
+from app.services.vault_index import IndexEntry, VaultIndex, get_index
+
+logger = logging.getLogger("events")
+
+QUEUE_SIZE = 1000
+REPLAY_SIZE = 500
+HEARTBEAT_SECONDS = 15.0
+DASHBOARD_DEBOUNCE_SECONDS = 0.25
+
+# folder -> (event prefix, entry -> payload model)
+_folder_events: dict[str, tuple[str, Callable[[IndexEntry], BaseModel]]] = {}
+
+
+def register_folder(folder: str, prefix: str, to_payload: Callable[[IndexEntry], BaseModel]):
+    """Publish <prefix>_created / <prefix>_removed events for files in a vault folder."""
+    _folder_events[folder] = (prefix, to_payload)
+
+
+class _Subscriber:
+    __slots__ = ("queue", "dropped")
+
+    def __init__(self):
+        self.queue: asyncio.Queue[str] = asyncio.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = False
+
+
+class EventBus:
+    """Fan-out of typed events to per-client asyncio queues, safe to publish from threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._replay: deque[tuple[int, str]] = deque(maxlen=REPLAY_SIZE)
+        self._subscribers: set[_Subscriber] = set()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._index: VaultIndex | None = None
+        self._dashboard_pending = False
+        self._dashboard_last: dict = {}
+        self._changes: deque[tuple[str, str, IndexEntry]] = deque()
+        self._draining = False
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    # ── Publishing ───────────────────────────────────────────────────────────
+
+    def publish(self, event_type: str, data: dict):
+        with self._lock:
+            if not self._subscribers:
+                return
+            self._seq += 1
+            frame = _format_frame(self._seq, event_type, data)
+            self._replay.append((self._seq, frame))
+            loop = self._loop
+        try:
+            loop.call_soon_threadsafe(self._deliver, frame)
+        except RuntimeError:
+            # Loop already closed (shutdown); nothing left to deliver to.
+            pass
+
+    def _deliver(self, frame: str):
+        for sub in list(self._subscribers):
+            try:
+                sub.queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                logger.warning("[Events] Dropping slow subscriber")
+                sub.dropped = True
+                self._subscribers.discard(sub)
+
+    # ── Subscribing ──────────────────────────────────────────────────────────
+
+    def subscribe(self, last_event_id: int | None = None) -> _Subscriber:
+        """Register a client, pre-filled with missed events (or a resync marker)."""
+        sub = _Subscriber()
+        queue = sub.queue
+        with self._lock:
+            loop = asyncio.get_running_loop()
+            if loop is not self._loop:
+                # A new event loop (server restart): callbacks scheduled on the old one are gone.
+                self._loop = loop
+                self._dashboard_pending = False
+            self._subscribers.add(sub)
+            if last_event_id is not None:
+                missed = [frame for seq, frame in self._replay if seq > last_event_id]
+                oldest = self._replay[0][0] if self._replay else self._seq + 1
+                if last_event_id + 1 < oldest and last_event_id < self._seq:
+                    queue.put_nowait(_format_frame(self._seq, "resync", {}))
+                else:
+                    for frame in missed:
+                        queue.put_nowait(frame)
+        self._attach_index()
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber):
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    # ── Index and dashboard wiring ───────────────────────────────────────────
+
+    def _attach_index(self):
+        index = get_index()
+        with self._lock:
+            if self._index is index:
+                return
+            previous, self._index = self._index, index
+        if previous is not None:
+            previous.unsubscribe(self._on_index_event)
+        # Load the folders we report on so later changes to them produce events.
+        index.sync(*_folder_events, *TRACKED_FOLDERS)
+        index.subscribe(self._on_index_event, replay=False)
+
+    def _on_index_event(self, kind: str, folder: str, entry: IndexEntry):
+        # Called under the index lock: queue the change; payloads are built off it.
+        if not self._subscribers:
+            return
+        if folder in _folder_events:
+            with self._lock:
+                self._changes.append((kind, folder, entry))
+                start, self._draining = not self._draining, True
+            if start:
+                try:
+                    io_executor.submit_read(self._publish_changes)
+                except RuntimeError:  # interpreter shutting down
+                    with self._lock:
+                        self._draining = False
+        self._schedule_dashboard()
+
+    def _publish_changes(self):
+        while True:
+            with self._lock:
+                if not self._changes:
+                    self._draining = False
+                    return
+                batch = list(self._changes)
+                self._changes.clear()
+            for kind, folder, entry in batch:
+                prefix, to_payload = _folder_events[folder]
+                try:
+                    if kind == "added":
+                        self.publish(f"{prefix}_created", to_payload(entry).model_dump())
+                    else:
+                        self.publish(f"{prefix}_removed", {"filename": entry.name})
+                except Exception:
+                    logger.exception("[Events] Building the %s event for %s/%s failed", kind, folder, entry.name)
+
+    def _schedule_dashboard(self):
+        with self._lock:
+            if self._dashboard_pending or self._loop is None:
+                return
+            self._dashboard_pending = True
+            loop = self._loop
+        try:
+            loop.call_soon_threadsafe(loop.call_later, DASHBOARD_DEBOUNCE_SECONDS, self._flush_dashboard)
+        except RuntimeError:
+            self._dashboard_pending = False
+
+    def _flush_dashboard(self):
+        io_executor.submit_read(self._publish_dashboard_delta)
+
+    def _publish_dashboard_delta(self):
+        from app.services import dashboard_service
+
+        self._dashboard_pending = False
+        metrics = dashboard_service.get_metrics().model_dump()
+        delta = {k: v for k, v in metrics.items() if self._dashboard_last.get(k) != v}
+        self._dashboard_last = metrics
+        if delta:
+            self.publish("dashboard", delta)
+
+
+def _format_frame(seq: int, event_type: str, data: dict) -> str:
+    return f"id: {seq}\nevent: {event_type}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+bus = EventBus()
+
+
+def publish(event_type: str, **data):
+    """Publish a typed event to every connected /api/events client."""
+    bus.publish(event_type, data)
+
+
+async def stream(is_disconnected: Callable, last_event_id: int | None = None) -> AsyncIterator[str]:
+    """Yield SSE frames for one client until it disconnects."""
+    sub = bus.subscribe(last_event_id)
+    try:
+        yield "retry: 3000\n\n"
+        while True:
+            try:
+                frame = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                if await is_disconnected():
+                    return
+                yield ": ping\n\n"
+                continue
+            yield frame
+            if sub.dropped and sub.queue.empty():
+                # We were dropped for falling behind; make the client start over.
+                yield _format_frame(0, "resync", {})
+                return
+    finally:
+        bus.unsubscribe(sub)
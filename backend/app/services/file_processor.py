@@ -1,129 +1,145 @@
-import shutil
-import uuid
+import logging
+import re
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
 from pathlib import Path
 
 from app.config import settings
 from app.models.action_item import ActionItem, ProcessResult
+from app.services import events, handbook_rules, io_executor, keyword_matcher, metadata_store, metrics
+from app.services.frontmatter import get_body, parse_document
+from app.services.job_queue import JobContext
+from app.services.listing import Listing, fetch_page
+from app.services.vault_index import IndexEntry, get_index
+from app.services.vault_journal import Transition, TransitionConflict
 
+logger = logging.getLogger("file-processor")
 
-# Priority keywords that trigger high-priority routing
-PRIORITY_KEYWORDS = [
-    "urgent", "asap", "immediately", "emergency",
-    "invoice", "payment", "overdue", "refund",
-    "complaint", "unhappy", "cancel",
-]
+# Default priority keywords; the handbook's Priority Keywords section overrides them
+PRIORITY_KEYWORDS = keyword_matcher.PRIORITY_KEYWORDS
 
 PRIORITY_ORDER = {"high": 0, "medium": 1, "normal": 2, "low": 3}
 
+_AMOUNT_RE = re.compile(r"\$\s?(\d[\d,]*(?:\.\d+)?)")
+
 
 def _parse_frontmatter(text: str) -> dict[str, str]:
     """Parse YAML-like frontmatter delimited by --- lines."""
-    meta: dict[str, str] = {}
-    lines = text.strip().splitlines()
-    if not lines or lines[0].strip() != "---":
-        return meta
+    return parse_document(text)[0]
+
+
+def _get_body(text: str) -> str:
+    """Return everything after the frontmatter block."""
+    return get_body(text, parse_document(text)[1])
+
+
+def _detect_priority(subject: str, body: str) -> str:
+    """Check subject and body for the handbook's priority keywords."""
+    return "high" if handbook_rules.get_rules().matcher.matches(subject, body) else "normal"
+
+
+def _item_amount(meta: dict, subject: str, body: str) -> float | None:
+    """The item's amount, or None when it cannot be trusted (the item then goes to approval).
+
+    An `amount` frontmatter field wins. Otherwise the largest $ figure in the
+    subject and body, so a fee or unit price next to the total cannot let a
+    large payment through under the threshold.
+    """
+    value = meta.get("amount")
+    if value is not None:
+        try:
+            return float(str(value).replace(",", "").lstrip("$ "))
+        except ValueError:
+            return None
+    figures = [float(m.group(1).replace(",", "")) for m in _AMOUNT_RE.finditer(f"{subject}\n{body}")]
+    return max(figures, default=None)
+
+
+def _needs_approval(
+    item_type: str,
+    keyword_categories: frozenset[str],
+    amount: float | None = None,
+    rules: handbook_rules.HandbookRules | None = None,
+) -> bool:
+    """Determine whether an action item requires owner approval, per the compiled handbook.
+
+    keyword_categories is rules.matcher.scan(subject, body) for the item.
+    """
+    return (rules or handbook_rules.get_rules()).needs_approval(item_type, keyword_categories, amount)
+
+
+def _entry_priority(entry: IndexEntry) -> str:
+    priority = entry.meta.get("priority")
+    if priority is None:
+        priority = _detect_priority(entry.meta.get("subject", entry.stem), entry.read_body())
+    return priority
+
+
+def _entry_to_action_item(entry: IndexEntry) -> ActionItem:
+    """Build an ActionItem from an indexed Needs_Action file."""
+    meta = entry.meta
+    return ActionItem(
+        id=meta.get("id", entry.stem),
+        filename=entry.name,
+        type=meta.get("type", "unknown"),
+        sender=meta.get("from", meta.get("sender", "unknown")),
+        subject=meta.get("subject", entry.stem),
+        priority=_entry_priority(entry),
+        received=meta.get("received", meta.get("date", "")),
+        status=meta.get("status", "needs_action"),
+        snippet=entry.snippet,
+    )
 
-    end_idx = -1
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            end_idx = i
-            break
 
-    if end_idx == -1:
-        return meta
+events.register_folder("Needs_Action", "item", _entry_to_action_item)
 
-    for line in lines[1:end_idx]:
-        if ":" in line:
-            key, _, value = line.partition(":")
-            meta[key.strip()] = value.strip()
 
-    return meta
+def _priority_rank(priority: str) -> int:
+    return PRIORITY_ORDER.get(priority.lower(), 99)
 
 
-def _get_body(text: str) -> str:
-    """Return everything after the frontmatter block."""
-    lines = text.strip().splitlines()
-    if not lines or lines[0].strip() != "---":
-        return text
+def _action_item_sort_key(entry: IndexEntry) -> tuple:
+    # High priority first. The view appends the filename itself, and cursors encode (rank, filename):
+    # adding a filename here would change the cursor format.
+    return (_priority_rank(_entry_priority(entry)),)
 
-    end_idx = -1
-    for i in range(1, len(lines)):
-        if lines[i].strip() == "---":
-            end_idx = i
-            break
 
-    if end_idx == -1:
-        return text
+ACTION_ITEMS = Listing(
+    folder="Needs_Action",
+    model=ActionItem,
+    to_model=_entry_to_action_item,
+    sort_key=_action_item_sort_key,
+    attrs={
+        "priority": _entry_priority,
+        "type": lambda e: e.meta.get("type", "unknown"),
+        "sender": lambda e: e.meta.get("from", e.meta.get("sender", "unknown")),
+        "date": lambda e: e.meta.get("received", e.meta.get("date", "")),
+    },
+    priority_rank=_priority_rank,
+    rules_version=handbook_rules.version,
+)
 
-    return "\n".join(lines[end_idx + 1 :]).strip()
 
+def _rules_changed():
+    # Items without a priority field are ranked by the handbook's keywords.
+    get_index().rekey("Needs_Action")
+    metadata_store.rekey("Needs_Action")
 
-def _detect_priority(subject: str, body: str) -> str:
-    """Check subject and body for priority keywords."""
-    combined = (subject + " " + body).lower()
-    for kw in PRIORITY_KEYWORDS:
-        if kw in combined:
-            return "high"
-    return "normal"
-
-
-def _needs_approval(item_type: str, priority: str, subject: str, body: str) -> bool:
-    """Determine whether an action item requires owner approval."""
-    # Payment types always need approval
-    if item_type == "payment":
-        return True
-    # Emails with priority keywords need approval
-    if item_type == "email":
-        combined = (subject + " " + body).lower()
-        for kw in PRIORITY_KEYWORDS:
-            if kw in combined:
-                return True
-    return False
+
+handbook_rules.on_change(_rules_changed)
 
 
 def get_action_items() -> list[ActionItem]:
-    """Read all .md files in Needs_Action and return parsed ActionItem list."""
-    needs_action_dir = settings.vault_dir / "Needs_Action"
-    if not needs_action_dir.exists():
-        return []
-
-    items: list[ActionItem] = []
-    for filepath in sorted(needs_action_dir.glob("*.md")):
-        text = filepath.read_text(encoding="utf-8")
-        meta = _parse_frontmatter(text)
-        body = _get_body(text)
-
-        subject = meta.get("subject", filepath.stem)
-        item_type = meta.get("type", "unknown")
-        priority = meta.get("priority", _detect_priority(subject, body))
-
-        item = ActionItem(
-            id=meta.get("id", uuid.uuid4().hex[:8]),
-            filename=filepath.name,
-            type=item_type,
-            sender=meta.get("from", meta.get("sender", "unknown")),
-            subject=subject,
-            priority=priority,
-            received=meta.get("received", meta.get("date", "")),
-            status=meta.get("status", "needs_action"),
-            snippet=body[:200] if body else "",
-        )
-        items.append(item)
-
-    # Sort by priority: high first
-    items.sort(key=lambda x: PRIORITY_ORDER.get(x.priority, 99))
+    """Return parsed ActionItems for every file in Needs_Action, high priority first."""
+    items, _ = fetch_page(ACTION_ITEMS)
     return items
 
 
-def _write_plan(item: ActionItem, body: str) -> str:
-    """Write a plan file to the Plans folder. Returns the plan filename."""
-    plans_dir = settings.vault_dir / "Plans"
-    plans_dir.mkdir(parents=True, exist_ok=True)
-
+def _render_plan(item: ActionItem, body: str) -> tuple[str, str]:
+    """Render the plan file for an item. Returns (plan filename, content)."""
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
     plan_filename = f"PLAN_{item.id}.md"
-    plan_path = plans_dir / plan_filename
 
     plan_content = f"""\
 ---
@@ -154,18 +170,13 @@ status: active
 2. Execute required actions per handbook rules.
 3. Log outcome and update status.
 """
-    plan_path.write_text(plan_content, encoding="utf-8")
-    return plan_filename
+    return plan_filename, plan_content
 
 
-def _write_approval(item: ActionItem, body: str) -> str:
-    """Write an approval request to Pending_Approval. Returns the approval filename."""
-    approval_dir = settings.vault_dir / "Pending_Approval"
-    approval_dir.mkdir(parents=True, exist_ok=True)
-
+def _render_approval(item: ActionItem, body: str) -> tuple[str, str]:
+    """Render the approval request for an item. Returns (approval filename, content)."""
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
     approval_filename = f"APPROVAL_{item.id}.md"
-    approval_path = approval_dir / approval_filename
 
     # Determine reason for approval
     if item.type == "payment":
@@ -179,6 +190,7 @@ type: approval
 id: {item.id}
 action: review_and_respond
 source_file: {item.filename}
+from: {item.sender}
 subject: {item.subject}
 priority: {item.priority}
 created: {timestamp}
@@ -209,67 +221,204 @@ reason: {reason}
 - **Approve**: Proceed with the recommended action.
 - **Reject**: Cancel the action and archive.
 """
-    approval_path.write_text(approval_content, encoding="utf-8")
-    return approval_filename
+    return approval_filename, approval_content
 
 
-def process_item(filename: str) -> str:
-    """Process a single item from Needs_Action. Returns a description of what happened."""
-    needs_action_dir = settings.vault_dir / "Needs_Action"
-    filepath = needs_action_dir / filename
+# process_item() result prefix -> items_processed_total outcome label
+_OUTCOMES = {
+    "Completed": "done",
+    "Routed to approval": "approval",
+    "File not found": "not_found",
+    "Already being processed": "conflict",
+}
 
-    if not filepath.exists():
-        return f"File not found: {filename}"
-
-    text = filepath.read_text(encoding="utf-8")
-    meta = _parse_frontmatter(text)
-    body = _get_body(text)
 
-    subject = meta.get("subject", filepath.stem)
-    item_type = meta.get("type", "unknown")
-    priority = meta.get("priority", _detect_priority(subject, body))
+def process_item(filename: str) -> str:
+    """Process a single item from Needs_Action. Returns a description of what happened.
+
+    Writing the plan, the approval request and moving the source is one journaled
+    transition claimed on the item: it either lands completely or not at all, and
+    a concurrent request for the same item gets "Already being processed".
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        result = _process_item(filename)
+        outcome = next((label for prefix, label in _OUTCOMES.items() if result.startswith(prefix)), "error")
+        return result
+    finally:
+        metrics.ITEMS_PROCESSED.labels(outcome).inc()
+        metrics.ITEM_PROCESS_SECONDS.observe(time.perf_counter() - start)
+
+
+def _process_item(filename: str) -> str:
+    vault = settings.vault_dir
+    filepath = vault / "Needs_Action" / filename
 
-    item = ActionItem(
-        id=meta.get("id", uuid.uuid4().hex[:8]),
-        filename=filename,
-        type=item_type,
-        sender=meta.get("from", meta.get("sender", "unknown")),
-        subject=subject,
-        priority=priority,
-        received=meta.get("received", meta.get("date", "")),
-        status="processing",
-        snippet=body[:200] if body else "",
+    if not filepath.exists():
+        # Accept an item id as well as a filename.
+        entry = get_index().find_by_id("Needs_Action", filename)
+        if entry is None:
+            return f"File not found: {filename}"
+        filepath, filename = entry.path, entry.name
+
+    try:
+        with Transition("process_item", f"Needs_Action/{filename}") as tx:
+            try:
+                text = filepath.read_text(encoding="utf-8")
+            except FileNotFoundError:
+                # Processed by another request between the lookup and the claim.
+                return f"File not found: {filename}"
+            meta, body_start = parse_document(text)
+            body = get_body(text, body_start)
+
+            subject = meta.get("subject", filepath.stem)
+            item_type = meta.get("type", "unknown")
+            # One keyword scan serves both the priority fallback and the approval decision.
+            rules = handbook_rules.get_rules()
+            keyword_categories = rules.matcher.scan(subject, body)
+            priority = meta.get("priority", "high" if keyword_categories else "normal")
+
+            item = ActionItem(
+                id=meta.get("id", filepath.stem),
+                filename=filename,
+                type=item_type,
+                sender=meta.get("from", meta.get("sender", "unknown")),
+                subject=subject,
+                priority=priority,
+                received=meta.get("received", meta.get("date", "")),
+                status="processing",
+                snippet=body[:200] if body else "",
+            )
+
+            plan_file, plan_content = _render_plan(item, body)
+            tx.write(vault / "Plans" / plan_file, plan_content)
+
+            if _needs_approval(item_type, keyword_categories, _item_amount(meta, subject, body), rules):
+                # Approval request, and the source waits in In_Progress
+                approval_file, approval_content = _render_approval(item, body)
+                tx.write(vault / "Pending_Approval" / approval_file, approval_content)
+                tx.move(filepath, vault / "In_Progress" / filename)
+                tx.commit()
+                events.publish(
+                    "item_processed", filename=filename, outcome="approval", plan=plan_file, approval=approval_file,
+                )
+                return f"Routed to approval ({approval_file}). Plan: {plan_file}. Moved to In_Progress."
+
+            # Straight to Done
+            arrived = filepath.stat().st_mtime
+            tx.move(filepath, vault / "Done" / filename)
+            tx.commit()
+            metrics.PIPELINE_LAG.labels("direct").observe(time.time() - arrived)
+            events.publish("item_processed", filename=filename, outcome="done", plan=plan_file)
+            return f"Completed. Plan: {plan_file}. Moved to Done."
+    except TransitionConflict:
+        return f"Already being processed: {filename}"
+
+
+def _process_isolated(filename: str) -> tuple[str, bool]:
+    """Run process_item, turning any exception into a failed result for that item only."""
+    try:
+        return process_item(filename), True
+    except Exception as e:
+        logger.exception("Processing %s failed", filename)
+        return f"Error: {e}", False
+
+
+def _process_in_subprocess(vault_dir: str, filename: str) -> tuple[str, bool]:
+    """Process-pool entry point: point the worker's settings at the caller's vault first."""
+    settings.VAULT_PATH = vault_dir
+    return _process_isolated(filename)
+
+
+def _future_result(future: Future) -> tuple[str, bool]:
+    try:
+        return future.result()
+    except Exception as e:
+        # Only reachable when the pool itself broke (e.g. a worker process died).
+        return f"Error: {e}", False
+
+
+def process_all(
+    mode: str | None = None,
+    workers: int | None = None,
+    job: JobContext | None = None,
+) -> ProcessResult:
+    """Process all items in Needs_Action.
+
+    mode is "serial", "thread" or "process" (default: settings.PROCESS_EXECUTOR),
+    with at most `workers` items in flight (default: settings.PROCESS_WORKERS).
+    Results are returned in Needs_Action filename order whatever the mode.
+
+    When run as a background job, progress is reported per item and a
+    cancellation stops the batch, returning only the items already processed.
+    """
+    mode = mode or settings.PROCESS_EXECUTOR
+    workers = max(1, workers or settings.PROCESS_WORKERS)
+    filenames = [e.name for e in get_index().entries("Needs_Action")]
+    workers = min(workers, len(filenames)) or 1
+    if workers == 1:
+        mode = "serial"
+    if job:
+        job.set_total(len(filenames))
+
+    start = time.perf_counter()
+    completed: list[tuple[str, tuple[str, bool]]] = []
+    if mode == "serial":
+        for filename in filenames:
+            if job and job.cancelled:
+                break
+            outcome = _process_isolated(filename)
+            completed.append((filename, outcome))
+            if job:
+                job.advance(outcome[1])
+    elif mode in ("thread", "process"):
+        if mode == "thread":
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="process-all")
+            task, leading_args = _process_isolated, ()
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers)
+            task, leading_args = _process_in_subprocess, (str(settings.vault_dir),)
+        with pool:
+            futures = [pool.submit(task, *leading_args, f) for f in filenames]
+            if job:
+                for future in as_completed(futures):
+                    job.advance(_future_result(future)[1])
+                    if job.cancelled:
+                        for pending in futures:
+                            pending.cancel()
+                        break
+        completed = [(f, _future_result(fut)) for f, fut in zip(filenames, futures) if not fut.cancelled()]
+        if mode == "process":
+            # Worker processes wrote behind this process's index; rescan what they touched.
+            index = get_index()
+            for folder in ("Needs_Action", "In_Progress", "Plans", "Pending_Approval", "Done"):
+                index.invalidate(folder)
+    else:
+        raise ValueError(f"Unknown process executor: {mode}")
+    elapsed = time.perf_counter() - start
+
+    return ProcessResult(
+        processed=len(completed),
+        actions=[f"{filename}: {action}" for filename, (action, _) in completed],
+        failed=sum(1 for _, (_, ok) in completed if not ok),
+        mode=mode,
+        workers=workers,
+        duration_ms=round(elapsed * 1000, 2),
+        items_per_second=round(len(completed) / elapsed, 1) if elapsed > 0 else 0.0,
     )
 
-    # Write plan
-    plan_file = _write_plan(item, body)
 
-    if _needs_approval(item_type, priority, subject, body):
-        # Write approval request and move to In_Progress
-        approval_file = _write_approval(item, body)
-        in_progress_dir = settings.vault_dir / "In_Progress"
-        in_progress_dir.mkdir(parents=True, exist_ok=True)
-        shutil.move(str(filepath), str(in_progress_dir / filename))
-        return f"Routed to approval ({approval_file}). Plan: {plan_file}. Moved to In_Progress."
-    else:
-        # Move directly to Done
-        done_dir = settings.vault_dir / "Done"
-        done_dir.mkdir(parents=True, exist_ok=True)
-        shutil.move(str(filepath), str(done_dir / filename))
-        return f"Completed. Plan: {plan_file}. Moved to Done."
+# ── Async variants (run on the dedicated I/O executor) ──────────────────────
+
 
+async def get_action_items_async() -> list[ActionItem]:
+    return await io_executor.run_read(get_action_items)
 
-def process_all() -> ProcessResult:
-    """Process all items in Needs_Action."""
-    needs_action_dir = settings.vault_dir / "Needs_Action"
-    if not needs_action_dir.exists():
-        return ProcessResult(processed=0, actions=[])
 
-    files = list(needs_action_dir.glob("*.md"))
-    actions: list[str] = []
+async def process_item_async(filename: str) -> str:
+    return await io_executor.run_write(process_item, filename)
 
-    for filepath in files:
-        result = process_item(filepath.name)
-        actions.append(f"{filepath.name}: {result}")
 
-    return ProcessResult(processed=len(files), actions=actions)
+async def process_all_async(mode: str | None = None, workers: int | None = None) -> ProcessResult:
+    return await io_executor.run_write(process_all, mode, workers)
@@ -0,0 +1,225 @@
+"""
+frontmatter.py — Single-pass parser for the vault's `---` delimited Markdown headers.
+
+parse_document() finds the opening and closing delimiters with compiled regexes
+and only looks at the header slice, so the body is never split into lines or
+copied; callers get its start offset instead. parse_file() memoizes the header
+of on-disk files in an LRU keyed by (path, mtime_ns, size), reading them with
+read_header(), which stops once the header and a short body snippet are in hand.
+"""
+
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+
+_OPEN = re.compile(r"\s*---[ \t]*\r?\n")
+_CLOSE = re.compile(r"^[ \t]*---[ \t]*\r?$", re.M)
+_FIELD = re.compile(r"^([^:\r\n]*):(.*)$", re.M)
+
+_INT = re.compile(r"[+-]?\d+")
+_DATE = re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:[ T](\d{2}):(\d{2})(?::(\d{2}))?(?:Z| UTC)?)?")
+
+SNIPPET_CHARS = 200
+HEADER_CHUNK_CHARS = 2048
+# Give up looking for a closing delimiter after this much text (treated as no frontmatter).
+MAX_HEADER_CHARS = 64 * 1024
+
+# A file rewritten within one coarse clock tick keeps its (mtime_ns, size), so
+# results for files modified this recently are never served from the cache.
+RACY_WINDOW_NS = 1_000_000_000
+
+
+def parse_document(text: str, typed: bool = False) -> tuple[dict[str, Any], int]:
+    """Parse the frontmatter of a document.
+
+    Returns (meta, body_start). body_start is 0 when the text has no complete
+    frontmatter block, in which case the whole text is body. With typed=True,
+    values are converted by coerce_value() (lists, dates, ints, booleans).
+    """
+    opening = _OPEN.match(text)
+    if opening is None:
+        return {}, 0
+    closing = _CLOSE.search(text, opening.end())
+    if closing is None:
+        return {}, 0
+
+    header = text[opening.end():closing.start()]
+    if typed:
+        meta = {k.strip(): coerce_value(v.strip()) for k, v in _FIELD.findall(header)}
+    else:
+        meta = {k.strip(): v.strip() for k, v in _FIELD.findall(header)}
+
+    body_start = closing.end()
+    if text.startswith("\n", body_start):
+        body_start += 1
+    return meta, body_start
+
+
+def read_header(
+    path: Path,
+    snippet_chars: int = SNIPPET_CHARS,
+    chunk_chars: int = HEADER_CHUNK_CHARS,
+) -> "ParsedHeader":
+    """Read just enough of a file for its frontmatter and a body snippet.
+
+    Reads in chunks until the closing `---` plus `snippet_chars` of body are
+    available (or EOF), so the I/O per file is bounded regardless of body size.
+    The result matches parse_document() + get_body()[:snippet_chars] on the whole file.
+    """
+    with open(path, encoding="utf-8") as f:
+        text = ""
+        eof = False
+        while not eof:
+            chunk = f.read(chunk_chars)
+            eof = len(chunk) < chunk_chars
+            text += chunk
+
+            head = text.lstrip()
+            if not head:
+                continue
+            first_nl = head.find("\n")
+            if not head.startswith("---") or (first_nl != -1 and head[:first_nl].strip() != "---"):
+                # No frontmatter: the raw text is the body.
+                if eof or len(text) >= snippet_chars:
+                    return ParsedHeader({}, 0, text[:snippet_chars])
+                continue
+
+            meta, body_start = parse_document(text)
+            if not body_start:
+                if len(text) > MAX_HEADER_CHARS:
+                    return ParsedHeader({}, 0, text[:snippet_chars])
+                continue
+            # A "---" at the very end of a partial read may still grow into another line.
+            if body_start == len(text) and not (eof or text.endswith("\n")):
+                continue
+            body = text[body_start:].strip()
+            if eof or len(body) >= snippet_chars:
+                return ParsedHeader(meta, body_start, body[:snippet_chars])
+
+    # EOF without a complete frontmatter block: the whole file is body.
+    return ParsedHeader({}, 0, text[:snippet_chars])
+
+
+def get_body(text: str, body_start: int) -> str:
+    """Return the stripped body for a parse_document() result."""
+    return text[body_start:].strip() if body_start else text
+
+
+def coerce_value(value: str) -> Any:
+    """Convert a raw frontmatter value to list / datetime / date / int / bool where it looks like one."""
+    if not value:
+        return value
+    if value[0] == "[" and value[-1] == "]":
+        try:
+            return json.loads(value)
+        except ValueError:
+            return [v.strip().strip("'\"") for v in value[1:-1].split(",") if v.strip()]
+    if value in ("true", "false"):
+        return value == "true"
+    if _INT.fullmatch(value):
+        return int(value)
+    match = _DATE.fullmatch(value)
+    if match:
+        parts = [int(p) for p in match.groups(default="0")]
+        try:
+            if match.group(4) is None:
+                return date(*parts[:3])
+            return datetime(*parts, tzinfo=timezone.utc)
+        except ValueError:
+            return value
+    return value
+
+
+def as_datetime(value: Any) -> datetime | None:
+    """A frontmatter date/datetime value as an aware datetime (UTC if naive), else None."""
+    if isinstance(value, str):
+        value = coerce_value(value)
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+    return None
+
+
+# ── Parse cache ─────────────────────────────────────────────────────────────
+
+
+class ParsedHeader:
+    """The cached, body-free result of parsing a file."""
+
+    __slots__ = ("meta", "body_start", "snippet")
+
+    def __init__(self, meta: dict[str, Any], body_start: int, snippet: str):
+        self.meta = meta
+        self.body_start = body_start
+        self.snippet = snippet
+
+
+class _LRU:
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple, ParsedHeader] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple) -> ParsedHeader | None:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: tuple, value: ParsedHeader):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+
+_cache = _LRU(settings.PARSE_CACHE_SIZE)
+
+
+def parse_file(path: Path, mtime_ns: int | None = None, size: int | None = None) -> ParsedHeader:
+    """Parse a file's frontmatter, memoized by (path, mtime_ns, size).
+
+    Pass mtime_ns/size when the caller already has a stat result to skip one syscall.
+    """
+    if mtime_ns is None or size is None:
+        st = path.stat()
+        mtime_ns, size = st.st_mtime_ns, st.st_size
+    key = (str(path), mtime_ns, size)
+    racy = time.time_ns() - mtime_ns < RACY_WINDOW_NS
+    if not racy:
+        cached = _cache.get(key)
+        if cached is not None:
+            return cached
+
+    parsed = read_header(path)
+    if not racy:
+        _cache.put(key, parsed)
+    return parsed
+
+
+def cache_info() -> dict[str, int]:
+    return {"size": len(_cache._data), "maxsize": _cache.maxsize, "hits": _cache.hits, "misses": _cache.misses}
+
+
+def clear_cache():
+    _cache.clear()
@@ -0,0 +1,218 @@
+"""
+handbook_rules.py — Routing rules compiled from Company_Handbook.md.
+
+The handbook's Autonomy Thresholds table, Financial Rules and Priority
+Keywords sections are parsed once into a HandbookRules object: approval
+thresholds per item type and the keyword matcher. Routing an item is then a
+dict lookup and a comparison.
+
+Compiled rules are cached against the handbook's (mtime, size); PUT
+/api/handbook drops the cache explicitly, and edits made outside the API
+(e.g. in Obsidian) are picked up by the mtime check. When the compiled rules
+change, on_change() listeners are told so that state ranked by them (the
+Needs_Action listing's keyword priority) is rebuilt. Anything the handbook
+does not define falls back to the built-in defaults, which match the
+processor's behaviour before the handbook was consulted: payments always
+need approval, and the keyword list from keyword_matcher.
+"""
+
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable
+
+from app.config import settings
+from app.services.keyword_matcher import KEYWORD_CATEGORIES, KeywordMatcher
+
+logger = logging.getLogger("handbook-rules")
+
+HANDBOOK_FILE = "Company_Handbook.md"
+
+_SECTION_RE = re.compile(r"^##\s+(?:\d+\.\s*)?(.+?)\s*$")
+_BULLET_RE = re.compile(r"^\s*[-*]\s*\*\*(.+?)\*\*\s*:\s*(.+?)\s*$")
+_THRESHOLD_RE = re.compile(r"^(.*?)\s*(>=|≥|>)\s*\$\s*([\d,]+(?:\.\d+)?)\s*$")
+_MONEY_RE = re.compile(r"\$\s*([\d,]+(?:\.\d+)?)")
+
+
+@dataclass(frozen=True)
+class ApprovalThreshold:
+    amount: float
+    inclusive: bool = True  # ">=" in the handbook; ">" / "above" is exclusive
+
+    def exceeded_by(self, amount: float) -> bool:
+        return amount > self.amount or (self.inclusive and amount == self.amount)
+
+
+@dataclass(frozen=True)
+class HandbookRules:
+    source: str  # "handbook" or "defaults"
+    approval_thresholds: dict[str, ApprovalThreshold]
+    keyword_categories: dict[str, tuple[str, ...]]
+    matcher: KeywordMatcher = field(repr=False, compare=False)
+
+    def needs_approval(self, item_type: str, keyword_categories: frozenset[str], amount: float | None = None) -> bool:
+        """Route one item: thresholded types compare the amount (unknown amount = approval),
+        emails need approval when any priority keyword category matched."""
+        threshold = self.approval_thresholds.get(item_type)
+        if threshold is not None:
+            return amount is None or threshold.exceeded_by(amount)
+        return item_type == "email" and bool(keyword_categories)
+
+
+def _make_rules(
+    source: str, thresholds: dict[str, ApprovalThreshold], categories: dict[str, tuple[str, ...]],
+) -> HandbookRules:
+    return HandbookRules(source, thresholds, categories, KeywordMatcher(categories))
+
+
+DEFAULT_RULES = _make_rules(
+    "defaults",
+    {"payment": ApprovalThreshold(0.0)},
+    dict(KEYWORD_CATEGORIES),
+)
+
+
+# ── Compiler ────────────────────────────────────────────────────────────────
+
+
+def _sections(text: str) -> dict[str, list[str]]:
+    """Split markdown into {lowercased "## " title without its number: lines}."""
+    sections: dict[str, list[str]] = {}
+    current: list[str] | None = None
+    for line in text.splitlines():
+        m = _SECTION_RE.match(line)
+        if m:
+            current = sections.setdefault(m.group(1).lower(), [])
+        elif current is not None:
+            current.append(line)
+    return sections
+
+
+def _money(value: str) -> float:
+    return float(value.replace(",", ""))
+
+
+def _action_noun(action: str) -> str:
+    # "Send payment" -> "payment", "Issue refunds" -> "refund"
+    words = action.lower().split()
+    noun = words[-1] if words else ""
+    return noun[:-1] if noun.endswith("s") and len(noun) > 3 else noun
+
+
+def _parse_autonomy_table(lines: list[str]) -> dict[str, ApprovalThreshold]:
+    """Amount thresholds from "Send payment >= $100"-style rows that require approval."""
+    thresholds: dict[str, ApprovalThreshold] = {}
+    rows = [line.strip().strip("|").split("|") for line in lines if line.strip().startswith("|")]
+    for cells in rows[2:]:  # skip the header and the |---| separator
+        if len(cells) < 3:
+            continue
+        action, requires = cells[0].strip(), cells[2].strip().lower()
+        if requires != "yes":
+            continue
+        m = _THRESHOLD_RE.match(action)
+        if m:
+            thresholds[_action_noun(m.group(1))] = ApprovalThreshold(_money(m.group(3)), m.group(2) != ">")
+    return thresholds
+
+
+def _parse_financial_rules(lines: list[str]) -> dict[str, ApprovalThreshold]:
+    thresholds: dict[str, ApprovalThreshold] = {}
+    for line in lines:
+        lower = line.lower()
+        money = _MONEY_RE.search(line)
+        if not money:
+            continue
+        if "auto-approve threshold" in lower:
+            # "Requires owner approval: Any amount above $X" — strictly above.
+            thresholds.setdefault("payment", ApprovalThreshold(_money(money.group(1)), inclusive=False))
+        elif "refund" in lower and "approval" in lower:
+            thresholds.setdefault("refund", ApprovalThreshold(_money(money.group(1)), inclusive=False))
+    return thresholds
+
+
+def _parse_keywords(lines: list[str]) -> dict[str, tuple[str, ...]]:
+    categories: dict[str, tuple[str, ...]] = {}
+    for line in lines:
+        m = _BULLET_RE.match(line)
+        if m:
+            keywords = tuple(kw.strip().lower() for kw in m.group(2).split(",") if kw.strip())
+            if keywords:
+                categories[m.group(1).strip().lower()] = keywords
+    return categories
+
+
+def compile_rules(text: str) -> HandbookRules:
+    """Compile handbook markdown into HandbookRules, falling back to defaults per rule."""
+    sections = _sections(text)
+    thresholds = _parse_autonomy_table(sections.get("autonomy thresholds", []))
+    for noun, threshold in _parse_financial_rules(sections.get("financial rules", [])).items():
+        thresholds.setdefault(noun, threshold)
+    for noun, threshold in DEFAULT_RULES.approval_thresholds.items():
+        thresholds.setdefault(noun, threshold)
+    categories = _parse_keywords(sections.get("priority keywords", [])) or DEFAULT_RULES.keyword_categories
+    return _make_rules("handbook", thresholds, categories)
+
+
+# ── Cache ───────────────────────────────────────────────────────────────────
+
+_lock = threading.Lock()
+_cached: tuple[Path, tuple[int, int] | None, HandbookRules] | None = None
+_current: HandbookRules = DEFAULT_RULES
+_revision = 0
+_listeners: list[Callable[[], None]] = []
+
+
+def on_change(listener: Callable[[], None]):
+    """Call listener (no arguments) whenever the compiled rules change.
+
+    For state derived from the rules, such as listings ranked by keyword
+    priority. Listeners run in the thread that noticed the change, outside
+    this module's lock.
+    """
+    _listeners.append(listener)
+
+
+def get_rules(vault_path: Path | None = None) -> HandbookRules:
+    """Return the compiled rules for the vault's handbook, recompiling only when it changed."""
+    global _cached, _current, _revision
+    path = (vault_path or settings.vault_dir) / HANDBOOK_FILE
+    try:
+        st = path.stat()
+        key = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        key = None
+    cached = _cached
+    if cached is not None and cached[0] == path and cached[1] == key:
+        return cached[2]
+    with _lock:
+        if _cached is not None and _cached[0] == path and _cached[1] == key:
+            return _cached[2]
+        rules = DEFAULT_RULES if key is None else compile_rules(path.read_text(encoding="utf-8"))
+        _cached = (path, key, rules)
+        changed = rules != _current
+        if changed:
+            _current = rules
+            _revision += 1
+    if changed:
+        for listener in _listeners:
+            try:
+                listener()
+            except Exception:
+                logger.exception("Handbook rules listener failed")
+    return rules
+
+
+def version() -> int:
+    """A counter that moves whenever the compiled rules change (recompiling first if the handbook did)."""
+    get_rules()
+    return _revision
+
+
+def invalidate():
+    """Drop the compiled rules and recompile (called after the handbook is rewritten)."""
+    global _cached
+    with _lock:
+        _cached = None
+    get_rules()
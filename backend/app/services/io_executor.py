@@ -0,0 +1,81 @@
+"""
+io_executor.py — Dedicated thread pools for blocking vault I/O from async handlers.
+
+Route handlers are `async def` and hand their filesystem work to these pools
+rather than FastAPI's shared default threadpool. Reads and writes get separate
+pools (settings.IO_READ_WORKERS / IO_WRITE_WORKERS), so a burst of writes
+queues behind other writes while list and dashboard reads keep flowing, and
+handlers that do no I/O at all (health, jobs) answer straight from the event loop.
+
+Each call's queue wait and run time, and each pool's backlog, are exported as
+metrics (vault_io_*).
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+from app.config import settings
+from app.services import metrics
+
+_pools: dict[str, ThreadPoolExecutor] = {}
+_lock = threading.Lock()
+
+
+def _pool(kind: str) -> ThreadPoolExecutor:
+    with _lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            size = settings.IO_READ_WORKERS if kind == "read" else settings.IO_WRITE_WORKERS
+            pool = _pools[kind] = ThreadPoolExecutor(max_workers=size, thread_name_prefix=f"vault-{kind}")
+            metrics.IO_QUEUED.labels(kind).set_function(pool._work_queue.qsize)
+        return pool
+
+
+def _timed(kind: str, submitted: float, fn: Callable[[], Any]) -> Any:
+    start = time.perf_counter()
+    metrics.IO_WAIT_SECONDS.labels(kind).observe(start - submitted)
+    try:
+        return fn()
+    finally:
+        metrics.IO_SECONDS.labels(kind).observe(time.perf_counter() - start)
+
+
+async def _run(kind: str, fn: Callable[[], Any]) -> Any:
+    return await asyncio.get_running_loop().run_in_executor(_pool(kind), _timed, kind, time.perf_counter(), fn)
+
+
+async def run_read(fn: Callable[..., Any], /, *args, **kwargs) -> Any:
+    """Run a blocking read (listing, parsing, stat) on the read pool."""
+    return await _run("read", partial(fn, *args, **kwargs))
+
+
+async def run_write(fn: Callable[..., Any], /, *args, **kwargs) -> Any:
+    """Run a blocking write (create, move, rewrite) on the write pool."""
+    return await _run("write", partial(fn, *args, **kwargs))
+
+
+def submit_read(fn: Callable[..., Any], /, *args, **kwargs) -> Future:
+    """run_read() for callers outside the event loop (index listeners, loop callbacks)."""
+    return _pool("read").submit(_timed, "read", time.perf_counter(), partial(fn, *args, **kwargs))
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """Configured size and queued work items per pool (for diagnostics)."""
+    with _lock:
+        return {
+            kind: {"workers": pool._max_workers, "queued": pool._work_queue.qsize()}
+            for kind, pool in _pools.items()
+        }
+
+
+def shutdown():
+    """Stop the pools (app shutdown); they are recreated on next use."""
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
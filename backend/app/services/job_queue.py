@@ -0,0 +1,199 @@
+"""
+job_queue.py — In-process background jobs for long-running vault operations.
+
+submit() records a job and hands it to the worker tasks that the app lifespan
+starts with run(). Each job body runs in a thread and receives a JobContext
+for reporting progress and noticing cancellation; cancelling a queued job
+drops it, cancelling a running one asks the body to stop at its next check.
+Finished jobs stay pollable until they fall out of a bounded history
+(settings.JOB_HISTORY_SIZE); queued and running jobs are never evicted.
+"""
+
+import asyncio
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from pydantic import BaseModel
+
+from app.config import settings
+from app.models.job import Job, JobProgress
+from app.services import events
+
+logger = logging.getLogger("jobs")
+
+FINISHED_STATUSES = ("succeeded", "failed", "cancelled")
+
+
+class JobCancelled(Exception):
+    """Raised by JobContext.check_cancelled() to abandon a cancelled job."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+
+
+class JobContext:
+    """Progress reporting and cooperative cancellation for one running job."""
+
+    def __init__(self, job: Job, lock: threading.Lock):
+        self._job = job
+        self._lock = lock
+        self._cancel = threading.Event()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    def set_total(self, total: int):
+        with self._lock:
+            self._job.progress.total = total
+
+    def advance(self, ok: bool = True, count: int = 1):
+        with self._lock:
+            self._job.progress.done += count
+            if not ok:
+                self._job.progress.failed += count
+
+
+JobFn = Callable[[JobContext], Any]
+
+
+class _Entry:
+    __slots__ = ("job", "fn", "ctx")
+
+    def __init__(self, job: Job, fn: JobFn, ctx: JobContext):
+        self.job = job
+        self.fn = fn
+        self.ctx = ctx
+
+
+class JobQueue:
+    """Job registry plus the asyncio workers that execute queued jobs."""
+
+    def __init__(self, history_size: int):
+        self.history_size = history_size
+        self._lock = threading.Lock()
+        self._jobs: OrderedDict[str, _Entry] = OrderedDict()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: asyncio.Queue[_Entry] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    # ── Client API (any thread) ──────────────────────────────────────────────
+
+    def submit(self, kind: str, fn: JobFn) -> Job:
+        """Queue fn(ctx) to run in the background. Raises RuntimeError if the workers are not running."""
+        with self._lock:
+            loop, pending = self._loop, self._pending
+            if loop is None:
+                raise RuntimeError("Job queue is not running")
+            job = Job(
+                id=uuid.uuid4().hex[:12],
+                kind=kind,
+                status="queued",
+                progress=JobProgress(),
+                created=_now(),
+            )
+            entry = _Entry(job, fn, JobContext(job, self._lock))
+            self._jobs[job.id] = entry
+            self._trim()
+            snapshot = job.model_copy(deep=True)
+        loop.call_soon_threadsafe(pending.put_nowait, entry)
+        return snapshot
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            return entry.job.model_copy(deep=True) if entry else None
+
+    def list(self) -> list[Job]:
+        """All retained jobs, newest first."""
+        with self._lock:
+            return [e.job.model_copy(deep=True) for e in reversed(self._jobs.values())]
+
+    def cancel(self, job_id: str) -> Job | None:
+        """Cancel a queued job, or ask a running one to stop. Finished jobs are left as they are."""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+            if entry.job.status == "queued":
+                self._finish(entry, "cancelled")
+            elif entry.job.status == "running":
+                entry.ctx._cancel.set()
+            return entry.job.model_copy(deep=True)
+
+    # ── Workers (lifespan) ───────────────────────────────────────────────────
+
+    async def run(self, workers: int):
+        """Execute queued jobs with `workers` concurrent workers until cancelled."""
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._pending = asyncio.Queue()
+        try:
+            await asyncio.gather(*(self._worker() for _ in range(max(1, workers))))
+        finally:
+            with self._lock:
+                self._loop = self._pending = None
+                for entry in self._jobs.values():
+                    if entry.job.status == "queued":
+                        self._finish(entry, "cancelled", error="Server shutting down")
+                    elif entry.job.status == "running":
+                        entry.ctx._cancel.set()
+
+    async def _worker(self):
+        while True:
+            entry = await self._pending.get()
+            with self._lock:
+                if entry.job.status != "queued":
+                    continue
+                entry.job.status = "running"
+                entry.job.started = _now()
+
+            status, result, error = "succeeded", None, None
+            try:
+                result = await asyncio.to_thread(entry.fn, entry.ctx)
+            except JobCancelled:
+                status = "cancelled"
+            except Exception as e:
+                logger.exception("[Jobs] %s job %s failed", entry.job.kind, entry.job.id)
+                status, error = "failed", str(e)
+            else:
+                if entry.ctx.cancelled:
+                    status = "cancelled"
+            if isinstance(result, BaseModel):
+                result = result.model_dump()
+
+            with self._lock:
+                self._finish(entry, status, result, error)
+                self._trim()
+            events.publish("job_finished", id=entry.job.id, kind=entry.job.kind, status=status)
+
+    # ── Internals (lock held) ────────────────────────────────────────────────
+
+    @staticmethod
+    def _finish(entry: _Entry, status: str, result: Any = None, error: str | None = None):
+        entry.job.status = status
+        entry.job.result = result
+        entry.job.error = error
+        entry.job.finished = _now()
+
+    def _trim(self):
+        excess = len(self._jobs) - self.history_size
+        if excess <= 0:
+            return
+        for job_id in [jid for jid, e in self._jobs.items() if e.job.status in FINISHED_STATUSES][:excess]:
+            del self._jobs[job_id]
+
+
+jobs = JobQueue(settings.JOB_HISTORY_SIZE)
@@ -0,0 +1,67 @@
+"""
+keyword_matcher.py — Shared matcher for the priority/approval keywords.
+
+Used by the file processor (priority and approval routing) and the watchers
+(priority of new action files). One call lowercases the text once and
+returns every keyword category present, so callers that need both the
+priority and the approval decision scan an item only once.
+
+A keyword matches at the start of a word ("cancel" matches "Cancelled" and
+"cancellation", but not "scancel"), so inflected forms keep routing as before.
+Matching uses str.find over the lowercased text: in CPython, the C substring
+search over a few keywords beats a single alternation regex by 3-5x on large
+bodies (see benchmarks/bench_keywords.py).
+"""
+
+from collections.abc import Mapping, Sequence
+
+KEYWORD_CATEGORIES: dict[str, tuple[str, ...]] = {
+    "urgent": ("urgent", "asap", "immediately", "emergency"),
+    "financial": ("invoice", "payment", "overdue", "refund"),
+    "complaint": ("complaint", "unhappy", "cancel"),
+}
+
+PRIORITY_KEYWORDS = [kw for keywords in KEYWORD_CATEGORIES.values() for kw in keywords]
+
+
+class KeywordMatcher:
+    """Find which keyword categories occur in some text, in one pass per keyword."""
+
+    def __init__(self, categories: Mapping[str, Sequence[str]]):
+        self._groups = tuple(
+            (category, tuple(kw.lower() for kw in keywords)) for category, keywords in categories.items()
+        )
+
+    @staticmethod
+    def _contains_word_start(text: str, keyword: str) -> bool:
+        i = text.find(keyword)
+        while i != -1:
+            if i == 0 or not text[i - 1].isalnum():
+                return True
+            i = text.find(keyword, i + 1)
+        return False
+
+    def scan(self, *texts: str) -> frozenset[str]:
+        """Return the categories with at least one keyword in any of `texts`."""
+        text = " ".join(texts).lower()
+        return frozenset(
+            category
+            for category, keywords in self._groups
+            if any(self._contains_word_start(text, kw) for kw in keywords)
+        )
+
+    def matches(self, *texts: str) -> bool:
+        """True if any keyword occurs; stops at the first hit."""
+        text = " ".join(texts).lower()
+        return any(self._contains_word_start(text, kw) for _, keywords in self._groups for kw in keywords)
+
+
+matcher = KeywordMatcher(KEYWORD_CATEGORIES)
+
+
+def scan(*texts: str) -> frozenset[str]:
+    return matcher.scan(*texts)
+
+
+def matches(*texts: str) -> bool:
+    return matcher.matches(*texts)
@@ -0,0 +1,206 @@
+"""
+listing.py — Cursor pagination, filtering and field projection for vault list endpoints.
+
+Pages are read from the VaultIndex's presorted views, so fetching one costs a
+bisect plus the entries on (or filtered out before) the page, however large
+the folder is. Only the entries on the returned page become response models.
+With the metadata store enabled, the same page is one indexed SQL query, the
+filters becoming WHERE clauses.
+
+Cursors are opaque to clients: the URL-safe base64 of the last returned sort
+key, so a page boundary stays put when items are added or removed elsewhere.
+
+query_page_cached() serves pages through the response cache, versioned by the
+folder's index generation (and the listing's rules version), so repeated polls of an unchanged folder are a
+tuple compare (and a 304 for clients that send the ETag back). Its pages are
+encoded straight from the response models (serialization.dump_models), never
+passing through dicts or FastAPI's response validation.
+"""
+
+import base64
+import binascii
+import json
+from typing import Callable, Hashable
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from app.services import metadata_store, response_cache, serialization
+from app.services.frontmatter import as_datetime
+from app.services.vault_index import IndexEntry, SortKey, get_index
+
+MAX_PAGE_SIZE = 1000
+
+
+class Listing:
+    """How one vault folder is listed.
+
+    attrs maps the filterable attributes ("priority", "type", "sender", "date")
+    to accessors over an entry's frontmatter, mirroring what to_model() reports.
+    If priority_rank is given, the sort key starts with priority_rank(priority),
+    which lets a single-priority filter jump straight to its range.
+    rules_version, if given, returns a token that changes whenever something
+    outside the folder's files (the handbook) changes what to_model() or the
+    sort key report; it is part of query_page_cached()'s cache version.
+    """
+
+    def __init__(
+        self,
+        folder: str,
+        model: type[BaseModel],
+        to_model: Callable[[IndexEntry], BaseModel],
+        sort_key: SortKey,
+        attrs: dict[str, Callable[[IndexEntry], str]],
+        priority_rank: Callable[[str], int] | None = None,
+        rules_version: Callable[[], Hashable] | None = None,
+    ):
+        self.folder = folder
+        self.model = model
+        self.to_model = to_model
+        self.sort_key = sort_key
+        self.attrs = attrs
+        self.priority_rank = priority_rank
+        self.rules_version = rules_version
+        metadata_store.register_listing(self)
+
+
+def encode_cursor(key: tuple) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple:
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    if not isinstance(key, list) or not key:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return tuple(key)
+
+
+def _split(value: str | None) -> set[str]:
+    return {v.strip().lower() for v in value.split(",") if v.strip()} if value else set()
+
+
+def fetch_page(
+    listing: Listing,
+    limit: int | None = None,
+    cursor: str | None = None,
+    priority: str | None = None,
+    type: str | None = None,
+    sender: str | None = None,
+    since: str | None = None,
+) -> tuple[list[BaseModel], str | None]:
+    """Return one page of response models and the cursor for the next page (None at the end).
+
+    priority and type take comma-separated values; sender is a case-insensitive
+    substring; since is an ISO date or datetime compared with the item's date.
+    Raises ValueError for an invalid cursor or since value.
+    """
+    attrs = listing.attrs
+    checks: list[Callable[[IndexEntry], bool]] = []
+    priorities, types = _split(priority), _split(type)
+    if priorities:
+        checks.append(lambda e: attrs["priority"](e).lower() in priorities)
+    if types:
+        checks.append(lambda e: attrs["type"](e).lower() in types)
+    if sender:
+        needle = sender.casefold()
+        checks.append(lambda e: needle in attrs["sender"](e).casefold())
+    since_dt = None
+    if since:
+        since_dt = as_datetime(since)
+        if since_dt is None:
+            raise ValueError(f"Invalid since value (expected an ISO date or datetime): {since}")
+
+        def recent_enough(e: IndexEntry) -> bool:
+            item_dt = as_datetime(attrs["date"](e))
+            return item_dt is not None and item_dt >= since_dt
+
+        checks.append(recent_enough)
+
+    after = decode_cursor(cursor) if cursor else None
+    try:
+        until = None
+        if listing.priority_rank and len(priorities) == 1:
+            # The sort key leads with the priority rank: only walk that rank's range.
+            rank = listing.priority_rank(next(iter(priorities)))
+            if after is None or after < (rank,):
+                after = (rank,)
+            until = (rank + 1,)
+
+        store = metadata_store.get_store()
+        if store is not None:
+            store.sync(listing.folder)
+            selected, more = store.select(
+                listing.folder,
+                after=after,
+                until=until,
+                limit=limit,
+                priorities=priorities,
+                types=types,
+                sender=sender,
+                since=since_dt,
+            )
+        else:
+            selected, more = get_index().select(
+                listing.folder,
+                listing.sort_key,
+                after=after,
+                until=until,
+                limit=limit,
+                predicate=(lambda e: all(check(e) for check in checks)) if checks else None,
+            )
+    except TypeError:
+        # A cursor whose key does not compare with this listing's sort keys.
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    items = [listing.to_model(entry) for _, entry in selected]
+    next_cursor = encode_cursor(selected[-1][0]) if more else None
+    return items, next_cursor
+
+
+def _include(listing: Listing, fields: str | None) -> set[str] | None:
+    if not fields:
+        return None
+    include = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = include - set(listing.model.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return include
+
+
+def dump_page(listing: Listing, items: list[BaseModel], fields: str | None = None) -> list[dict]:
+    """Serialise a page, keeping only the comma-separated `fields` if given."""
+    include = _include(listing, fields)
+    return [item.model_dump(include=include) for item in items]
+
+
+def encode_page(listing: Listing, items: list[BaseModel], fields: str | None = None) -> bytes:
+    """dump_page() straight to JSON bytes."""
+    return serialization.dump_models(listing.model, items, _include(listing, fields))
+
+
+def query_page(listing: Listing, fields: str | None = None, **filters) -> tuple[list[dict], str | None]:
+    """fetch_page() + dump_page(): one serialised page and the next-page cursor."""
+    items, next_cursor = fetch_page(listing, **filters)
+    return dump_page(listing, items, fields), next_cursor
+
+
+async def query_page_cached(request: Request, listing: Listing, fields: str | None = None, **filters) -> Response:
+    """query_page() as a conditional response, with the next-page cursor in X-Next-Cursor.
+
+    Raises ValueError for bad filters or cursors, like query_page().
+    """
+
+    def build() -> response_cache.Payload:
+        items, next_cursor = fetch_page(listing, **filters)
+        content = encode_page(listing, items, fields)
+        return response_cache.Payload(content, headers={"X-Next-Cursor": next_cursor} if next_cursor else {})
+
+    def version() -> tuple:
+        # Rules first: a recompile re-ranks the folder and moves its generation.
+        rules = listing.rules_version() if listing.rules_version else None
+        return rules, get_index().version(listing.folder)
+
+    return await response_cache.conditional(request, version, build)
@@ -0,0 +1,465 @@
+"""
+metadata_store.py — Optional SQLite mirror of vault metadata (METADATA_STORE=true).
+
+The Markdown files stay the source of truth. The store (.state/metadata.db,
+WAL mode) keeps one row per indexed file: stat, frontmatter, snippet, and the
+sort/filter columns of the folder's listing (priority rank, priority, type,
+sender, date). List pages, filters, and dashboard counts, alerts and activity
+then become indexed SQL queries instead of walks over in-memory folders.
+
+The store subscribes to VaultIndex change events. Every service write path
+and the filesystem watcher already report their changes through touch(), so
+nothing writes to the store directly. Changes are buffered and written in one
+transaction when the buffer fills, or before the next query.
+
+A row is not rewritten while its (mtime_ns, size) still matches the file, so
+reconciling at startup only re-reads files that changed while the app was
+down. Rows for files deleted in the meantime are dropped. rebuild()
+recreates every row from disk. It is exposed as POST /api/vault/metadata/rebuild
+and as `python -m app.services.metadata_store rebuild`.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+from app.config import settings
+from app.models.vault import MetadataStoreStatus
+from app.services.frontmatter import as_datetime
+from app.services.job_queue import JobContext
+from app.services.vault_index import IndexEntry, VaultIndex, get_index
+
+logger = logging.getLogger("metadata-store")
+
+STORE_FILE = ".state/metadata.db"
+SCHEMA_VERSION = 1
+FLUSH_SIZE = 1000
+
+# Everything but Inbox, whose files are arbitrary drops rather than vault Markdown.
+MIRRORED_FOLDERS = (
+    "Needs_Action", "In_Progress", "Plans", "Pending_Approval", "Approved", "Rejected", "Done",
+    "Logs", "Briefings", "Accounting",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS items (
+    folder      TEXT    NOT NULL,
+    name        TEXT    NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    size        INTEGER NOT NULL,
+    meta        TEXT    NOT NULL,
+    body_offset INTEGER NOT NULL,
+    snippet     TEXT    NOT NULL,
+    rank        INTEGER NOT NULL,
+    priority    TEXT    NOT NULL,  -- lowercased
+    type        TEXT    NOT NULL,  -- lowercased
+    sender      TEXT    NOT NULL,  -- casefolded
+    date        TEXT,              -- UTC %Y-%m-%dT%H:%M:%S.%f, NULL when missing or unparseable
+    PRIMARY KEY (folder, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS items_order ON items (folder, rank, name);
+CREATE INDEX IF NOT EXISTS items_age ON items (folder, mtime_ns);
+"""
+
+_COLUMNS = "name, mtime_ns, size, meta, body_offset, snippet, rank"
+
+# folder -> Listing (duck-typed: attrs, priority_rank), registered by listing.Listing
+_listings: dict[str, Any] = {}
+
+
+def register_listing(listing: Any):
+    """Use a listing's attrs and priority rank for the sort/filter columns of its folder."""
+    _listings[listing.folder] = listing
+
+
+def _date_key(value: Any) -> str | None:
+    dt = as_datetime(value)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f") if dt else None
+
+
+def _columns(folder: str, entry: IndexEntry) -> tuple[int, str, str, str, str | None]:
+    listing = _listings.get(folder)
+    if listing is None:
+        meta = entry.meta
+        rank = 0
+        priority = meta.get("priority", "normal")
+        item_type = meta.get("type", "unknown")
+        sender = meta.get("from", meta.get("sender", ""))
+        when = meta.get("received", meta.get("date", meta.get("created", "")))
+    else:
+        attrs = listing.attrs
+        priority, item_type, sender, when = (attrs[a](entry) for a in ("priority", "type", "sender", "date"))
+        rank = listing.priority_rank(priority) if listing.priority_rank else 0
+    return rank, str(priority).lower(), str(item_type).lower(), str(sender).casefold(), _date_key(when)
+
+
+def _row(folder: str, entry: IndexEntry) -> tuple:
+    meta = entry.meta
+    return (
+        folder, entry.name, entry.mtime_ns, entry.size, json.dumps(meta), entry.body_offset, entry.snippet,
+        *_columns(folder, entry),
+    )
+
+
+_INSERT = "INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+def _bound(columns: tuple[str, ...], key: tuple, full_op: str, prefix_op: str) -> tuple[str, list]:
+    """SQL for (columns) compared with a sort key, which may be a prefix of the columns."""
+    if not key or len(key) > len(columns):
+        raise TypeError("sort key does not match the listing")
+    for column, value in zip(columns, key):
+        if not isinstance(value, int if column == "rank" else str) or isinstance(value, bool):
+            raise TypeError("sort key does not match the listing")
+    op = full_op if len(key) == len(columns) else prefix_op
+    return f"({', '.join(columns[:len(key)])}) {op} ({', '.join('?' * len(key))})", list(key)
+
+
+class MetadataStore:
+    """SQLite mirror of one vault's VaultIndex, kept current from its change events."""
+
+    def __init__(self, index: VaultIndex, path: Path | None = None):
+        self.index = index
+        self.root = index.root
+        self.path = path or index.root / STORE_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._conn = self._connect()
+        self._readers: list[sqlite3.Connection] = []
+        self._local = threading.local()
+        self._pending: dict[tuple[str, str], IndexEntry | None] = {}
+        self._stored: dict[str, dict[str, tuple[int, int]]] = {}
+        self._init_schema()
+        index.subscribe(self._on_event)
+
+    # ── Connections ──────────────────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        """This thread's read connection; under WAL, reads never wait for the writer."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._lock:
+                self._readers.append(conn)
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._conn
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    def _init_schema(self):
+        version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+        with self._transaction() as conn:
+            if version != SCHEMA_VERSION:
+                # Only a mirror: an older layout is dropped and refilled from the vault.
+                conn.execute("DROP TABLE IF EXISTS items")
+            for statement in _SCHEMA.split(";"):
+                if statement.strip():
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    @property
+    def journal_mode(self) -> str:
+        return self._reader().execute("PRAGMA journal_mode").fetchone()[0]
+
+    def close(self):
+        self.index.unsubscribe(self._on_event)
+        with self._lock:
+            self._flush()
+            for conn in (*self._readers, self._conn):
+                conn.close()
+            self._readers.clear()
+
+    # ── Sync ─────────────────────────────────────────────────────────────────
+
+    def _stored_stats(self, folder: str) -> dict[str, tuple[int, int]]:
+        stored = self._stored.get(folder)
+        if stored is None:
+            rows = self._conn.execute("SELECT name, mtime_ns, size FROM items WHERE folder = ?", (folder,))
+            stored = self._stored[folder] = {name: (mtime_ns, size) for name, mtime_ns, size in rows}
+        return stored
+
+    def _on_event(self, kind: str, folder: str, entry: IndexEntry):
+        if folder not in MIRRORED_FOLDERS:
+            return
+        with self._lock:
+            key = (folder, entry.name)
+            if kind == "removed":
+                self._pending[key] = None
+            elif self._stored_stats(folder).get(entry.name) == (entry.mtime_ns, entry.size):
+                # Row already matches the file (startup replay, or a remove+add that changed nothing).
+                self._pending.pop(key, None)
+            else:
+                self._pending[key] = entry
+            if len(self._pending) >= FLUSH_SIZE:
+                self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        pending, self._pending = self._pending, {}
+        deletes = [key for key, entry in pending.items() if entry is None]
+        rows = [_row(folder, entry) for (folder, _), entry in pending.items() if entry is not None]
+        with self._transaction() as conn:
+            conn.executemany("DELETE FROM items WHERE folder = ? AND name = ?", deletes)
+            conn.executemany(_INSERT, rows)
+        for folder, name in deletes:
+            self._stored_stats(folder).pop(name, None)
+        for row in rows:
+            self._stored_stats(row[0])[row[1]] = (row[2], row[3])
+
+    def flush(self):
+        """Write buffered changes."""
+        with self._lock:
+            self._flush()
+
+    def rekey(self, folder: str):
+        """Rewrite a folder's rows so their sort/filter columns follow the current listing rules."""
+        if folder not in MIRRORED_FOLDERS:
+            return
+        entries = self.index.entries(folder)  # before taking our lock: index events lock index, then store
+        with self._lock:
+            for entry in entries:
+                self._pending[(folder, entry.name)] = entry
+            self._flush()
+
+    def sync(self, *folders: str):
+        """Bring folders up to date with disk (via the index), then flush."""
+        self.index.sync(*folders)
+        self.flush()
+
+    def reconcile(self):
+        """Startup pass: sync every mirrored folder and drop rows for files that no longer exist."""
+        self.index.sync(*MIRRORED_FOLDERS)
+        with self._lock:
+            for folder in MIRRORED_FOLDERS:
+                present = {e.name for e in self.index.entries(folder)}
+                for name in self._stored_stats(folder).keys() - present:
+                    self._pending.setdefault((folder, name), None)
+            self._flush()
+
+    def rebuild(self, job: JobContext | None = None) -> int:
+        """Recreate every row from the files on disk. Returns the number of rows."""
+        files: list[tuple[str, os.DirEntry]] = []
+        for folder in MIRRORED_FOLDERS:
+            try:
+                with os.scandir(self.root / folder) as it:
+                    files += [(folder, de) for de in it if de.name.endswith(".md") and de.is_file()]
+            except FileNotFoundError:
+                continue
+        if job:
+            job.set_total(len(files))
+        with self._lock:
+            self._pending.clear()
+            self._stored.clear()
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM items")
+                for start in range(0, len(files), FLUSH_SIZE):
+                    if job:
+                        job.check_cancelled()
+                    rows = []
+                    for folder, de in files[start:start + FLUSH_SIZE]:
+                        try:
+                            st = de.stat()
+                        except FileNotFoundError:
+                            continue
+                        rows.append(_row(folder, IndexEntry(Path(de.path), st.st_mtime_ns, st.st_size)))
+                    conn.executemany(_INSERT, rows)
+                    if job:
+                        job.advance(count=len(rows))
+            count = self._conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        logger.info("[Metadata] Rebuilt %d rows from %s", count, self.root)
+        return count
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def _entry(self, folder: str, row: tuple) -> tuple[tuple, IndexEntry]:
+        name, mtime_ns, size, meta, body_offset, snippet, rank = row
+        entry = IndexEntry.preloaded(self.root / folder / name, mtime_ns, size, json.loads(meta), body_offset, snippet)
+        return ((rank, name) if folder_ranked(folder) else (name,)), entry
+
+    def select(
+        self,
+        folder: str,
+        after: tuple | None = None,
+        until: tuple | None = None,
+        limit: int | None = None,
+        priorities: set[str] | None = None,
+        types: set[str] | None = None,
+        sender: str | None = None,
+        since: Any = None,
+    ) -> tuple[list[tuple[tuple, IndexEntry]], bool]:
+        """SQL counterpart of VaultIndex.select() with the listing filters as WHERE clauses.
+
+        Keys are (rank, filename) for listings with a priority rank, else (filename,).
+        Raises TypeError for after/until keys that do not match that shape.
+        """
+        columns = ("rank", "name") if folder_ranked(folder) else ("name",)
+        where, params = ["folder = ?"], [folder]
+        if after is not None:
+            clause, values = _bound(columns, after, ">", ">=")
+            where.append(clause)
+            params += values
+        if until is not None:
+            clause, values = _bound(columns, until, "<", "<")
+            where.append(clause)
+            params += values
+        for column, values in (("priority", priorities), ("type", types)):
+            if values:
+                where.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params += sorted(values)
+        if sender:
+            where.append("instr(sender, ?) > 0")
+            params.append(sender.casefold())
+        if since is not None:
+            where.append("date >= ?")
+            params.append(_date_key(since))
+        sql = f"SELECT {_COLUMNS} FROM items WHERE {' AND '.join(where)} ORDER BY {', '.join(columns)}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit) + 1}"
+        rows = self._reader().execute(sql, params).fetchall()
+        more = limit is not None and len(rows) > limit
+        return [self._entry(folder, row) for row in rows[:limit]], more
+
+    def count(self, folder: str) -> int:
+        return self._reader().execute("SELECT COUNT(*) FROM items WHERE folder = ?", (folder,)).fetchone()[0]
+
+    def counts(self) -> dict[str, int]:
+        rows = self._reader().execute("SELECT folder, COUNT(*) FROM items GROUP BY folder")
+        return dict(rows.fetchall())
+
+    def count_between(self, folder: str, start_ns: int, end_ns: int) -> int:
+        return self._reader().execute(
+            "SELECT COUNT(*) FROM items WHERE folder = ? AND mtime_ns >= ? AND mtime_ns < ?",
+            (folder, start_ns, end_ns),
+        ).fetchone()[0]
+
+    def older_than(self, folder: str, cutoff_ns: int) -> list[str]:
+        """Filenames last modified before cutoff_ns, oldest first."""
+        rows = self._reader().execute(
+            "SELECT name FROM items WHERE folder = ? AND mtime_ns < ? ORDER BY mtime_ns, name",
+            (folder, cutoff_ns),
+        )
+        return [name for (name,) in rows]
+
+    def oldest_since(self, folder: str, cutoff_ns: int) -> int | None:
+        """The earliest mtime_ns at or after cutoff_ns (the next file to cross an age threshold)."""
+        return self._reader().execute(
+            "SELECT MIN(mtime_ns) FROM items WHERE folder = ? AND mtime_ns >= ?", (folder, cutoff_ns),
+        ).fetchone()[0]
+
+    def most_recent(self, folder: str, limit: int) -> list[tuple[int, str]]:
+        """(mtime_ns, filename) of the most recently modified files, newest first."""
+        rows = self._reader().execute(
+            "SELECT mtime_ns, name FROM items WHERE folder = ? ORDER BY mtime_ns DESC, name DESC LIMIT ?",
+            (folder, limit),
+        )
+        return rows.fetchall()
+
+
+def folder_ranked(folder: str) -> bool:
+    listing = _listings.get(folder)
+    return listing is not None and listing.priority_rank is not None
+
+
+_store: MetadataStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> MetadataStore | None:
+    """Return the store for the current vault, or None when METADATA_STORE is off.
+
+    The first call for a vault opens (or creates) the database and reconciles it with disk.
+    """
+    global _store
+    if not settings.METADATA_STORE:
+        return None
+    index = get_index()
+    with _store_lock:
+        if _store is None or _store.index is not index:
+            if _store is not None:
+                _store.close()
+            _store = MetadataStore(index)
+            _store.reconcile()
+        return _store
+
+
+def rekey(folder: str):
+    """MetadataStore.rekey() on the open store, if any (a store opened later is built fresh)."""
+    store = _store
+    if store is not None and store.index is get_index():
+        store.rekey(folder)
+
+
+def status() -> MetadataStoreStatus:
+    store = get_store()
+    if store is None:
+        return MetadataStoreStatus(enabled=False, path=str(settings.vault_dir / STORE_FILE))
+    store.flush()
+    folders = store.counts()
+    return MetadataStoreStatus(
+        enabled=True,
+        path=str(store.path),
+        journal_mode=store.journal_mode,
+        items=sum(folders.values()),
+        folders=folders,
+    )
+
+
+def rebuild(job: JobContext | None = None) -> str:
+    """Rebuild the current vault's store. Raises RuntimeError when METADATA_STORE is off."""
+    store = get_store()
+    if store is None:
+        raise RuntimeError("Metadata store is disabled (set METADATA_STORE=true)")
+    start = time.perf_counter()
+    count = store.rebuild(job)
+    return f"Metadata store rebuilt: {count} items in {(time.perf_counter() - start) * 1000:.0f} ms"
+
+
+def shutdown():
+    """Flush and close the store (app shutdown); it is reopened on next use."""
+    global _store
+    with _store_lock:
+        if _store is not None:
+            _store.close()
+            _store = None
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Maintain the vault metadata store.")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+
+    # The listings register their folders' sort/filter columns on import.
+    import app.main  # noqa: F401
+
+    store = MetadataStore(get_index())
+    try:
+        print(f"Rebuilt {store.rebuild()} rows in {store.path}")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
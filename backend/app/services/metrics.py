@@ -0,0 +1,295 @@
+"""
+metrics.py — In-process Prometheus metrics, served at GET /metrics.
+
+A small registry in place of prometheus_client (nothing to install or run
+next to the app): counters, gauges and histograms with fixed label names,
+rendered in the Prometheus text exposition format on each scrape. An update
+is one lock acquire on the labelled series, cheap enough for the hot paths
+that record them:
+
+    HTTP requests        ai_employee_http_requests_total / _request_duration_seconds (MetricsMiddleware)
+    processing           items_processed_total, item_process_duration_seconds, pipeline_lag_seconds
+    approvals            approvals_total, approval_duration_seconds
+    dashboard            dashboard_metrics_duration_seconds
+    filesystem watcher   watcher_events_total, inbox_files_total, inbox_file_duration_seconds, watcher_queue_depth
+    Gmail watcher        gmail_polls_total, gmail_poll_duration_seconds, gmail_api_requests_total,
+                         gmail_api_errors_total, watcher_events_total{watcher="gmail"}
+    vault I/O            vault_io_duration_seconds, vault_io_wait_seconds, vault_io_queued,
+                         vault_write_duration_seconds, vault_commit_duration_seconds
+
+Gauges can be bound to a callback that is read at scrape time (queue depths).
+Metrics live in the process that records them, so items handled by
+PROCESS_EXECUTOR=process workers are not counted.
+"""
+
+import math
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+PREFIX = "ai_employee_"
+
+# Seconds; the Prometheus client defaults
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Needs_Action -> Done can take from seconds (auto-processed) to days (waiting on approval)
+LAG_BUCKETS = (1, 10, 60, 300, 900, 3600, 4 * 3600, 12 * 3600, 86400, 3 * 86400, 7 * 86400)
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", r"\\").replace("\n", r"\n").replace('"', r"\"")
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Series:
+    __slots__ = ("lock", "value", "function")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.value = 0.0
+        self.function: Callable[[], float] | None = None
+
+    def inc(self, amount: float = 1.0):
+        with self.lock:
+            self.value += amount
+
+    def set(self, value: float):
+        with self.lock:
+            self.value = value
+
+    def set_function(self, function: Callable[[], float] | None):
+        """Read the value from `function` at scrape time (None to go back to set())."""
+        self.function = function
+
+    def get(self) -> float:
+        function = self.function
+        if function is not None:
+            try:
+                return float(function())
+            except Exception:
+                return math.nan
+        return self.value
+
+
+class _HistogramSeries:
+    __slots__ = ("lock", "bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.lock = threading.Lock()
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        i = bisect_left(self.bounds, value)
+        with self.lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._series: dict[tuple[str, ...], _Series | _HistogramSeries] = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _new(self) -> _Series | _HistogramSeries:
+        return _Series()
+
+    def labels(self, *values: str):
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} takes labels {self.labelnames}, got {values}")
+        series = self._series.get(values)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(values, self._new())
+        return series
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            series_by_labels = sorted(self._series.items())
+        for values, series in series_by_labels:
+            yield f"{self.name}{_labels(self.labelnames, values)} {_format(series.get())}"
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self._samples()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float] | None):
+        self.labels().set_function(function)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new(self) -> _HistogramSeries:
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _samples(self) -> Iterator[str]:
+        with self._lock:
+            series_by_labels = sorted(self._series.items())
+        for values, series in series_by_labels:
+            with series.lock:
+                counts, total = list(series.counts), series.sum
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                le = f'le="{_format(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, values)} {_format(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, values)} {cumulative}"
+
+
+_registry: list[_Metric] = []
+
+
+def render() -> str:
+    """Every metric with at least one series, in the text exposition format."""
+    return "\n".join(m.render() for m in _registry if m._series) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ── HTTP ─────────────────────────────────────────────────────────────────────
+
+HTTP_REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to answer an HTTP request.", ("method", "route"),
+)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording HTTP_REQUESTS / HTTP_REQUEST_SECONDS, labelled by route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Unmatched paths share one label so scanners cannot grow the series without bound.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUESTS.labels(method, route, str(status)).inc()
+            HTTP_REQUEST_SECONDS.labels(method, route).observe(time.perf_counter() - start)
+
+
+# ── Processing and approvals ─────────────────────────────────────────────────
+
+ITEMS_PROCESSED = Counter(
+    "items_processed_total", "Needs_Action items processed, by outcome (done, approval, not_found, conflict, error).",
+    ("outcome",),
+)
+ITEM_PROCESS_SECONDS = Histogram("item_process_duration_seconds", "Time to process one Needs_Action item.")
+PIPELINE_LAG = Histogram(
+    "pipeline_lag_seconds", "Time from an item's arrival in Needs_Action to Done, by path (direct, approval).",
+    ("path",), buckets=LAG_BUCKETS,
+)
+APPROVALS = Counter(
+    "approvals_total", "Approval decisions, by decision and outcome (ok, not_found, conflict, error).",
+    ("decision", "outcome"),
+)
+APPROVAL_SECONDS = Histogram("approval_duration_seconds", "Time to apply an approval decision.", ("decision",))
+DASHBOARD_SECONDS = Histogram(
+    "dashboard_metrics_duration_seconds", "Time to compute dashboard metrics, by source (aggregator, store).",
+    ("source",),
+)
+
+# ── Watchers ─────────────────────────────────────────────────────────────────
+
+WATCHER_EVENTS = Counter(
+    "watcher_events_total", "Events seen by the watchers (filesystem: Inbox events, gmail: new messages).",
+    ("watcher",),
+)
+WATCHER_QUEUE_DEPTH = Gauge("watcher_queue_depth", "Paths waiting in a watcher's intake queue.", ("watcher",))
+INBOX_FILES = Counter(
+    "inbox_files_total", "Settled Inbox files handled, by outcome (created, exists, dry_run, raced).", ("outcome",),
+)
+INBOX_FILE_SECONDS = Histogram("inbox_file_duration_seconds", "Time to write the action file for one Inbox file.")
+GMAIL_POLLS = Counter("gmail_polls_total", "Gmail polls, by sync mode and outcome (ok, error).", ("mode", "outcome"))
+GMAIL_POLL_SECONDS = Histogram(
+    "gmail_poll_duration_seconds", "Time for one Gmail poll.", ("mode",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+GMAIL_API_REQUESTS = Counter("gmail_api_requests_total", "Gmail API requests, by call.", ("call",))
+GMAIL_API_ERRORS = Counter("gmail_api_errors_total", "Failed Gmail API requests, by call.", ("call",))
+
+# ── Vault I/O ────────────────────────────────────────────────────────────────
+
+IO_SECONDS = Histogram("vault_io_duration_seconds", "Time spent running blocking vault I/O, by pool.", ("pool",))
+IO_WAIT_SECONDS = Histogram("vault_io_wait_seconds", "Time vault I/O waited for a pool thread.", ("pool",))
+IO_QUEUED = Gauge("vault_io_queued", "Vault I/O calls waiting for a pool thread.", ("pool",))
+WRITE_SECONDS = Histogram("vault_write_duration_seconds", "Time for one atomic vault file write.")
+COMMIT_SECONDS = Histogram(
+    "vault_commit_duration_seconds", "Time to commit a journaled vault transition (renames included), by kind.",
+    ("kind",),
+)
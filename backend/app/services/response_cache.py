@@ -0,0 +1,133 @@
+"""
+response_cache.py — ETag / If-None-Match for the polled read endpoints.
+
+Each endpoint hands conditional() a cheap version token (folder generations
+from VaultIndex.version(), file stats) and a builder. The serialised body is
+cached per URL and version: while the token is unchanged a poll costs the
+token and a tuple compare, and a client sending the ETag it already holds
+gets an empty 304. The ETag is a hash of the body itself, so it is never
+wrong: a token that moves without the content changing still revalidates.
+
+Content that also changes with the clock (dashboard alerts, "done today")
+gives an expiry with its payload; the body is rebuilt once that passes even
+if the version is the same.
+
+Compressed variants (see serialization.negotiate) are made on first request
+and cached with the body, each with its own ETag ("<hash>-br", "<hash>-gzip");
+If-None-Match accepts any variant of the current body.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Hashable
+
+from fastapi import Request, Response
+
+from app.services import io_executor, serialization
+
+MAX_ENTRIES = 256
+
+
+@dataclass(slots=True)
+class Payload:
+    """A builder's result: JSON content (or already encoded JSON bytes), extra headers,
+    and when it goes stale on its own (if ever)."""
+    content: Any
+    headers: dict[str, str] = field(default_factory=dict)
+    expires_ns: int | None = None
+
+
+@dataclass(slots=True)
+class _Cached:
+    version: Hashable
+    expires_ns: int | None
+    etag: str
+    body: bytes
+    headers: dict[str, str]
+    encoded: dict[str, bytes] = field(default_factory=dict)
+
+    def variant(self, encoding: str | None) -> tuple[str, bytes]:
+        """(ETag, body) in the given content encoding, compressing on first use."""
+        if encoding is None or not serialization.should_compress(self.body):
+            return self.etag, self.body
+        body = self.encoded.get(encoding)
+        if body is None:
+            body = self.encoded[encoding] = serialization.compress(self.body, encoding)
+        return f'{self.etag[:-1]}-{encoding}"', body
+
+
+_cache: OrderedDict[Hashable, _Cached] = OrderedDict()
+_lock = threading.Lock()
+
+
+def file_version(*paths: Path) -> tuple:
+    """(mtime_ns, size) of each path, None for a missing one."""
+    version = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            version.append(None)
+        else:
+            version.append((st.st_mtime_ns, st.st_size))
+    return tuple(version)
+
+
+def _etag(body: bytes) -> str:
+    return f'"{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+
+def _matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == "*" or tag == etag or tag.startswith(etag[:-1] + "-"):
+            return True
+    return False
+
+
+def _lookup(
+    key: Hashable, version: Callable[[], Hashable], build: Callable[[], Payload], encoding: str | None,
+) -> tuple[_Cached, str, bytes]:
+    # The token is taken before building, so a cached body is never older than its version.
+    token = version()
+    with _lock:
+        cached = _cache.get(key)
+        if cached is not None and cached.version == token and (
+            cached.expires_ns is None or time.time_ns() < cached.expires_ns
+        ):
+            _cache.move_to_end(key)
+            return cached, *cached.variant(encoding)
+
+    payload = build()
+    content = payload.content
+    body = content if isinstance(content, bytes) else serialization.dumps(content)
+    cached = _Cached(token, payload.expires_ns, _etag(body), body, payload.headers)
+    with _lock:
+        _cache[key] = cached
+        _cache.move_to_end(key)
+        while len(_cache) > MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return cached, *cached.variant(encoding)
+
+
+async def conditional(request: Request, version: Callable[[], Hashable], build: Callable[[], Payload]) -> Response:
+    """Answer a GET from the per-version cache, with 304 when the client's ETag still matches.
+
+    Both callables run on the read pool; exceptions from build (HTTPException
+    included) propagate to the caller and nothing is cached.
+    """
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    encoding = serialization.negotiate(request.headers.get("accept-encoding"))
+    cached, etag, body = await io_executor.run_read(_lookup, key, version, build, encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if _matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    if body is not cached.body:
+        headers["Content-Encoding"] = encoding
+    return Response(body, media_type="application/json", headers=cached.headers | headers)
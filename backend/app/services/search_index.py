@@ -0,0 +1,775 @@
+"""
+search_index.py — Full-text search over vault items (GET /api/search).
+
+An inverted index over subject, sender and body of every Markdown file in
+the vault folders (Needs_Action through Done, Plans, Approved, Rejected, ...).
+It subscribes to VaultIndex change events, so every write path and the
+filesystem watcher keep it current; changes are queued and indexed in
+batches before the next query, or when the queue fills.
+
+Layout (Lucene-style, scaled down):
+
+- Documents get increasing integer ids. New documents go to an in-memory live
+  segment, which is frozen into an immutable on-disk segment
+  (.state/search/seg-NNNNNN.bin, zlib-compressed) every SEGMENT_DOCS
+  documents and at shutdown. Past MAX_SEGMENTS, the smallest adjacent pair
+  is merged, dropping deleted documents once they are a noticeable share.
+- A posting list is the term's doc ids (uint32, ascending) plus one
+  quantised BM25 term-frequency factor ("impact", uint8) per doc, so a
+  document's score is the sum of idf × impact over the query terms.
+- Plain terms match subject (weight 3), sender (2) and body (1) together;
+  "subject:" and "from:" terms have their own posting lists.
+- Deleted or changed documents are tombstoned until their segment is merged.
+  .state/search/manifest.json lists the segments, tombstones and next doc id.
+
+Queries run per segment on bitmaps (Python ints, one bit per doc): each term
+is split into 16 impact levels, ANDing the levels gives the exact match count,
+and the top hits are found best-first from the highest-scoring level
+combinations, so only a few hundred documents are ever scored individually.
+Ranking is exact BM25 up to the impact quantisation.
+
+Items moved into Archive/ packs (archive.py) stay indexed under their folder,
+as "<month>/<name>" (archived_name()) so a later file with the same name does
+not replace them; their content is re-read from the pack.
+
+Query syntax: terms are ANDed; a trailing * makes a prefix term (invoic*).
+Field terms are subject:x and from:x; filters are folder:Done, type:payment,
+after:2026-01-01 and before:2026-02-01 (also available as query parameters).
+"""
+
+import heapq
+import json
+import logging
+import math
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from operator import itemgetter
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+from app.models.search import SearchHit, SearchResult, SearchStats
+from app.services.archive import ArchivedItem, get_archive
+from app.services.frontmatter import as_datetime, get_body, parse_document
+from app.services.vault_index import IndexEntry, VaultIndex, get_index
+from app.services.vault_journal import atomic_write
+
+logger = logging.getLogger("search-index")
+
+SEARCH_DIR = ".state/search"
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+
+SEARCH_FOLDERS = (
+    "Needs_Action", "In_Progress", "Plans", "Pending_Approval", "Approved", "Rejected", "Done",
+    "Logs", "Briefings", "Accounting",
+)
+FIELD_WEIGHTS = {"subject": 3, "from": 2, "body": 1}
+SEGMENT_DOCS = 20_000
+MAX_SEGMENTS = 16
+COMPACT_RATIO = 0.2  # merges drop tombstoned postings once this share of a segment is deleted
+FLUSH_SIZE = 1000
+MAX_PREFIX_TERMS = 64
+MAX_RESULTS = 100
+MAX_COMBINATIONS = 4096
+
+K1 = 1.2
+B = 0.75
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+_NONZERO_RE = re.compile(rb"[^\x00]+")
+_IMPACT_SCALE = (K1 + 1) / 255
+_LEVEL_SHIFT = 4
+_BITS = [tuple(i for i in range(8) if byte >> i & 1) for byte in range(256)]
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased word tokens of two or more characters ("vendorsupply.com" -> vendorsupply, com)."""
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+def _date_key(value: Any) -> str | None:
+    dt = as_datetime(value)
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%f") if dt else None
+
+
+def _bitmap(positions) -> int:
+    positions = list(positions)
+    if not positions:
+        return 0
+    buf = bytearray(max(positions) // 8 + 1)
+    for p in positions:
+        buf[p >> 3] |= 1 << (p & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _positions(bits: int, limit: int | None = None) -> list[int]:
+    """Set bit positions of `bits`, lowest first (at least `limit` of them, if given)."""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, "little")
+    found: list[int] = []
+    for run in _NONZERO_RE.finditer(data):
+        for i in range(run.start(), run.end()):
+            base = i << 3
+            found.extend(base + b for b in _BITS[data[i]])
+        if limit is not None and len(found) >= limit:
+            break
+    return found
+
+
+# ── Segments ────────────────────────────────────────────────────────────────
+
+# doc id -> (folder, filename, mtime_ns, size, type, date key, weighted length)
+Doc = tuple[str, str, int, int, str, str | None, int]
+
+
+class _Segment:
+    """Posting lists for a run of documents; only the live segment is ever added to.
+
+    Bitmaps are relative to the segment's first doc id (`base`).
+    """
+
+    def __init__(self, seq: int, doc_ids: list[int] | None = None):
+        self.seq = seq
+        self.doc_ids: list[int] = doc_ids or []
+        self.terms: dict[str, tuple[array, bytearray | bytes]] = {}
+        self._sorted: list[str] | None = None
+        self._cache: dict[tuple, Any] = {}
+
+    @property
+    def name(self) -> str:
+        return f"seg-{self.seq:06d}.bin"
+
+    @property
+    def base(self) -> int:
+        return self.doc_ids[0] if self.doc_ids else 0
+
+    def add(self, doc_id: int, impacts: dict[str, int]):
+        self.doc_ids.append(doc_id)
+        for term, impact in impacts.items():
+            postings = self.terms.get(term)
+            if postings is None:
+                postings = self.terms[term] = (array("I"), bytearray())
+                self._sorted = None
+            postings[0].append(doc_id)
+            postings[1].append(impact)
+        self._cache.clear()
+
+    def sorted_terms(self) -> list[str]:
+        if self._sorted is None:
+            self._sorted = sorted(self.terms)
+        return self._sorted
+
+    def expand(self, prefix: str, limit: int) -> list[str]:
+        terms = self.sorted_terms()
+        i = bisect_left(terms, prefix)
+        found: list[str] = []
+        while i < len(terms) and terms[i].startswith(prefix) and len(found) < limit:
+            found.append(terms[i])
+            i += 1
+        return found
+
+    def impact(self, term: str, doc_id: int) -> int:
+        postings = self.terms.get(term)
+        if postings is None:
+            return 0
+        ids, impacts = postings
+        i = bisect_left(ids, doc_id)
+        return impacts[i] if i < len(ids) and ids[i] == doc_id else 0
+
+    def cached(self, key: tuple, build) -> Any:
+        value = self._cache.get(key)
+        if value is None:
+            if len(self._cache) >= 1024:
+                self._cache.clear()
+            value = self._cache[key] = build()
+        return value
+
+    def levels(self, term: str) -> list[tuple[int, int]]:
+        """(impact level, bitmap of the docs at that level) for `term`, highest level first."""
+        def build():
+            postings = self.terms.get(term)
+            if postings is None:
+                return []
+            base = self.base
+            buckets: dict[int, list[int]] = {}
+            for doc_id, impact in zip(*postings):
+                buckets.setdefault(impact >> _LEVEL_SHIFT, []).append(doc_id - base)
+            return sorted(((level, _bitmap(pos)) for level, pos in buckets.items()), reverse=True)
+
+        return self.cached(("levels", term), build)
+
+    # File layout (zlib-compressed): 4-byte header length, JSON header {ids, docs, terms: [[term, n], ...]},
+    # then every posting list's doc ids (uint32) followed by all impacts (uint8), in term order.
+
+    def write(self, directory: Path, docs: dict[int, Doc]):
+        terms = self.sorted_terms()
+        header = json.dumps({
+            "version": FORMAT_VERSION,
+            "ids": self.doc_ids,
+            "docs": [[doc_id, *docs[doc_id]] for doc_id in self.doc_ids if doc_id in docs],
+            "terms": [[t, len(self.terms[t][0])] for t in terms],
+        }).encode("utf-8")
+        ids, impacts = array("I"), bytearray()
+        for t in terms:
+            ids.extend(self.terms[t][0])
+            impacts.extend(self.terms[t][1])
+        data = zlib.compress(struct.pack("<I", len(header)) + header + ids.tobytes() + bytes(impacts), 6)
+        tmp = directory / f".{self.name}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, directory / self.name)
+        for t in terms:
+            self.terms[t] = (self.terms[t][0], bytes(self.terms[t][1]))
+
+    @classmethod
+    def read(cls, path: Path, seq: int) -> tuple["_Segment", list[list]]:
+        data = zlib.decompress(path.read_bytes())
+        (header_len,) = struct.unpack_from("<I", data)
+        header = json.loads(data[4:4 + header_len])
+        total = sum(n for _, n in header["terms"])
+        offset = 4 + header_len
+        ids = array("I")
+        ids.frombytes(data[offset:offset + 4 * total])
+        impacts = data[offset + 4 * total:]
+        segment = cls(seq, header["ids"])
+        start = 0
+        for term, n in header["terms"]:
+            segment.terms[term] = (ids[start:start + n], impacts[start:start + n])
+            start += n
+        segment._sorted = [t for t, _ in header["terms"]]
+        return segment, header["docs"]
+
+
+def _merge(seq: int, first: _Segment, second: _Segment, drop: set[int]) -> _Segment:
+    """One segment with the postings of two adjacent segments, minus the docs in `drop`."""
+    merged = _Segment(seq, [d for d in first.doc_ids + second.doc_ids if d not in drop])
+    for segment in (first, second):
+        for term, (ids, impacts) in segment.terms.items():
+            if drop and not drop.isdisjoint(ids):
+                keep = [i for i, d in enumerate(ids) if d not in drop]
+                if not keep:
+                    continue
+                ids, impacts = array("I", [ids[i] for i in keep]), bytes([impacts[i] for i in keep])
+            postings = merged.terms.get(term)
+            if postings is None:
+                merged.terms[term] = (array("I", ids), bytearray(impacts))
+            else:
+                postings[0].extend(ids)
+                postings[1].extend(impacts)
+    return merged
+
+
+# ── Queries ─────────────────────────────────────────────────────────────────
+
+
+@dataclass
+class Query:
+    terms: list[tuple[str, bool]] = field(default_factory=list)  # (index term, is prefix)
+    folders: set[str] = field(default_factory=set)
+    types: set[str] = field(default_factory=set)
+    after: str | None = None
+    before: str | None = None
+
+
+_FIELD_ALIASES = {"subject": "subject", "from": "from", "sender": "from"}
+
+
+def _terms(value: str, field_name: str | None = None) -> list[tuple[str, bool]]:
+    tokens = tokenize(value)
+    prefix = value.endswith("*")
+    return [
+        (f"{field_name}:{t}" if field_name else t, prefix and i == len(tokens) - 1)
+        for i, t in enumerate(tokens)
+    ]
+
+
+def parse_query(text: str) -> Query:
+    """Parse the search box syntax (see module docstring). Raises ValueError for bad dates."""
+    query = Query()
+    for raw in text.split():
+        name, sep, value = raw.partition(":")
+        name = name.lower()
+        if not (sep and value):
+            query.terms += _terms(raw)
+        elif name in _FIELD_ALIASES:
+            query.terms += _terms(value, _FIELD_ALIASES[name])
+        elif name == "folder":
+            query.folders |= {v.lower() for v in value.split(",") if v}
+        elif name == "type":
+            query.types |= {v.lower() for v in value.split(",") if v}
+        elif name in ("after", "since", "before", "until"):
+            key = _date_key(value)
+            if key is None:
+                raise ValueError(f"Invalid date in {raw} (expected an ISO date or datetime)")
+            setattr(query, "after" if name in ("after", "since") else "before", key)
+        else:
+            query.terms += _terms(raw)
+    return query
+
+
+def archived_name(item: ArchivedItem) -> str:
+    """An archived item's document name, apart from any live file of the same name."""
+    return f"{item.month}/{item.name}"
+
+
+@dataclass
+class Match:
+    doc_id: int
+    folder: str
+    name: str
+    score: float
+
+
+class SearchIndex:
+    """The full-text index for one vault, kept current from its VaultIndex's change events."""
+
+    def __init__(self, index: VaultIndex, directory: Path | None = None):
+        self.index = index
+        self.root = index.root
+        self.directory = directory or index.root / SEARCH_DIR
+        self._lock = threading.RLock()
+        self._docs: dict[int, Doc] = {}
+        self._paths: dict[str, int] = {}
+        self._deleted: set[int] = set()
+        self._deleted_version = 0
+        self._segments: list[_Segment] = []
+        self._next_doc = 0
+        self._next_seq = 0
+        self._total_length = 0
+        self._pending: dict[str, IndexEntry | ArchivedItem | None] = {}
+        self._load()
+        self._live = self._new_segment()
+        index.subscribe(self._on_event)
+
+    def _new_segment(self) -> _Segment:
+        self._next_seq += 1
+        return _Segment(self._next_seq - 1)
+
+    # ── Persistence ──────────────────────────────────────────────────────────
+
+    def _load(self):
+        try:
+            manifest = json.loads((self.directory / MANIFEST_FILE).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if manifest.get("version") != FORMAT_VERSION:
+            return
+        deleted = set(manifest.get("deleted", []))
+        try:
+            for name in manifest["segments"]:
+                seq = int(name[4:10])
+                segment, docs = _Segment.read(self.directory / name, seq)
+                self._segments.append(segment)
+                self._next_seq = max(self._next_seq, seq + 1)
+                present = set()
+                for doc_id, *doc in docs:
+                    present.add(doc_id)
+                    if doc_id not in deleted:
+                        self._register(doc_id, tuple(doc))
+                deleted.update(d for d in segment.doc_ids if d not in present)
+        except (OSError, ValueError, KeyError, zlib.error, struct.error):
+            logger.warning("[Search] Unreadable index in %s, rebuilding", self.directory, exc_info=True)
+            self._docs.clear()
+            self._paths.clear()
+            self._segments.clear()
+            self._total_length = 0
+            return
+        self._deleted = deleted
+        self._next_doc = manifest.get("next_doc", 0)
+        logger.info("[Search] Loaded %d documents in %d segments", len(self._docs), len(self._segments))
+
+    def _save_manifest(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        frozen = {d for s in self._segments for d in s.doc_ids}
+        atomic_write(self.directory / MANIFEST_FILE, json.dumps({
+            "version": FORMAT_VERSION,
+            "segments": [s.name for s in self._segments],
+            "deleted": sorted(self._deleted & frozen),
+            "next_doc": self._next_doc,
+        }))
+
+    def _freeze(self):
+        """Write the live segment to disk and start a new one, merging segments if there are too many."""
+        if not self._live.doc_ids:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._live.write(self.directory, self._docs)
+        self._segments.append(self._live)
+        self._live = self._new_segment()
+        if len(self._segments) > MAX_SEGMENTS:
+            self._merge_smallest()
+        self._save_manifest()
+
+    def _merge_smallest(self):
+        sizes = [len(s.doc_ids) for s in self._segments]
+        i = min(range(len(sizes) - 1), key=lambda j: sizes[j] + sizes[j + 1])
+        first, second = self._segments[i:i + 2]
+        dead = {d for d in first.doc_ids + second.doc_ids if d in self._deleted}
+        drop = dead if len(dead) > COMPACT_RATIO * (sizes[i] + sizes[i + 1]) else set()
+        merged = _merge(self._next_seq, first, second, drop)
+        self._next_seq += 1
+        merged.write(self.directory, self._docs)
+        self._segments[i:i + 2] = [merged]
+        self._deleted -= drop
+        self._save_manifest()
+        for old in (first, second):
+            (self.directory / old.name).unlink(missing_ok=True)
+        logger.info("[Search] Merged %s and %s into %s", first.name, second.name, merged.name)
+
+    def close(self):
+        self.index.unsubscribe(self._on_event)
+        with self._lock:
+            self._flush()
+            self._freeze()
+
+    # ── Sync ─────────────────────────────────────────────────────────────────
+
+    def _register(self, doc_id: int, doc: Doc):
+        self._docs[doc_id] = doc
+        self._paths[f"{doc[0]}/{doc[1]}"] = doc_id
+        self._total_length += doc[6]
+
+    def _unregister(self, key: str):
+        doc_id = self._paths.pop(key, None)
+        if doc_id is None:
+            return
+        self._total_length -= self._docs.pop(doc_id)[6]
+        self._deleted.add(doc_id)
+        self._deleted_version += 1
+
+    def _on_event(self, kind: str, folder: str, entry: IndexEntry):
+        if folder not in SEARCH_FOLDERS:
+            return
+        key = f"{folder}/{entry.name}"
+        with self._lock:
+            if kind == "removed":
+                self._pending[key] = None
+            else:
+                doc_id = self._paths.get(key)
+                if doc_id is not None and self._docs[doc_id][2:4] == (entry.mtime_ns, entry.size):
+                    self._pending.pop(key, None)  # already indexed as it is on disk
+                else:
+                    self._pending[key] = entry
+            if len(self._pending) >= FLUSH_SIZE:
+                self._flush()
+
+    def add_document(self, folder: str, name: str, mtime_ns: int, size: int, text: str):
+        """Index one file's content (replacing any earlier version of it)."""
+        meta, body_start = parse_document(text)
+        fields = {
+            "subject": tokenize(str(meta.get("subject", Path(name).stem))),
+            "from": tokenize(str(meta.get("from", meta.get("sender", "")))),
+            "body": tokenize(get_body(text, body_start)),
+        }
+        counts: Counter[str] = Counter()
+        for field_name, tokens in fields.items():
+            weight = FIELD_WEIGHTS[field_name]
+            for token in tokens:
+                counts[token] += weight
+        length = sum(FIELD_WEIGHTS[f] * len(tokens) for f, tokens in fields.items())
+        when = meta.get("received", meta.get("date", meta.get("created")))
+        date_key = _date_key(when) or _date_key(datetime.fromtimestamp(mtime_ns / 1e9, timezone.utc))
+
+        with self._lock:
+            self._unregister(f"{folder}/{name}")
+            doc_id = self._next_doc
+            self._next_doc += 1
+            self._register(doc_id, (folder, name, mtime_ns, size, str(meta.get("type", "")).lower(), date_key, length))
+            avgdl = self._total_length / len(self._docs)
+            norm = K1 * (1 - B + B * length / avgdl) if avgdl else K1
+            impacts = {term: self._quantise(tf, norm) for term, tf in counts.items()}
+            for field_name in ("subject", "from"):
+                for term, tf in Counter(fields[field_name]).items():
+                    impacts[f"{field_name}:{term}"] = self._quantise(tf * FIELD_WEIGHTS[field_name], norm)
+            self._live.add(doc_id, impacts)
+            if len(self._live.doc_ids) >= SEGMENT_DOCS:
+                self._freeze()
+
+    @staticmethod
+    def _quantise(tf: float, norm: float) -> int:
+        return max(1, min(255, round(tf * (K1 + 1) / (tf + norm) / _IMPACT_SCALE)))
+
+    def _flush(self):
+        while self._pending:
+            key, entry = self._pending.popitem()
+            folder, _, name = key.partition("/")
+            if entry is None:
+                doc_id = self._paths.get(key)
+                archived = None
+                if doc_id is not None:
+                    archived = get_archive(self.root).find(folder, name, *self._docs[doc_id][2:4])
+                self._unregister(key)
+                if archived is not None:
+                    # Moved into an archive pack unchanged: stays searchable under its archived name.
+                    self._pending[f"{folder}/{archived_name(archived)}"] = archived
+                continue
+            try:
+                if isinstance(entry, ArchivedItem):
+                    text = get_archive(self.root).read(entry)
+                else:
+                    text = entry.path.read_text(encoding="utf-8")
+            except (OSError, UnicodeDecodeError):
+                self._unregister(key)
+                continue
+            self.add_document(folder, name, entry.mtime_ns, entry.size, text)
+
+    def sync(self):
+        """Bring the vault folders up to date (via the index) and index every queued change."""
+        self.index.sync(*SEARCH_FOLDERS)
+        with self._lock:
+            self._flush()
+
+    def reconcile(self):
+        """Startup pass: index new and changed files and archived items, drop documents whose file is gone."""
+        self.index.sync(*SEARCH_FOLDERS)
+        archive = get_archive(self.root)
+        with self._lock:
+            present = {f"{folder}/{e.name}" for folder in SEARCH_FOLDERS for e in self.index.entries(folder)}
+            for folder in SEARCH_FOLDERS:
+                for item in archive.items(folder):
+                    key = f"{folder}/{archived_name(item)}"
+                    present.add(key)
+                    doc_id = self._paths.get(key)
+                    if doc_id is None or self._docs[doc_id][2:4] != (item.mtime_ns, item.size):
+                        self._pending[key] = item
+            for key in self._paths.keys() - present:
+                self._pending.setdefault(key, None)
+            self._flush()
+        logger.info("[Search] %d documents indexed", len(self._docs))
+
+    # ── Search ───────────────────────────────────────────────────────────────
+
+    def _idf(self, df: int) -> float:
+        n = max(len(self._docs), 1)
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def _candidates(self, segment: _Segment, query: Query) -> int:
+        """Bitmap of the segment's live documents that pass the folder, type and date filters."""
+        base, last, docs = segment.base, segment.doc_ids[-1], self._docs
+
+        def doc_mask(attr: int, values: frozenset[str]) -> int:
+            return _bitmap(d - base for d in segment.doc_ids if d in docs and docs[d][attr].lower() in values)
+
+        mask = segment.cached(("alive", self._deleted_version), lambda: ~_bitmap(
+            d - base for d in self._deleted if base <= d <= last
+        ))
+        for attr, values in ((0, query.folders), (4, query.types)):
+            if values:
+                key = frozenset(values)
+                mask &= segment.cached((attr, key), lambda: doc_mask(attr, key))
+        if query.after or query.before:
+            mask &= segment.cached(("date", query.after, query.before), lambda: _bitmap(
+                d - base for d in segment.doc_ids if self._in_range(docs.get(d), query)
+            ))
+        return mask
+
+    def _search_segment(
+        self, segment: _Segment, clauses: list[list[tuple[str, float]]], query: Query,
+        limit: int, top: list[tuple[float, int]],
+    ) -> int:
+        """Offer the segment's best matches to the `top` min-heap; return its number of matches."""
+        if not segment.doc_ids:
+            return 0
+        base = segment.base
+        matched = self._candidates(segment, query)
+        levels: list[list[tuple[float, int]]] = []
+        for clause in clauses:
+            entries, union = [], 0
+            for term, idf in clause:
+                for level, bits in segment.levels(term):
+                    entries.append((idf * ((level << _LEVEL_SHIFT) | 0xF) * _IMPACT_SCALE, bits))
+                    union |= bits
+            matched &= union
+            if not matched:
+                return 0
+            entries.sort(key=itemgetter(0), reverse=True)
+            levels.append(entries)
+        count = matched.bit_count()
+
+        def offer(doc_id: int):
+            score = _IMPACT_SCALE * sum(max(idf * segment.impact(t, doc_id) for t, idf in clause) for clause in clauses)
+            if len(top) < limit:
+                heapq.heappush(top, (score, -doc_id))
+            elif score > top[0][0]:
+                heapq.heapreplace(top, (score, -doc_id))
+
+        if count <= 4 * limit:
+            for p in _positions(matched):
+                offer(base + p)
+            return count
+
+        # Best-first over combinations of one level per clause, by their score upper bound.
+        start = (0,) * len(levels)
+        frontier = [(-sum(entries[0][0] for entries in levels), start)]
+        visited, scored = {start}, set()
+        for _ in range(MAX_COMBINATIONS):
+            if not frontier:
+                break
+            upper, combo = heapq.heappop(frontier)
+            if len(top) >= limit and -upper <= top[0][0]:
+                break
+            bits = matched
+            for entries, i in zip(levels, combo):
+                bits &= entries[i][1]
+                if not bits:
+                    break
+            if bits:
+                for p in _positions(bits, 4 * limit):
+                    if p not in scored:
+                        scored.add(p)
+                        offer(base + p)
+            for c, entries in enumerate(levels):
+                if combo[c] + 1 < len(entries):
+                    following = combo[:c] + (combo[c] + 1,) + combo[c + 1:]
+                    if following not in visited:
+                        visited.add(following)
+                        bound = sum(e[i][0] for e, i in zip(levels, following))
+                        heapq.heappush(frontier, (-bound, following))
+        return count
+
+    @staticmethod
+    def _in_range(doc: Doc | None, query: Query) -> bool:
+        if doc is None or doc[5] is None:
+            return False
+        return (not query.after or doc[5] >= query.after) and (not query.before or doc[5] < query.before)
+
+    def search(self, query: Query, limit: int = 20) -> tuple[list[Match], int]:
+        """Return the top `limit` matches by BM25 score, and the total number of matches."""
+        with self._lock:
+            self._flush()
+            segments = [*self._segments, self._live]
+            clauses: list[list[tuple[str, float]]] = []
+            for term, prefix in query.terms:
+                if prefix:
+                    expanded = sorted({t for s in segments for t in s.expand(term, MAX_PREFIX_TERMS)})
+                else:
+                    expanded = [term]
+                clause = []
+                for t in expanded[:MAX_PREFIX_TERMS]:
+                    df = sum(len(s.terms[t][0]) for s in segments if t in s.terms)
+                    if df:
+                        clause.append((t, self._idf(df)))
+                if not clause:
+                    return [], 0
+                clauses.append(clause)
+            if not clauses:
+                return [], 0
+
+            top: list[tuple[float, int]] = []
+            total = sum(self._search_segment(s, clauses, query, limit, top) for s in segments)
+            top.sort(reverse=True)
+            matches = [Match(-neg, *self._docs[-neg][:2], round(score, 4)) for score, neg in top]
+            return matches, total
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            paths = [self.directory / s.name for s in self._segments]
+            return {
+                "documents": len(self._docs),
+                "segments": len(self._segments),
+                "live_documents": len(self._live.doc_ids),
+                "deleted": len(self._deleted),
+                "pending": len(self._pending),
+                "size_bytes": sum(p.stat().st_size for p in paths if p.exists()),
+            }
+
+
+_search: SearchIndex | None = None
+_search_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex | None:
+    """Return the search index for the current vault (None when SEARCH_INDEX is off).
+
+    The first call loads the persisted segments and reconciles them with the vault.
+    """
+    global _search
+    if not settings.SEARCH_INDEX:
+        return None
+    index = get_index()
+    with _search_lock:
+        if _search is None or _search.index is not index:
+            if _search is not None:
+                _search.close()
+            _search = SearchIndex(index)
+            _search.reconcile()
+        return _search
+
+
+def search(
+    q: str,
+    folder: str | None = None,
+    type: str | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    limit: int = 20,
+) -> SearchResult:
+    """Run a search box query; the parameters add to the filters written inline in `q`.
+
+    Raises ValueError for a query without search terms or with an invalid date,
+    and RuntimeError when SEARCH_INDEX is off.
+    """
+    started = time.perf_counter()
+    engine = get_search_index()
+    if engine is None:
+        raise RuntimeError("Search index is disabled (set SEARCH_INDEX=true)")
+    query = parse_query(q)
+    query.folders |= {f.lower() for f in (folder or "").split(",") if f}
+    query.types |= {t.lower() for t in (type or "").split(",") if t}
+    for value, attr in ((since, "after"), (until, "before")):
+        if value:
+            key = _date_key(value)
+            if key is None:
+                raise ValueError(f"Invalid date: {value} (expected an ISO date or datetime)")
+            setattr(query, attr, key)
+    if not query.terms:
+        raise ValueError("Query has no search terms")
+
+    engine.sync()
+    matches, total = engine.search(query, min(limit, MAX_RESULTS))
+    hits = []
+    for match in matches:
+        month, _, name = match.name.rpartition("/")
+        if month:
+            entry = get_archive(engine.root).get(match.folder, name, month)
+        else:
+            entry = engine.index.get(match.folder, name)
+        if entry is None:
+            continue
+        meta = entry.meta
+        hits.append(SearchHit(
+            folder=match.folder,
+            filename=name,
+            id=str(meta.get("id", entry.stem)),
+            type=str(meta.get("type", "")),
+            subject=str(meta.get("subject", entry.stem)),
+            sender=str(meta.get("from", meta.get("sender", ""))),
+            date=str(meta.get("received", meta.get("date", meta.get("created", "")))),
+            score=match.score,
+            snippet=entry.snippet,
+            archived=isinstance(entry, ArchivedItem),
+            month=month or None,
+        ))
+    return SearchResult(query=q, total=total, hits=hits, took_ms=round((time.perf_counter() - started) * 1000, 2))
+
+
+def status() -> SearchStats:
+    engine = get_search_index()
+    return SearchStats(enabled=True, **engine.stats()) if engine else SearchStats(enabled=False)
+
+
+def shutdown():
+    """Index queued changes and persist the live segment (app shutdown)."""
+    global _search
+    with _search_lock:
+        if _search is not None:
+            _search.close()
+            _search = None
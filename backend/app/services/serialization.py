@@ -0,0 +1,102 @@
+"""
+serialization.py — JSON encoding and compression for API responses.
+
+dumps() encodes with orjson when it is installed and with the standard
+library otherwise; either way the output is the same compact UTF-8 JSON that
+JSONResponse produces, and Pydantic models and other non-JSON types are
+converted on demand instead of walking the whole payload with
+jsonable_encoder first. dump_models() goes further for lists of one model
+(list pages): pydantic-core writes the JSON straight from the already-built
+models, without re-validating or building intermediate dicts.
+FastJSONResponse renders through dumps() and is the app's default response class.
+
+Bodies of at least COMPRESS_MIN_BYTES are compressed for clients that accept
+it: brotli when the brotli package is installed, else gzip.
+"""
+
+import gzip
+import json
+from functools import lru_cache
+from typing import Any
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional encoding
+    brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5  # the usual choice for dynamic content: close to gzip -9 size, much faster
+
+# Preferred first
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return jsonable_encoder(obj)
+
+
+def dumps(content: Any) -> bytes:
+    """Serialise content to compact UTF-8 JSON."""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, default=_default, ensure_ascii=False, allow_nan=False, separators=(",", ":"),
+    ).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def dump_models(model: type[BaseModel], items: list[BaseModel], include: set[str] | None = None) -> bytes:
+    """Serialise a list of `model` instances, keeping only the `include` fields if given."""
+    return _list_adapter(model).dump_json(items, include={"__all__": include} if include else None)
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# ── Compression ──────────────────────────────────────────────────────────────
+
+
+def negotiate(accept_encoding: str | None) -> str | None:
+    """The preferred encoding the client accepts (q > 0), or None for identity."""
+    if not accept_encoding:
+        return None
+    accepted = set()
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip().removeprefix("q=")
+        try:
+            if params and float(q) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return next((e for e in ENCODINGS if e in accepted or "*" in accepted), None)
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def should_compress(body: bytes) -> bool:
+    return len(body) >= settings.COMPRESS_MIN_BYTES
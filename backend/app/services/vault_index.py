@@ -0,0 +1,488 @@
+"""
+vault_index.py — Process-wide in-memory index of the vault folders.
+
+Keeps folder -> file -> (stat, parsed frontmatter, body offset) so list and
+dashboard endpoints do not re-glob and re-read every Markdown file per request.
+
+A folder is rescanned only when its directory mtime moves (or it was explicitly
+invalidated); individual files are re-parsed only when their (mtime_ns, size)
+changes or a writer/watcher touched them. Frontmatter is parsed lazily, so
+folders that are only counted never have their contents read.
+
+Needs_Action, In_Progress and Pending_Approval additionally get an id -> entry
+map (built on first lookup, then maintained on every add/remove), so approving,
+rejecting or processing by id is a dict lookup rather than a folder scan.
+List endpoints likewise get presorted views (select()), kept ordered with
+bisect as entries come and go, so a page is found without sorting the folder.
+
+Every folder carries a generation stamp that changes whenever its listing or
+any entry in it does (version()), so callers can tell "nothing changed since
+last time" with a tuple compare instead of re-reading the folder.
+
+Listeners registered with subscribe() receive ("added" | "removed", folder,
+entry) for every difference the index observes; a file whose stat or content
+changed is reported as the old entry removed followed by the new one added.
+"""
+
+import itertools
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from pathlib import Path
+from typing import Callable
+
+from app.config import settings
+from app.services.frontmatter import RACY_WINDOW_NS, get_body, parse_document, parse_file
+
+logger = logging.getLogger("vault-index")
+
+
+def item_id_keys(meta: dict, stem: str) -> list[str]:
+    """Ids an item can be looked up by, strongest first: frontmatter id, stem, stem minus prefix."""
+    keys = [stem]
+    if meta.get("id"):
+        keys.insert(0, meta["id"])
+    _, sep, suffix = stem.partition("_")
+    if sep and suffix:
+        keys.append(suffix)
+    return keys
+
+
+class IndexEntry:
+    """A single indexed Markdown file. Frontmatter is loaded on first access."""
+
+    __slots__ = ("path", "name", "mtime_ns", "size", "_meta", "_body_offset", "_snippet")
+
+    def __init__(self, path: Path, mtime_ns: int, size: int):
+        self.path = path
+        self.name = path.name
+        self.mtime_ns = mtime_ns
+        self.size = size
+        self._meta: dict[str, str] | None = None
+        self._body_offset = 0
+        self._snippet = ""
+
+    @classmethod
+    def preloaded(
+        cls, path: Path, mtime_ns: int, size: int, meta: dict[str, str], body_offset: int, snippet: str,
+    ) -> "IndexEntry":
+        """An entry whose frontmatter is already known (e.g. read back from the metadata store)."""
+        entry = cls(path, mtime_ns, size)
+        entry._meta = meta
+        entry._body_offset = body_offset
+        entry._snippet = snippet
+        return entry
+
+    @property
+    def stem(self) -> str:
+        return self.path.stem
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    @property
+    def meta(self) -> dict[str, str]:
+        if self._meta is None:
+            self._load()
+        return self._meta
+
+    @property
+    def body_offset(self) -> int:
+        if self._meta is None:
+            self._load()
+        return self._body_offset
+
+    @property
+    def snippet(self) -> str:
+        if self._meta is None:
+            self._load()
+        return self._snippet
+
+    def read_body(self) -> str:
+        """Read the full body from disk (only needed when the snippet is not enough)."""
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except OSError:
+            return ""
+        _, body_start = parse_document(text)
+        return get_body(text, body_start)
+
+    def _load(self):
+        try:
+            parsed = parse_file(self.path, self.mtime_ns, self.size)
+        except OSError:
+            self._meta = {}
+            return
+        self._body_offset = parsed.body_start
+        self._snippet = parsed.snippet
+        self._meta = parsed.meta
+
+
+SortKey = Callable[["IndexEntry"], tuple]
+
+
+class _SortedView:
+    """One folder's entries ordered by (*key(entry), filename); the filename keeps keys unique."""
+
+    __slots__ = ("key", "keys", "by_name")
+
+    def __init__(self, key: SortKey):
+        self.key = key
+        self.keys: list[tuple] = []
+        self.by_name: dict[str, tuple] = {}
+
+    def add(self, entry: "IndexEntry"):
+        self.remove(entry)
+        k = (*self.key(entry), entry.name)
+        insort(self.keys, k)
+        self.by_name[entry.name] = k
+
+    def remove(self, entry: "IndexEntry"):
+        k = self.by_name.pop(entry.name, None)
+        if k is not None:
+            del self.keys[bisect_left(self.keys, k)]
+
+
+def _is_unchanged(prev: IndexEntry, st: os.stat_result) -> bool:
+    """True if a re-reported file still matches its indexed entry."""
+    if prev.mtime_ns != st.st_mtime_ns or prev.size != st.st_size:
+        return False
+    if prev._meta is None or time.time_ns() - st.st_mtime_ns > RACY_WINDOW_NS:
+        # Not parsed yet (will read current content lazily), or stat is trustworthy.
+        return True
+    # Same stat inside the racy window: compare the parsed content itself.
+    fresh = IndexEntry(prev.path, st.st_mtime_ns, st.st_size)
+    return fresh.meta == prev.meta and fresh.snippet == prev.snippet
+
+
+# Generation stamps are unique across folders and index instances, so a stamp
+# seen before a vault switch never matches one handed out after it.
+_generations = itertools.count(1)
+
+
+class _FolderState:
+    __slots__ = ("entries", "dir_mtime_ns", "scanned_ns", "dirty", "stale", "generation")
+
+    def __init__(self):
+        self.entries: dict[str, IndexEntry] = {}
+        self.dir_mtime_ns = -1
+        self.scanned_ns = 0
+        self.dirty = True
+        self.stale: set[str] = set()
+        self.generation = next(_generations)
+
+
+Listener = Callable[[str, str, "IndexEntry"], None]
+
+
+class VaultIndex:
+    """In-memory listing of vault folders, kept current by writers and the watcher."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._folders: dict[str, _FolderState] = {}
+        self._lock = threading.RLock()
+        self._listeners: list[Listener] = []
+        self._ids: dict[str, dict[str, str]] = {}
+        self._views: dict[str, dict[SortKey, _SortedView]] = {}
+        # Set while a filesystem watcher feeds every change through touch(); the
+        # index then trusts those events instead of re-checking directory mtimes.
+        self.watched = False
+
+    # ── Listeners ────────────────────────────────────────────────────────────
+
+    def subscribe(self, listener: Listener, replay: bool = True):
+        """Register a change listener, replaying already-indexed entries to it as "added"."""
+        with self._lock:
+            self._listeners.append(listener)
+            if not replay:
+                return
+            for folder, state in self._folders.items():
+                for entry in state.entries.values():
+                    listener("added", folder, entry)
+
+    def unsubscribe(self, listener: Listener):
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _emit(self, kind: str, folder: str, entry: IndexEntry):
+        ids = self._ids.get(folder)
+        if ids is not None:
+            if kind == "added":
+                self._add_ids(ids, entry)
+            else:
+                self._remove_ids(ids, entry)
+        for view in self._views.get(folder, {}).values():
+            if kind == "added":
+                view.add(entry)
+            else:
+                view.remove(entry)
+        for listener in self._listeners:
+            try:
+                listener(kind, folder, entry)
+            except Exception:
+                logger.exception("Index listener failed for %s/%s", folder, entry.name)
+
+    # ── Queries ──────────────────────────────────────────────────────────────
+
+    def entries(self, folder: str) -> list[IndexEntry]:
+        """Return all indexed .md files in a folder, sorted by filename."""
+        with self._lock:
+            state = self._sync(folder)
+            return [state.entries[name] for name in sorted(state.entries)]
+
+    def count(self, folder: str) -> int:
+        with self._lock:
+            return len(self._sync(folder).entries)
+
+    def sync(self, *folders: str):
+        """Bring the given folders up to date (emitting change events) without listing them."""
+        with self._lock:
+            for folder in folders:
+                self._sync(folder)
+
+    def version(self, *folders: str) -> tuple[int, ...]:
+        """Sync the given folders and return their generation stamps.
+
+        The tuple compares equal to an earlier one exactly when none of the
+        folders gained, lost or changed an entry in between.
+        """
+        with self._lock:
+            return tuple(self._sync(folder).generation for folder in folders)
+
+    def get(self, folder: str, name: str) -> IndexEntry | None:
+        with self._lock:
+            return self._sync(folder).entries.get(name)
+
+    def find_by_id(self, folder: str, item_id: str) -> IndexEntry | None:
+        """Look up an entry by frontmatter id or filename stem (see item_id_keys)."""
+        with self._lock:
+            state = self._sync(folder)
+            ids = self._ids.get(folder)
+            if ids is None:
+                ids = self._ids[folder] = {}
+                for entry in state.entries.values():
+                    self._add_ids(ids, entry)
+            name = ids.get(item_id)
+            return state.entries.get(name) if name else None
+
+    def select(
+        self,
+        folder: str,
+        key: SortKey,
+        after: tuple | None = None,
+        until: tuple | None = None,
+        limit: int | None = None,
+        predicate: Callable[[IndexEntry], bool] | None = None,
+    ) -> tuple[list[tuple[tuple, IndexEntry]], bool]:
+        """Walk a folder in (*key(entry), filename) order.
+
+        Starts after the sort key `after`, stops before `until` and skips entries
+        failing `predicate`. Returns up to `limit` (sort key, entry) pairs, and
+        whether the walk stopped at the limit with entries still left in range.
+        The view for `key` is built on first use and then maintained per change.
+        """
+        with self._lock:
+            state = self._sync(folder)
+            views = self._views.setdefault(folder, {})
+            view = views.get(key)
+            if view is None:
+                view = views[key] = _SortedView(key)
+                for entry in state.entries.values():
+                    view.add(entry)
+
+            keys = view.keys
+            i = bisect_right(keys, after) if after is not None else 0
+            selected: list[tuple[tuple, IndexEntry]] = []
+            while i < len(keys):
+                k = keys[i]
+                if until is not None and k >= until:
+                    break
+                i += 1
+                entry = state.entries[k[-1]]
+                if predicate is None or predicate(entry):
+                    selected.append((k, entry))
+                    if limit is not None and len(selected) >= limit:
+                        return selected, i < len(keys) and (until is None or keys[i] < until)
+            return selected, False
+
+    @staticmethod
+    def _add_ids(ids: dict[str, str], entry: IndexEntry):
+        keys = item_id_keys(entry.meta, entry.stem)
+        ids[keys[0]] = entry.name
+        for key in keys[1:]:
+            ids.setdefault(key, entry.name)
+
+    @staticmethod
+    def _remove_ids(ids: dict[str, str], entry: IndexEntry):
+        for key in item_id_keys(entry.meta, entry.stem):
+            if ids.get(key) == entry.name:
+                del ids[key]
+
+    # ── Invalidation ─────────────────────────────────────────────────────────
+
+    def invalidate(self, folder: str, name: str | None = None):
+        """Mark a whole folder, or a single file in it, as needing a re-read.
+
+        With listeners attached the folder is synced straight away, so change
+        events go out when the write happens rather than on the next read.
+        """
+        with self._lock:
+            state = self._folders.get(folder)
+            if state is None:
+                return
+            eager = self._tracked(folder)
+            if name is None:
+                state.dirty = True
+                if eager:
+                    self._sync(folder)
+            elif eager:
+                self._refresh_file(folder, state, self.root / folder / name)
+            else:
+                state.stale.add(name)
+
+    def rekey(self, folder: str):
+        """Re-sort a folder whose sort keys depend on more than its files (e.g. handbook keywords).
+
+        Drops the folder's sorted views, rebuilt on next use, and bumps its
+        generation so cached listings of it go stale.
+        """
+        with self._lock:
+            self._views.pop(folder, None)
+            state = self._folders.get(folder)
+            if state is not None:
+                state.generation = next(_generations)
+
+    def touch(self, *paths: Path):
+        """Invalidate the given vault paths (files written, created, moved or deleted)."""
+        for path in paths:
+            try:
+                rel = Path(path).relative_to(self.root)
+            except ValueError:
+                continue
+            if len(rel.parts) == 1:
+                # A folder itself was created/removed at the vault root.
+                self.invalidate(rel.parts[0])
+            elif len(rel.parts) == 2 and rel.suffix == ".md":
+                self.invalidate(rel.parts[0], rel.parts[1])
+
+    # ── Internals ────────────────────────────────────────────────────────────
+
+    def _tracked(self, folder: str) -> bool:
+        """Whether anything consumes change events for this folder (listeners, id map, views)."""
+        return bool(self._listeners) or folder in self._ids or folder in self._views
+
+    def _sync(self, folder: str) -> _FolderState:
+        state = self._folders.get(folder)
+        if state is None:
+            state = self._folders[folder] = _FolderState()
+
+        folder_path = self.root / folder
+        if self.watched and not state.dirty:
+            for name in state.stale:
+                self._refresh_file(folder, state, folder_path / name)
+            state.stale.clear()
+            return state
+
+        try:
+            dir_mtime_ns = os.stat(folder_path).st_mtime_ns
+        except FileNotFoundError:
+            if state.entries:
+                state.generation = next(_generations)
+            for entry in state.entries.values():
+                self._emit("removed", folder, entry)
+            state.entries.clear()
+            state.stale.clear()
+            state.dir_mtime_ns = -1
+            state.dirty = True
+            return state
+
+        # Directory mtimes come from a coarse kernel clock, so a change landing in
+        # the same tick as a scan can leave the mtime untouched. A folder scanned
+        # that close to its last mtime is "racy" and gets rescanned.
+        racy = state.scanned_ns - state.dir_mtime_ns < RACY_WINDOW_NS
+        if state.dirty or racy or dir_mtime_ns != state.dir_mtime_ns:
+            self._rescan(folder, state, folder_path, dir_mtime_ns)
+        elif state.stale:
+            for name in state.stale:
+                self._refresh_file(folder, state, folder_path / name)
+        state.stale.clear()
+        return state
+
+    def _rescan(self, folder: str, state: _FolderState, folder_path: Path, dir_mtime_ns: int):
+        scanned_ns = time.time_ns()
+        old = state.entries
+        fresh: dict[str, IndexEntry] = {}
+        with os.scandir(folder_path) as it:
+            for de in it:
+                if not de.name.endswith(".md"):
+                    continue
+                try:
+                    if not de.is_file():
+                        continue
+                    st = de.stat()
+                except FileNotFoundError:
+                    continue
+                prev = old.get(de.name)
+                if prev is not None and (
+                    _is_unchanged(prev, st) if de.name in state.stale
+                    else prev.mtime_ns == st.st_mtime_ns and prev.size == st.st_size
+                ):
+                    fresh[de.name] = prev
+                else:
+                    fresh[de.name] = IndexEntry(Path(de.path), st.st_mtime_ns, st.st_size)
+
+        if fresh.keys() != old.keys() or any(entry is not old[name] for name, entry in fresh.items()):
+            state.generation = next(_generations)
+        state.entries = fresh
+        state.dir_mtime_ns = dir_mtime_ns
+        state.scanned_ns = scanned_ns
+        state.dirty = False
+
+        if self._tracked(folder):
+            for name, entry in old.items():
+                if name not in fresh:
+                    self._emit("removed", folder, entry)
+            for name, entry in fresh.items():
+                prev = old.get(name)
+                if prev is None:
+                    self._emit("added", folder, entry)
+                elif prev is not entry:
+                    self._emit("removed", folder, prev)
+                    self._emit("added", folder, entry)
+
+    def _refresh_file(self, folder: str, state: _FolderState, path: Path):
+        prev = state.entries.get(path.name)
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            if prev is not None:
+                del state.entries[path.name]
+                state.generation = next(_generations)
+                self._emit("removed", folder, prev)
+            return
+        if prev is not None and _is_unchanged(prev, st):
+            return
+        entry = state.entries[path.name] = IndexEntry(path, st.st_mtime_ns, st.st_size)
+        state.generation = next(_generations)
+        if prev is not None:
+            self._emit("removed", folder, prev)
+        self._emit("added", folder, entry)
+
+
+_index: VaultIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_index(root: Path | None = None) -> VaultIndex:
+    """Return the process-wide index for the configured vault (or the given root)."""
+    global _index
+    root = root or settings.vault_dir
+    with _index_lock:
+        if _index is None or _index.root != root:
+            _index = VaultIndex(root)
+        return _index
@@ -0,0 +1,262 @@
+"""
+vault_journal.py — Atomic file writes and a write-ahead journal for multi-step vault changes.
+
+Single files are written to a hidden temp file beside the target and renamed
+into place, so readers (and a crash) see either the old or the new content,
+never a torn file.
+
+Multi-step transitions (processing an item writes a plan, maybe an approval,
+and moves the source; approving moves the approval and its source) go
+through a Transition:
+
+1. claim: .state/journal/<key>.json is created exclusively. The key names the
+   item being changed, so two requests for the same item cannot interleave
+   (the second gets TransitionConflict) while different items proceed in
+   parallel without a global lock.
+2. stage: new files are written to hidden temp files beside their targets.
+3. commit: the journal is rewritten with the full list of renames. From here
+   on the transition always completes.
+4. apply: the renames run in order, then the journal is removed.
+
+recover() runs at startup. Committed journals are rolled forward (a rename
+whose source is gone and whose target exists counts as done), uncommitted
+ones are dropped along with every stray temp file, and approvals left behind
+by pre-journal crashes (source still in Needs_Action) are repaired.
+"""
+
+import errno
+import json
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.config import settings
+from app.services import metrics
+from app.services.frontmatter import parse_file
+from app.services.vault_index import get_index
+
+logger = logging.getLogger("vault-journal")
+
+JOURNAL_DIR = ".state/journal"
+_TMP_MARK = ".tmp-"
+
+
+class TransitionConflict(Exception):
+    """Another transition for the same item is in progress."""
+
+
+def _temp_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}{_TMP_MARK}{uuid.uuid4().hex[:12]}")
+
+
+def _is_temp(name: str) -> bool:
+    return name.startswith(".") and _TMP_MARK in name
+
+
+def _create(path: Path, data: bytes):
+    """Create path exclusively and write data, fsyncing when VAULT_FSYNC is on."""
+    with open(path, "xb") as fh:
+        fh.write(data)
+        if settings.VAULT_FSYNC:
+            fh.flush()
+            os.fsync(fh.fileno())
+
+
+def _fsync_dir(directory: Path):
+    if not settings.VAULT_FSYNC:
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def atomic_write(path: Path, content: str, exclusive: bool = False) -> bool:
+    """Write content to path via a temp file and a rename.
+
+    With exclusive=True an existing file is never replaced; returns False
+    instead. Returns True when the file was written.
+    """
+    with metrics.WRITE_SECONDS.time():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _temp_path(path)
+        _create(tmp, content.encode("utf-8"))
+        try:
+            if exclusive:
+                try:
+                    os.link(tmp, path)
+                except FileExistsError:
+                    return False
+                except OSError as e:
+                    if e.errno not in (errno.EPERM, errno.ENOTSUP, errno.EXDEV):
+                        raise
+                    # No hard links on this filesystem: fall back to a direct exclusive create.
+                    try:
+                        _create(path, content.encode("utf-8"))
+                    except FileExistsError:
+                        return False
+            else:
+                os.replace(tmp, path)
+        finally:
+            tmp.unlink(missing_ok=True)
+        _fsync_dir(path.parent)
+        return True
+
+
+def _apply(vault: Path, renames: list[tuple[str, str]]) -> list[Path]:
+    """Run vault-relative renames in order, skipping ones already done. Returns the paths touched."""
+    touched: list[Path] = []
+    for src_rel, dst_rel in renames:
+        src, dst = vault / src_rel, vault / dst_rel
+        try:
+            os.replace(src, dst)
+        except FileNotFoundError:
+            if not dst.exists():
+                logger.warning("[Journal] Cannot rename %s -> %s: both are missing", src_rel, dst_rel)
+                continue
+        touched += (src, dst)
+    for directory in {p.parent for p in touched}:
+        _fsync_dir(directory)
+    return touched
+
+
+class Transition:
+    """One multi-step vault change, journaled so it either completes or leaves no trace.
+
+        with Transition("process_item", "Needs_Action/EMAIL_x.md") as tx:
+            tx.write(plan_path, plan_content)
+            tx.move(source, done_path)
+            tx.commit()
+
+    Leaving the block without commit() (an early return or an exception)
+    discards the staged files and releases the claim.
+    """
+
+    def __init__(self, kind: str, key: str, vault: Path | None = None):
+        self.kind = kind
+        self.key = key
+        self.vault = vault or settings.vault_dir
+        self.journal = self.vault / JOURNAL_DIR / (key.replace("/", "__") + ".json")
+        self._renames: list[tuple[str, str]] = []
+        self._staged: list[Path] = []
+        self._committed = False
+
+    def _record(self, state: str) -> bytes:
+        return json.dumps({
+            "kind": self.kind,
+            "key": self.key,
+            "state": state,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "renames": self._renames,
+        }).encode("utf-8")
+
+    def __enter__(self) -> "Transition":
+        self.journal.parent.mkdir(parents=True, exist_ok=True)
+        try:
+            _create(self.journal, self._record("preparing"))
+        except FileExistsError:
+            raise TransitionConflict(f"{self.key} is already being changed") from None
+        return self
+
+    def _rel(self, path: Path) -> str:
+        return Path(path).relative_to(self.vault).as_posix()
+
+    def write(self, path: Path, content: str):
+        """Stage a new file; it appears at path on commit."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = _temp_path(path)
+        _create(tmp, content.encode("utf-8"))
+        self._staged.append(tmp)
+        self._renames.append((self._rel(tmp), self._rel(path)))
+
+    def move(self, src: Path, dst: Path):
+        """Move an existing file on commit."""
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        self._renames.append((self._rel(src), self._rel(dst)))
+
+    def commit(self):
+        with metrics.COMMIT_SECONDS.labels(self.kind).time():
+            tmp = _temp_path(self.journal)
+            _create(tmp, self._record("committed"))
+            os.replace(tmp, self.journal)
+            _fsync_dir(self.journal.parent)
+            self._committed = True
+            # A failure past this point leaves the committed journal for recover().
+            touched = _apply(self.vault, self._renames)
+            self.journal.unlink()
+        get_index(self.vault).touch(*touched)
+
+    def __exit__(self, exc_type, exc, tb):
+        if not self._committed:
+            for tmp in self._staged:
+                tmp.unlink(missing_ok=True)
+            self.journal.unlink(missing_ok=True)
+        return False
+
+
+def _remove_temp_files(vault: Path) -> int:
+    removed = 0
+    dirs = [vault, vault / JOURNAL_DIR] + [p for p in vault.iterdir() if p.is_dir() and p.name != ".state"]
+    for directory in dirs:
+        try:
+            with os.scandir(directory) as it:
+                stray = [Path(e.path) for e in it if _is_temp(e.name)]
+        except FileNotFoundError:
+            continue
+        for path in stray:
+            path.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def _repair_orphaned_approvals(vault: Path) -> list[Path]:
+    """Pending approvals whose source never left Needs_Action (a crash in the pre-journal
+    processor): finish the interrupted move to In_Progress."""
+    approvals = vault / "Pending_Approval"
+    if not approvals.is_dir():
+        return []
+    renames: list[tuple[str, str]] = []
+    for path in sorted(approvals.glob("*.md")):
+        source = str(parse_file(path).meta.get("source_file", ""))
+        if source and (vault / "Needs_Action" / source).is_file() and not (vault / "In_Progress" / source).exists():
+            renames.append((f"Needs_Action/{source}", f"In_Progress/{source}"))
+    if renames:
+        (vault / "In_Progress").mkdir(parents=True, exist_ok=True)
+    return _apply(vault, renames)
+
+
+def recover(vault: Path | None = None) -> dict[str, int]:
+    """Startup pass: finish committed transitions, drop unfinished ones, clean up temp files."""
+    vault = vault or settings.vault_dir
+    stats = {"rolled_forward": 0, "rolled_back": 0, "temp_files_removed": 0, "orphans_repaired": 0}
+    if not vault.is_dir():
+        return stats
+
+    touched: list[Path] = []
+    journal_dir = vault / JOURNAL_DIR
+    for journal in sorted(journal_dir.glob("*.json")) if journal_dir.is_dir() else []:
+        try:
+            record = json.loads(journal.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            record = {}
+        if record.get("state") == "committed":
+            touched += _apply(vault, [tuple(r) for r in record.get("renames", [])])
+            stats["rolled_forward"] += 1
+            logger.info("[Journal] Completed interrupted %s of %s", record.get("kind"), record.get("key"))
+        else:
+            stats["rolled_back"] += 1
+        journal.unlink(missing_ok=True)
+
+    stats["temp_files_removed"] = _remove_temp_files(vault)
+    repaired = _repair_orphaned_approvals(vault)
+    stats["orphans_repaired"] = len(repaired) // 2
+    touched += repaired
+
+    if touched:
+        get_index(vault).touch(*touched)
+    if any(stats.values()):
+        logger.info("[Journal] Recovery: %s", stats)
+    return stats
@@ -3,6 +3,9 @@ from datetime import datetime, timezone
 
 from app.config import settings
 from app.models.vault import VaultStatus, FolderStatus, CoreFileStatus
+from app.services import archive, io_executor
+from app.services.vault_index import get_index
+from app.services.vault_journal import atomic_write
 
 
 FOLDERS = [
@@ -235,14 +238,11 @@ def get_vault_status() -> VaultStatus:
     vault = settings.vault_dir
     initialized = vault.exists()
 
+    index = get_index()
     folders: list[FolderStatus] = []
     for folder_name in FOLDERS:
-        folder_path = vault / folder_name
-        if folder_path.exists():
-            count = len(list(folder_path.glob("*.md")))
-        else:
-            count = 0
-        folders.append(FolderStatus(name=folder_name, count=count))
+        archived = archive.count(folder_name)
+        folders.append(FolderStatus(name=folder_name, count=index.count(folder_name) + archived, archived=archived))
 
     core_files: list[CoreFileStatus] = []
     for fname in CORE_FILES:
@@ -255,6 +255,16 @@ def get_vault_status() -> VaultStatus:
     )
 
 
+def status_version() -> tuple:
+    """Changes whenever get_vault_status() can: folder contents, archive counts, which core files exist."""
+    vault = settings.vault_dir
+    return (
+        get_index().version(*FOLDERS),
+        tuple(archive.count(folder_name) for folder_name in FOLDERS),
+        tuple((vault / fname).exists() for fname in ("", *CORE_FILES)),
+    )
+
+
 def init_vault(owner: str, business: str) -> str:
     """Create all vault folders and write template core files."""
     vault = settings.vault_dir
@@ -262,6 +272,7 @@ def init_vault(owner: str, business: str) -> str:
     # Create all folders
     for folder_name in FOLDERS:
         (vault / folder_name).mkdir(parents=True, exist_ok=True)
+    get_index().touch(*(vault / folder_name for folder_name in FOLDERS))
 
     # Write core files
     templates = {
@@ -274,6 +285,13 @@ def init_vault(owner: str, business: str) -> str:
     for filename, template in templates.items():
         filepath = vault / filename
         content = _render(template, owner, business)
-        filepath.write_text(content, encoding="utf-8")
+        atomic_write(filepath, content)
 
     return f"Vault initialized at {vault} with {len(FOLDERS)} folders and {len(templates)} core files."
+
+
+# ── Async variants (run on the dedicated I/O executor) ──────────────────────
+
+
+async def init_vault_async(owner: str, business: str) -> str:
+    return await io_executor.run_write(init_vault, owner, business)
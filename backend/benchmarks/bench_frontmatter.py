@@ -0,0 +1,100 @@
+"""
+bench_frontmatter.py — Compare the legacy split-twice frontmatter parser with
+parse_document() and the cached parse_file() on synthetic EMAIL files.
+
+Usage (from backend/):
+    python -m benchmarks.bench_frontmatter [--files 10000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.services import frontmatter
+from app.services.frontmatter import get_body, parse_document, parse_file
+
+EMAIL = """\
+---
+type: email
+id: {i:08x}
+from: sender{i}@example.com
+subject: Invoice #{i} - Amount Due $123.45
+received: 2026-02-01 10:30:00 UTC
+priority: normal
+status: needs_action
+labels: ["INBOX", "IMPORTANT"]
+---
+
+# Invoice #{i}
+
+{body}
+"""
+
+
+def _legacy(text: str) -> tuple[dict[str, str], str]:
+    """The original implementation: _parse_frontmatter + _get_body, each splitting the text."""
+    meta: dict[str, str] = {}
+    lines = text.strip().splitlines()
+    if lines and lines[0].strip() == "---":
+        for i in range(1, len(lines)):
+            if lines[i].strip() == "---":
+                for line in lines[1:i]:
+                    if ":" in line:
+                        key, _, value = line.partition(":")
+                        meta[key.strip()] = value.strip()
+                break
+    lines = text.strip().splitlines()
+    body = text
+    if lines and lines[0].strip() == "---":
+        for i in range(1, len(lines)):
+            if lines[i].strip() == "---":
+                body = "\n".join(lines[i + 1:]).strip()
+                break
+    return meta, body[:200]
+
+
+def _new(text: str) -> tuple[dict[str, str], str]:
+    meta, body_start = parse_document(text)
+    return meta, text[body_start:body_start + 400].strip()[:200]
+
+
+def _time(label: str, fn, n: int):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34} {elapsed * 1000:9.1f} ms  {n / elapsed:12,.0f} files/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=10_000)
+    parser.add_argument("--body-lines", type=int, default=40)
+    args = parser.parse_args()
+
+    body = "\n".join(f"Line {j} of the message body with some text." for j in range(args.body_lines))
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        old = time.time() - 3600
+        for i in range(args.files):
+            path = Path(tmp) / f"EMAIL_{i:08x}.md"
+            path.write_text(EMAIL.format(i=i, body=body), encoding="utf-8")
+            os.utime(path, (old, old))
+            paths.append(path)
+        texts = [p.read_text(encoding="utf-8") for p in paths]
+
+        print(f"{args.files} files, ~{len(texts[0])} bytes each\n")
+        _time("legacy parse (in memory)", lambda: [_legacy(t) for t in texts], args.files)
+        _time("parse_document (in memory)", lambda: [_new(t) for t in texts], args.files)
+        _time("parse_document typed (in memory)", lambda: [parse_document(t, typed=True) for t in texts], args.files)
+
+        frontmatter.clear_cache()
+        _time("legacy read + parse", lambda: [_legacy(p.read_text(encoding="utf-8")) for p in paths], args.files)
+        _time("parse_file (cold cache)", lambda: [parse_file(p) for p in paths], args.files)
+        _time("parse_file (warm cache)", lambda: [parse_file(p) for p in paths], args.files)
+        print(f"\ncache: {frontmatter.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
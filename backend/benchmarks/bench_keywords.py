@@ -0,0 +1,92 @@
+"""
+bench_keywords.py — Compare keyword detection strategies on large email bodies.
+
+- legacy: the original processor path, _detect_priority followed by
+  _needs_approval, each lowercasing subject+body and looping `kw in text`.
+- regex: one alternation regex (re.IGNORECASE, word-start anchored).
+- matcher: keyword_matcher.scan(), one lowercase and all categories at once.
+
+Usage (from backend/):
+    python -m benchmarks.bench_keywords [--kb 128 --rounds 50]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from app.services import keyword_matcher
+from app.services.keyword_matcher import PRIORITY_KEYWORDS
+
+FILLER = (
+    "please review the attached quarterly report and let me know your thoughts "
+    "before our meeting on thursday the numbers look good overall thanks team"
+).split()
+
+
+def _body(kb: int, keyword: str | None, seed: int = 1) -> str:
+    rng = random.Random(seed)
+    words: list[str] = []
+    size = 0
+    while size < kb * 1024:
+        word = rng.choice(FILLER)
+        words.append(word.capitalize() if rng.random() < 0.1 else word)
+        size += len(word) + 1
+    if keyword:
+        words.append(keyword.upper())  # worst case: the only hit is at the very end
+    return " ".join(words)
+
+
+def _legacy(subject: str, body: str) -> tuple[str, bool]:
+    combined = (subject + " " + body).lower()
+    priority = "normal"
+    for kw in PRIORITY_KEYWORDS:
+        if kw in combined:
+            priority = "high"
+            break
+    combined = (subject + " " + body).lower()
+    approval = any(kw in combined for kw in PRIORITY_KEYWORDS)
+    return priority, approval
+
+
+_REGEX = re.compile(r"\b(?:" + "|".join(sorted(PRIORITY_KEYWORDS, key=len, reverse=True)) + ")", re.IGNORECASE)
+
+
+def _regex(subject: str, body: str) -> tuple[str, bool]:
+    hit = _REGEX.search(subject + " " + body) is not None
+    return ("high" if hit else "normal"), hit
+
+
+def _matcher(subject: str, body: str) -> tuple[str, bool]:
+    categories = keyword_matcher.scan(subject, body)
+    return ("high" if categories else "normal"), bool(categories)
+
+
+def bench(kb: int, rounds: int) -> dict[str, dict[str, float]]:
+    """Return {case: {strategy: MB/s}} for a body with no keyword and one with a trailing keyword."""
+    cases = {"no keyword": _body(kb, None), "keyword at end": _body(kb, "refund")}
+    results: dict[str, dict[str, float]] = {}
+    for case, body in cases.items():
+        results[case] = {}
+        for name, fn in (("legacy", _legacy), ("regex", _regex), ("matcher", _matcher)):
+            start = time.perf_counter()
+            for _ in range(rounds):
+                fn("Status update", body)
+            elapsed = time.perf_counter() - start
+            results[case][name] = len(body) * rounds / elapsed / 1e6
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--kb", type=int, default=128, help="body size in KiB")
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'case':<16}{'legacy MB/s':>13}{'regex MB/s':>13}{'matcher MB/s':>14}")
+    for case, r in bench(args.kb, args.rounds).items():
+        print(f"{case:<16}{r['legacy']:>13.0f}{r['regex']:>13.0f}{r['matcher']:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+bench_responses.py — Payload size and encode time of list responses, old path vs new.
+
+Builds N ActionItem models from simulator emails (no files are written) and
+serialises them the way GET /api/needs-action used to (model_dump per item,
+FastAPI's jsonable_encoder, json.dumps, uncompressed) and the way it does now
+(serialization.dump_models straight from the models, then gzip and, when
+the brotli package is installed, brotli).
+
+Usage (from backend/):
+    python -m benchmarks.bench_responses [--items 1000 10000 50000]
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.action_item import ActionItem
+from app.services import serialization
+from app.services.email_simulator import generate_emails
+from app.services.file_processor import ACTION_ITEMS
+from app.services.frontmatter import get_body, parse_document
+from app.services.vault_index import IndexEntry
+
+
+def build_items(count: int) -> list[ActionItem]:
+    items = []
+    for filename, content in generate_emails(count, seed=1):
+        meta, body_start = parse_document(content)
+        snippet = get_body(content, body_start)[:200]
+        entry = IndexEntry.preloaded(Path(filename), 0, len(content), meta, body_start, snippet)
+        items.append(ACTION_ITEMS.to_model(entry))
+    return items
+
+
+def _legacy(items: list[ActionItem]) -> bytes:
+    content = jsonable_encoder([item.model_dump() for item in items])
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def _timed(fn, *args) -> tuple[bytes, float]:
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def bench(count: int) -> dict[str, dict[str, float]]:
+    """{path: {"bytes": payload size, "ms": time to produce it}} for `count` items."""
+    items = build_items(count)
+    legacy, legacy_ms = _timed(_legacy, items)
+    body, encode_ms = _timed(serialization.dump_models, ActionItem, items)
+    assert json.loads(body) == json.loads(legacy)
+
+    results = {"legacy json": {"bytes": len(legacy), "ms": legacy_ms}, "fast json": {"bytes": len(body), "ms": encode_ms}}
+    for encoding in serialization.ENCODINGS:
+        compressed, ms = _timed(serialization.compress, body, encoding)
+        results[f"fast json + {encoding}"] = {"bytes": len(compressed), "ms": encode_ms + ms}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, nargs="+", default=[1000, 10000, 50000])
+    args = parser.parse_args()
+
+    print(f"{'items':>7}  {'path':<18}{'KiB':>10}{'ms':>9}")
+    for count in args.items:
+        for path, r in bench(count).items():
+            print(f"{count:>7}  {path:<18}{r['bytes'] / 1024:>10,.0f}{r['ms']:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+bench_search.py — Build, reload and query the full-text search index at scale.
+
+Documents are simulator emails fed straight to SearchIndex.add_document (no
+files are written), spread over Done, Needs_Action and Approved. Reports the
+build rate, segment reload time and per-query latency; "max" is the first,
+cold run, which builds that query's per-segment bitmaps.
+
+Usage (from backend/):
+    python -m benchmarks.bench_search [--docs 500000 --rounds 20]
+"""
+
+import argparse
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from app.services.email_simulator import generate_emails
+from app.services.search_index import SearchIndex, parse_query
+from app.services.vault_index import VaultIndex
+
+QUERIES = [
+    "payment",
+    "meeting partnership",
+    "subscription renewal professional",
+    "subject:invoice",
+    "from:stripe",
+    "paym*",
+    "payment folder:Approved",
+    "renewal type:email",
+    "payment after:2000-01-01",
+]
+FOLDERS = ["Done"] * 8 + ["Needs_Action", "Approved"]
+
+
+def bench(docs: int, rounds: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        engine = SearchIndex(VaultIndex(root))
+        start = time.perf_counter()
+        for i, (filename, content) in enumerate(generate_emails(docs, seed=1)):
+            engine.add_document(FOLDERS[i % len(FOLDERS)], filename, i, len(content), content)
+        engine.close()
+        build = time.perf_counter() - start
+        print(f"indexed {docs} docs in {build:.1f}s ({docs / build:,.0f} docs/s), {engine.stats()}")
+
+        start = time.perf_counter()
+        engine = SearchIndex(VaultIndex(root))
+        print(f"reloaded {engine.stats()['documents']} docs in {time.perf_counter() - start:.2f}s")
+
+        print(f"{'query':<40}{'hits':>9}{'p50 ms':>9}{'max ms':>9}")
+        for text in QUERIES:
+            query = parse_query(text)
+            times = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                _, total = engine.search(query, 20)
+                times.append((time.perf_counter() - start) * 1000)
+            print(f"{text:<40}{total:>9}{statistics.median(times):>9.1f}{max(times):>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=500_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    bench(args.docs, args.rounds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+fs_intake.py — Drop a burst of files into Inbox/ under a running filesystem
+watcher and report intake throughput and event-to-action-file latency.
+
+Files are written the way a scanner export or `cp -r` would: all at once,
+each in a couple of chunks, so the watcher sees create + modify events and
+partially written files. The vault is a fresh temporary directory.
+
+Usage (from backend/):
+    python -m benchmarks.fs_intake [--files 2000 --size 4096 --debounce 0.25]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+from watchers import filesystem_watcher
+from watchers.filesystem_watcher import IntakeStats, run_filesystem_watcher_async
+
+
+def _drop_files(inbox: Path, files: int, size: int):
+    chunk = b"x" * (size // 2)
+    for i in range(files):
+        with open(inbox / f"scan_{i:05d}.pdf", "wb") as fh:
+            fh.write(chunk)
+            fh.flush()
+            fh.write(chunk)
+
+
+async def run_intake(vault: Path, files: int, size: int, debounce: float, timeout: float = 120) -> dict:
+    """Run the watcher, drop `files` files of `size` bytes, wait for every action file."""
+    stats = IntakeStats()
+    task = asyncio.create_task(run_filesystem_watcher_async(vault, dry_run=False, debounce=debounce, stats=stats))
+    await asyncio.sleep(0.5)  # let the observer start
+
+    inbox, needs_action = vault / "Inbox", vault / "Needs_Action"
+    start = time.perf_counter()
+    # Write from a thread so the watcher's consumer keeps running during the drop.
+    await asyncio.to_thread(_drop_files, inbox, files, size)
+    written = time.perf_counter() - start
+
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if needs_action.exists() and sum(1 for _ in needs_action.glob("FILE_scan_*.md")) >= files:
+            break
+        await asyncio.sleep(0.05)
+    total = time.perf_counter() - start
+
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    snap = stats.snapshot()
+    snap.update(dropped=files, drop_seconds=round(written, 3), end_to_end_seconds=round(total, 3))
+    return snap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--size", type=int, default=4096)
+    parser.add_argument("--debounce", type=float, default=filesystem_watcher.DEBOUNCE_SECONDS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        result = asyncio.run(run_intake(Path(tmp), args.files, args.size, args.debounce))
+
+    lat = result["latency_ms"]
+    print(f"dropped {result['dropped']} files in {result['drop_seconds']:.2f}s; "
+          f"all action files after {result['end_to_end_seconds']:.2f}s")
+    print(f"processed {result['files']} in {result['batches']} batches "
+          f"({result['files_per_second']:.0f} files/s while writing)")
+    print(f"event-to-action-file latency ms: p50={lat['p50']:.0f} p95={lat['p95']:.0f} "
+          f"p99={lat['p99']:.0f} max={lat['max']:.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+load_mixed.py — Mixed-traffic load test: health probes and dashboard/list polling
+while writers simulate and process emails, reporting per-endpoint latency.
+
+Requests go through the ASGI app in-process (httpx.ASGITransport), so the
+numbers measure the app's own scheduling (event loop, I/O pools) rather than
+the network. The vault is a fresh temporary directory. Exits non-zero when a
+request fails or health p99 reaches HEALTH_P99_LIMIT_MS (health must not queue
+behind vault I/O).
+
+Usage (from backend/):
+    python -m benchmarks.load_mixed [--seconds 10 --readers 20 --writers 8 --probes 2]
+"""
+
+import argparse
+import asyncio
+import tempfile
+import time
+from collections import defaultdict
+
+import httpx
+
+from app.config import settings
+from app.main import app
+
+HEALTH = "GET /api/health"
+HEALTH_P99_LIMIT_MS = 100
+
+READ_PATHS = ("/api/dashboard", "/api/needs-action?limit=50", "/api/approvals?limit=50", "/api/vault/status")
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_load(seconds: float, readers: int, writers: int, probes: int) -> dict[str, dict[str, float]]:
+    """Drive the app for `seconds` and return {endpoint: {count, errors, p50, p95, p99, max}} in ms."""
+    latencies: dict[str, list[float]] = defaultdict(list)
+    errors: dict[str, int] = defaultdict(int)
+    deadline = time.perf_counter() + seconds
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://load") as client:
+        await client.post("/api/vault/init", json={"owner": "Load", "business": "Test"})
+
+        async def call(label: str, method: str, url: str, **kwargs) -> httpx.Response | None:
+            start = time.perf_counter()
+            resp = await client.request(method, url, **kwargs)
+            latencies[label].append((time.perf_counter() - start) * 1000)
+            if resp.status_code >= 400:
+                errors[label] += 1
+                return None
+            return resp
+
+        async def probe():
+            while time.perf_counter() < deadline:
+                await call(HEALTH, "GET", "/api/health")
+                await asyncio.sleep(0.01)
+
+        async def reader(n: int):
+            i = n
+            while time.perf_counter() < deadline:
+                path = READ_PATHS[i % len(READ_PATHS)]
+                await call(f"GET {path.split('?')[0]}", "GET", path)
+                i += 1
+
+        async def writer(n: int):
+            i = 0
+            while time.perf_counter() < deadline:
+                resp = await call("POST /api/simulate/email", "POST", "/api/simulate/email", json={
+                    "sender": f"writer{n}@example.com",
+                    "subject": "URGENT: invoice" if i % 3 == 0 else f"Status update {i}",
+                    "body": "Load test message. " * 20,
+                    "type": "payment" if i % 5 == 0 else "email",
+                    "priority": "normal",
+                })
+                if resp is not None:
+                    await call("POST /api/needs-action/process", "POST", "/api/needs-action/process",
+                               json={"filename": resp.json()["filename"]})
+                i += 1
+
+        await asyncio.gather(
+            *(probe() for _ in range(probes)),
+            *(reader(n) for n in range(readers)),
+            *(writer(n) for n in range(writers)),
+        )
+
+    return {
+        label: {
+            "count": len(samples),
+            "errors": errors[label],
+            "p50": percentile(samples, 50),
+            "p95": percentile(samples, 95),
+            "p99": percentile(samples, 99),
+            "max": max(samples),
+        }
+        for label, samples in sorted(latencies.items())
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--readers", type=int, default=20)
+    parser.add_argument("--writers", type=int, default=8)
+    parser.add_argument("--probes", type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.VAULT_PATH = tmp
+        results = asyncio.run(run_load(args.seconds, args.readers, args.writers, args.probes))
+
+    print(f"{'endpoint':<34}{'count':>7}{'errors':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for label, r in results.items():
+        print(
+            f"{label:<34}{r['count']:>7}{r['errors']:>7}"
+            f"{r['p50']:>9.1f}{r['p95']:>9.1f}{r['p99']:>9.1f}{r['max']:>9.1f}"
+        )
+
+    failures = [f"{label}: {r['errors']} errors" for label, r in results.items() if r["errors"]]
+    health_p99 = results[HEALTH]["p99"]
+    if health_p99 >= HEALTH_P99_LIMIT_MS:
+        failures.append(f"{HEALTH}: p99 {health_p99:.1f} ms >= {HEALTH_P99_LIMIT_MS} ms")
+    print("\nFAIL: " + "; ".join(failures) if failures else f"\nOK: {HEALTH} p99 < {HEALTH_P99_LIMIT_MS} ms, no errors")
+    raise SystemExit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -68,3 +68,27 @@ def test_approve_moves_source_to_done(client, initialized_vault, vault_dir):
     client.post(f"/api/approvals/{approval_id}/approve")
     assert (vault_dir / "Done" / email_filename).exists()
     assert not (vault_dir / "In_Progress" / email_filename).exists()
+
+
+def test_approve_by_filename_id(client, initialized_vault, vault_dir):
+    """An approval without a frontmatter id is found via its APPROVAL_{id}.md name."""
+    (vault_dir / "Pending_Approval" / "APPROVAL_manual1.md").write_text(
+        "---\ntype: approval\nsubject: Manual\n---\n\nBody\n", encoding="utf-8"
+    )
+    resp = client.post("/api/approvals/manual1/approve")
+    assert resp.status_code == 200
+    assert (vault_dir / "Approved" / "APPROVAL_manual1.md").exists()
+
+
+def test_list_paginated_and_filtered(client, initialized_vault):
+    """Approvals take the same limit/cursor/filter/fields parameters."""
+    for _ in range(3):
+        _create_approvable_item(client)
+    resp = client.get("/api/approvals", params={"limit": 2, "fields": "id,subject"})
+    assert len(resp.json()) == 2
+    assert set(resp.json()[0]) == {"id", "subject"}
+    rest = client.get("/api/approvals", params={"cursor": resp.headers["x-next-cursor"]}).json()
+    assert len(rest) == 1
+
+    assert len(client.get("/api/approvals", params={"sender": "VENDOR@"}).json()) == 3
+    assert client.get("/api/approvals", params={"priority": "high"}).json() == []
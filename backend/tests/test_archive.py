@@ -0,0 +1,135 @@
+import gzip
+import os
+import shutil
+import time
+
+import pytest
+
+from app.services import archive, search_index, vault_index
+from app.services.archive import ARCHIVE_DIR
+from app.services.search_index import SEARCH_DIR
+
+
+@pytest.fixture(autouse=True)
+def close_search_index():
+    yield
+    search_index.shutdown()
+
+
+def _done_items(client, vault_dir, *subjects, age_days=40):
+    """Simulate and process emails, then backdate their Done and Plans files."""
+    names = [
+        client.post("/api/simulate/email", json={
+            "sender": "a@example.com", "subject": subject, "body": f"About the {subject.lower()}.",
+        }).json()["filename"]
+        for subject in subjects
+    ]
+    client.post("/api/needs-action/process-all")
+    old = time.time() - age_days * 86400
+    for path in [*(vault_dir / "Done").glob("*.md"), *(vault_dir / "Plans").glob("*.md")]:
+        os.utime(path, (old, old))
+        vault_index.get_index().touch(path)
+    return names
+
+
+def test_archive_moves_old_items_into_monthly_packs(client, initialized_vault, vault_dir):
+    names = _done_items(client, vault_dir, "Harbour lease", "Fleet insurance")
+    originals = {n: (vault_dir / "Done" / n).read_text() for n in names}
+    recent = client.post("/api/simulate/email", json={"sender": "b@example.com", "subject": "New", "body": "x"})
+    client.post("/api/needs-action/process-all")
+    dashboard = client.get("/api/dashboard").json()
+
+    result = client.post("/api/vault/archive").json()
+    assert result["archived"] == 4  # two Done emails and their two plans
+    assert sorted(p.name for p in (vault_dir / "Done").iterdir()) == [recent.json()["filename"]]
+    packs = sorted(p.name for p in (vault_dir / ARCHIVE_DIR).iterdir())
+    assert len(packs) == 4 and all(p.startswith(("Done_", "Plans_")) for p in packs)
+
+    done = next(f for f in client.get("/api/vault/status").json()["folders"] if f["name"] == "Done")
+    assert (done["count"], done["archived"]) == (3, 2)
+    assert dashboard["active_plans"] == 3
+    assert client.get("/api/dashboard").json()["active_plans"] == 1  # the archived plans are not active
+
+    for name, content in originals.items():
+        resp = client.get(f"/api/vault/archive/Done/{name}")
+        assert resp.status_code == 200 and resp.json()["content"] == content
+    pack = next((vault_dir / ARCHIVE_DIR).glob("Done_*.pack"))
+    assert gzip.decompress(pack.read_bytes()).decode() == "".join(originals[n] for n in sorted(originals))
+    assert client.get("/api/vault/archive/Done/EMAIL_missing.md").status_code == 404
+
+    status = client.get("/api/vault/archive").json()
+    assert status["items"] == 4 and {p["folder"] for p in status["packs"]} == {"Done", "Plans"}
+    assert client.post("/api/vault/archive").json()["archived"] == 0
+
+
+def test_archived_items_stay_searchable(client, initialized_vault, vault_dir):
+    _done_items(client, vault_dir, "Harbour lease")
+    assert client.get("/api/search", params={"q": "harbour folder:Done"}).json()["total"] == 1
+
+    client.post("/api/vault/archive")
+    hit = client.get("/api/search", params={"q": "harbour folder:Done"}).json()["hits"][0]
+    assert hit["archived"] is True and hit["subject"] == "Harbour lease"
+
+    # A search index rebuilt from scratch reads archived items back from their packs.
+    search_index.shutdown()
+    vault_index._index = None
+    shutil.rmtree(vault_dir / SEARCH_DIR)
+    result = client.get("/api/search", params={"q": "harbour"}).json()
+    assert {(h["folder"], h["archived"]) for h in result["hits"]} == {("Done", True), ("Plans", True)}
+
+
+def test_interrupted_run_is_completed_without_duplicates(client, initialized_vault, vault_dir):
+    (name,) = _done_items(client, vault_dir, "Harbour lease")
+    source = vault_dir / "Done" / name
+    content = source.read_bytes()
+    stat = source.stat()
+    client.post("/api/vault/archive", params={"older_than_days": 7})
+
+    # Crash between writing the pack index and deleting the source: the file is back.
+    source.write_bytes(content)
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    vault_index.get_index().touch(source)
+    assert archive.archive(7).archived == 1
+    assert not source.exists()
+    assert archive.get_archive().count("Done") == 1
+    assert client.get("/api/vault/archive").json()["items"] == 2
+
+
+def _old_file(vault_dir, name, text, age_days):
+    path = vault_dir / "Done" / name
+    path.write_text(f"---\ntype: file_intake\nsubject: {text}\n---\n\n{text}.\n")
+    old = time.time() - age_days * 86400
+    os.utime(path, (old, old))
+    vault_index.get_index().touch(path)
+    return path
+
+
+def test_repeated_names_are_archived_side_by_side(client, initialized_vault, vault_dir):
+    """Inbox-derived names repeat: a later item with an archived item's name must not shadow it."""
+    _old_file(vault_dir, "FILE_report.md", "Quarterly walrus report", 90)
+    client.post("/api/vault/archive")
+    second = _old_file(vault_dir, "FILE_report.md", "Quarterly pelican report", 40)
+    client.post("/api/vault/archive")
+    months = sorted(archive._month(ns) for ns in ((time.time() - d * 86400) * 1e9 for d in (90, 40)))
+
+    store = archive.get_archive()
+    assert store.count("Done") == 2 and not second.exists()
+    assert [p["month"] for p in client.get("/api/vault/archive").json()["packs"]] == months
+    for month, animal in zip(months, ("walrus", "pelican")):
+        resp = client.get(f"/api/vault/archive/Done/{month}/FILE_report.md").json()
+        assert resp["month"] == month and animal in resp["content"]
+    assert client.get("/api/vault/archive/Done/FILE_report.md").json()["month"] == months[1]
+    assert client.get("/api/vault/archive/Done/1999-01/FILE_report.md").status_code == 404
+
+    hits = client.get("/api/search", params={"q": "quarterly report"}).json()["hits"]
+    assert sorted((h["filename"], h["month"]) for h in hits) == [("FILE_report.md", m) for m in months]
+
+    # The same name twice within one month: the second copy gets a suffix.
+    _old_file(vault_dir, "FILE_report.md", "Quarterly heron report", 40)
+    client.post("/api/vault/archive")
+    assert store.count("Done") == 3
+    assert "heron" in store.read(store.get("Done", "FILE_report~2.md", months[1]))
+
+
+def test_archive_validates_age(client, initialized_vault):
+    assert client.post("/api/vault/archive", params={"older_than_days": 0}).status_code == 422
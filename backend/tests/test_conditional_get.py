@@ -0,0 +1,94 @@
+import os
+import time
+
+import pytest
+
+from app.config import settings
+from app.services import metadata_store, vault_index
+from app.services.vault_index import VaultIndex
+
+READ_ENDPOINTS = ["/api/dashboard", "/api/needs-action", "/api/approvals", "/api/vault/status", "/api/handbook"]
+
+
+def _simulate(client, subject="Hello"):
+    return client.post("/api/simulate/email", json={
+        "sender": "a@example.com", "subject": subject, "body": "Just checking in.",
+    }).json()["filename"]
+
+
+@pytest.mark.parametrize("path", READ_ENDPOINTS)
+def test_unchanged_resources_revalidate_with_304(client, initialized_vault, path):
+    first = client.get(path)
+    etag = first.headers["etag"]
+    assert first.status_code == 200 and first.headers["cache-control"] == "no-cache"
+
+    again = client.get(path, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b"" and again.headers["etag"] == etag
+    assert client.get(path, headers={"If-None-Match": f'"other", W/{etag}'}).status_code == 304
+    assert client.get(path, headers={"If-None-Match": '"other"'}).json() == first.json()
+
+
+def test_writes_change_the_etag(client, initialized_vault, vault_dir):
+    etags = {path: client.get(path).headers["etag"] for path in READ_ENDPOINTS}
+
+    name = _simulate(client, "Quarterly report")
+    for path in ("/api/dashboard", "/api/needs-action", "/api/vault/status"):
+        resp = client.get(path, headers={"If-None-Match": etags[path]})
+        assert resp.status_code == 200 and resp.headers["etag"] != etags[path]
+    assert [i["filename"] for i in client.get("/api/needs-action").json()] == [name]
+    for path in ("/api/approvals", "/api/handbook"):
+        assert client.get(path, headers={"If-None-Match": etags[path]}).status_code == 304
+
+    client.put("/api/handbook", json={"content": "# Handbook\n"})
+    resp = client.get("/api/handbook", headers={"If-None-Match": etags["/api/handbook"]})
+    assert resp.status_code == 200 and resp.json()["content"] == "# Handbook\n"
+
+    # Changes made behind the app's back are picked up too.
+    (vault_dir / "Needs_Action" / name).unlink()
+    assert client.get("/api/needs-action").json() == []
+
+
+def test_pages_are_cached_per_query(client, initialized_vault):
+    for i in range(3):
+        _simulate(client, f"Item {i}")
+    page = client.get("/api/needs-action", params={"limit": 2})
+    assert len(page.json()) == 2 and page.headers["x-next-cursor"]
+    assert len(client.get("/api/needs-action", params={"limit": 1}).json()) == 1
+
+    again = client.get("/api/needs-action", params={"limit": 2})
+    assert again.json() == page.json() and again.headers["x-next-cursor"] == page.headers["x-next-cursor"]
+    assert client.get("/api/needs-action", params={"cursor": "!!"}).status_code == 400
+
+
+@pytest.fixture(params=[False, True], ids=["aggregator", "store"])
+def metrics_source(request, monkeypatch):
+    monkeypatch.setattr(settings, "METADATA_STORE", request.param)
+    yield
+    metadata_store.shutdown()
+
+
+def test_cached_dashboard_expires_when_an_alert_is_due(client, initialized_vault, vault_dir, metrics_source):
+    name = _simulate(client)
+    almost = time.time() - 12 * 3600 + 0.5
+    os.utime(vault_dir / "Needs_Action" / name, (almost, almost))
+    vault_index.get_index().touch(vault_dir / "Needs_Action" / name)
+
+    first = client.get("/api/dashboard")
+    assert first.json()["alerts"] == ["No alerts. All clear."]
+    time.sleep(0.6)
+    resp = client.get("/api/dashboard", headers={"If-None-Match": first.headers["etag"]})
+    assert resp.status_code == 200 and resp.json()["alerts"] == [f"Needs action > 12h: {name}"]
+
+
+def test_index_version_moves_only_on_change(tmp_path):
+    (tmp_path / "Done").mkdir()
+    index = VaultIndex(tmp_path)
+    before = index.version("Done", "Plans")
+    assert index.version("Done", "Plans") == before
+
+    (tmp_path / "Done" / "a.md").write_text("---\nid: a\n---\n")
+    index.touch(tmp_path / "Done" / "a.md")
+    after = index.version("Done", "Plans")
+    assert after[0] != before[0] and after[1] == before[1]
+    index.touch(tmp_path / "Done" / "a.md")
+    assert index.version("Done", "Plans") == after
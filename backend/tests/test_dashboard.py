@@ -29,3 +29,38 @@ def test_dashboard_refresh_updates_file(client, initialized_vault, vault_dir):
     content = (vault_dir / "Dashboard.md").read_text(encoding="utf-8")
     # The refreshed dashboard should mention pending actions count
     assert "Pending actions" in content
+
+
+def test_dashboard_alerts_for_stale_items(client, initialized_vault, vault_dir):
+    """Items older than the alert thresholds show up as alerts."""
+    import os
+    import time
+
+    client.post("/api/simulate/batch", json={"count": 2})
+    stale = sorted((vault_dir / "Needs_Action").glob("*.md"))[0]
+    old = time.time() - 13 * 3600
+    os.utime(stale, (old, old))
+
+    from app.services.vault_index import get_index
+    get_index().touch(stale)
+
+    alerts = client.get("/api/dashboard").json()["alerts"]
+    assert alerts == [f"Needs action > 12h: {stale.name}"]
+
+
+def test_dashboard_tracks_processing(client, initialized_vault):
+    """Counts, done_today and recent activity follow items through the pipeline."""
+    resp = client.post("/api/simulate/email", json={
+        "sender": "friend@example.com",
+        "subject": "Lunch",
+        "body": "See you at noon.",
+    })
+    filename = resp.json()["filename"]
+    assert client.get("/api/dashboard").json()["needs_action"] == 1
+
+    client.post("/api/needs-action/process", json={"filename": filename})
+    data = client.get("/api/dashboard").json()
+    assert data["needs_action"] == 0
+    assert data["done_today"] == 1
+    assert data["active_plans"] == 1
+    assert data["recent_activity"][0].startswith(f"[Done] {filename[:-3]} - ")
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import threading
+
+from app.services import email_simulator, events, file_processor, vault_service
+from app.services.vault_index import get_index
+
+
+def _parse(frame: str) -> tuple[str, dict]:
+    fields = dict(line.split(": ", 1) for line in frame.strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+async def _collect(sub, until: str, timeout: float = 2.0) -> list[tuple[str, dict]]:
+    received = []
+    while True:
+        frame = await asyncio.wait_for(sub.queue.get(), timeout=timeout)
+        received.append(_parse(frame))
+        if received[-1][0] == until:
+            return received
+
+
+def test_events_follow_item_through_pipeline(vault_dir):
+    """Creating and processing an item publishes typed events and a dashboard delta."""
+    vault_service.init_vault("Owner", "Biz")
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        sub = events.bus.subscribe()
+        try:
+            _, filename = await loop.run_in_executor(
+                None, email_simulator.simulate_email, "a@example.com", "Hello", "Just saying hi.",
+            )
+            created = await _collect(sub, "item_created")
+            await loop.run_in_executor(None, file_processor.process_item, filename)
+            processed = await _collect(sub, "dashboard")
+            return filename, created, processed
+        finally:
+            events.bus.unsubscribe(sub)
+
+    filename, created, processed = asyncio.run(scenario())
+    assert created[-1][1]["filename"] == filename
+    by_type = dict(processed)
+    assert by_type["item_removed"] == {"filename": filename}
+    assert by_type["item_processed"]["outcome"] == "done"
+    assert by_type["dashboard"]["needs_action"] == 0
+
+
+def test_index_events_are_built_off_the_index_lock(vault_dir, monkeypatch):
+    """Index listeners run under the index lock; event payloads are built later, on the read pool."""
+    vault_service.init_vault("Owner", "Biz")
+    prefix, to_payload = events._folder_events["Needs_Action"]
+    calls = []
+
+    def recording(entry):
+        calls.append((threading.current_thread().name, get_index()._lock._is_owned()))
+        return to_payload(entry)
+
+    monkeypatch.setitem(events._folder_events, "Needs_Action", (prefix, recording))
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        sub = events.bus.subscribe()
+        try:
+            await loop.run_in_executor(None, email_simulator.simulate_bulk, 20, 1)
+            return [await _collect(sub, "item_created") for _ in range(20)]
+        finally:
+            events.bus.unsubscribe(sub)
+
+    asyncio.run(scenario())
+    assert len(calls) == 20
+    assert all(name.startswith("vault-read") and not locked for name, locked in calls)
+
+
+def test_events_replay_after_reconnect(vault_dir):
+    """A client reconnecting with Last-Event-ID receives only what it missed."""
+
+    async def scenario():
+        keeper = events.bus.subscribe()
+        events.publish("item_processed", filename="A.md", outcome="done")
+        first = await _collect(keeper, "item_processed")
+        seq = int(events.bus._replay[-1][0])
+        events.publish("item_processed", filename="B.md", outcome="done")
+        await _collect(keeper, "item_processed")
+
+        resumed = events.bus.subscribe(last_event_id=seq)
+        missed = await _collect(resumed, "item_processed")
+        events.bus.unsubscribe(keeper)
+        events.bus.unsubscribe(resumed)
+        return first, missed
+
+    first, missed = asyncio.run(scenario())
+    assert first[0][1]["filename"] == "A.md"
+    assert missed == [("item_processed", {"filename": "B.md", "outcome": "done"})]
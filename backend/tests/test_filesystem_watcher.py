@@ -0,0 +1,209 @@
+import asyncio
+import time
+
+from watchers import filesystem_watcher
+from watchers.filesystem_watcher import (
+    CatchUpProgress,
+    InboxHandler,
+    InboxManifest,
+    IntakeQueue,
+    IntakeStats,
+    catch_up_inbox,
+    consume_intake,
+    run_filesystem_watcher_async,
+    scan_inbox_gap,
+)
+
+
+def test_queue_coalesces_repeated_events(tmp_path):
+    f = tmp_path / "scan.pdf"
+    f.write_bytes(b"x" * 10)
+    queue = IntakeQueue(debounce=0.5)
+    for _ in range(5):
+        queue.note(f, now=0.0)
+    assert (queue.events, queue.coalesced, len(queue)) == (5, 4, 1)
+
+    assert queue.take_ready(now=0.1) == []  # still inside the debounce window
+    assert queue.take_ready(now=1.0) == []  # first stability check records size/mtime
+    ready = queue.take_ready(now=1.1)
+    assert [(r.path, r.size) for r in ready] == [(f, 10)]
+    assert len(queue) == 0
+
+
+def test_queue_waits_for_size_to_stabilise(tmp_path):
+    f = tmp_path / "big.bin"
+    f.write_bytes(b"a")
+    queue = IntakeQueue(debounce=0.0)
+    queue.note(f, now=0.0)
+    assert queue.take_ready(now=1.0) == []
+    f.write_bytes(b"a" * 100)  # still being copied
+    assert queue.take_ready(now=2.0) == []
+    assert [r.size for r in queue.take_ready(now=3.0)] == [100]
+
+
+def test_queue_drops_vanished_and_deleted_files(tmp_path):
+    gone, deleted = tmp_path / "gone.txt", tmp_path / "deleted.txt"
+    deleted.write_text("x")
+    queue = IntakeQueue(debounce=0.0)
+    queue.note(gone, now=0.0)
+    queue.note(deleted, now=0.0)
+    queue.discard(deleted)
+    assert queue.take_ready(now=1.0) == []
+    assert len(queue) == 0
+
+
+def test_process_batch_writes_action_files_once(vault_dir):
+    inbox = vault_dir / "Inbox"
+    inbox.mkdir()
+    handler = InboxHandler(vault_dir, dry_run=False, queue=IntakeQueue(debounce=0.0))
+    for name in ("a.txt", "b report.txt", "a.txt"):
+        (inbox / name).write_text("hello")
+        handler.queue.note(inbox / name, now=0.0)
+    handler.queue.take_ready(now=1.0)
+    created = handler.process_batch(handler.queue.take_ready(now=2.0))
+
+    assert sorted(p.name for p in created) == ["FILE_a.md", "FILE_b_report.md"]
+    text = (vault_dir / "Needs_Action" / "FILE_b_report.md").read_text()
+    assert "type: file_intake" in text and "**Size**: 5 bytes" in text
+
+    handler.queue.note(inbox / "a.txt", now=3.0)
+    handler.queue.take_ready(now=4.0)
+    assert handler.process_batch(handler.queue.take_ready(now=5.0)) == []
+
+
+def test_consumer_drains_burst_and_records_latency(vault_dir):
+    inbox = vault_dir / "Inbox"
+    inbox.mkdir()
+    handler = InboxHandler(vault_dir, dry_run=False, queue=IntakeQueue(debounce=0.02))
+    stats = IntakeStats()
+
+    async def scenario():
+        task = asyncio.create_task(consume_intake(handler, stats, check_interval=0.01, batch_size=100))
+        await asyncio.sleep(0)
+        for i in range(500):
+            path = inbox / f"doc{i:04d}.txt"
+            path.write_text("scan")
+            handler.queue.note(path)
+            handler.queue.note(path)  # watchdog typically reports created + modified
+        deadline = time.monotonic() + 10
+        while stats.files < 500 and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    snap = stats.snapshot(handler.queue)
+    assert snap["files"] == 500
+    assert snap["coalesced"] == 500 and snap["pending"] == 0
+    assert snap["batches"] >= 5
+    assert snap["files_per_second"] > 0
+    assert 0 < snap["latency_ms"]["p50"] <= snap["latency_ms"]["p99"] <= snap["latency_ms"]["max"]
+    assert len(list((vault_dir / "Needs_Action").glob("FILE_doc*.md"))) == 500
+
+
+def test_watcher_picks_up_dropped_files(vault_dir):
+    inbox = vault_dir / "Inbox"
+
+    async def scenario():
+        task = asyncio.create_task(run_filesystem_watcher_async(vault_dir, dry_run=False, debounce=0.05))
+        await asyncio.sleep(0.3)
+        for i in range(20):
+            (inbox / f"drop{i}.txt").write_text("data")
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            if len(list((vault_dir / "Needs_Action").glob("FILE_drop*.md"))) == 20:
+                break
+            await asyncio.sleep(0.05)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert len(list((vault_dir / "Needs_Action").glob("FILE_drop*.md"))) == 20
+
+
+def _manifest(vault_dir):
+    return InboxManifest(vault_dir / ".state" / "inbox_manifest.json")
+
+
+def test_scan_finds_files_without_action_files(vault_dir):
+    inbox = vault_dir / "Inbox"
+    inbox.mkdir()
+    for name in ("new.txt", "done.txt", "working.txt", "x.pdf", "x.txt", ".partial"):
+        (inbox / name).write_text("data")
+    for folder, action in (("Done", "FILE_done.md"), ("In_Progress", "FILE_working.md")):
+        (vault_dir / folder).mkdir()
+        (vault_dir / folder / action).write_text("---\ntype: file_intake\n---\n")
+
+    handler = InboxHandler(vault_dir, dry_run=False, manifest=_manifest(vault_dir))
+    total, gap = scan_inbox_gap(handler)
+
+    assert total == 5
+    assert [r.path.name for r in gap] == ["new.txt", "x.pdf"]
+    # Files handled before the manifest existed are adopted into it.
+    assert handler.manifest.matches("done.txt", 4, (inbox / "done.txt").stat().st_mtime_ns)
+
+
+def test_catch_up_processes_gap_and_persists_manifest(vault_dir):
+    inbox = vault_dir / "Inbox"
+    inbox.mkdir()
+    for i in range(150):
+        (inbox / f"offline{i:03d}.txt").write_text("arrived while down")
+
+    handler = InboxHandler(vault_dir, dry_run=False, manifest=_manifest(vault_dir))
+    progress = CatchUpProgress()
+    asyncio.run(catch_up_inbox(handler, progress, workers=4, batch_size=16))
+
+    assert (progress.state, progress.inbox_files, progress.gap) == ("done", 150, 150)
+    assert (progress.processed, progress.created) == (150, 150)
+    assert progress.finished is not None
+    assert len(list((vault_dir / "Needs_Action").glob("FILE_offline*.md"))) == 150
+
+    # Next startup: the action files were archived elsewhere, but the manifest remembers.
+    for f in (vault_dir / "Needs_Action").glob("FILE_offline*.md"):
+        f.unlink()
+    (inbox / "later.txt").write_text("new")
+    handler = InboxHandler(vault_dir, dry_run=False, manifest=_manifest(vault_dir))
+    progress = CatchUpProgress()
+    asyncio.run(catch_up_inbox(handler, progress))
+    assert (progress.gap, progress.created) == (1, 1)
+    assert [f.name for f in (vault_dir / "Needs_Action").iterdir()] == ["FILE_later.md"]
+
+
+def test_dry_run_catch_up_writes_nothing(vault_dir):
+    inbox = vault_dir / "Inbox"
+    inbox.mkdir()
+    (inbox / "a.txt").write_text("x")
+    handler = InboxHandler(vault_dir, dry_run=True)
+    progress = CatchUpProgress()
+    asyncio.run(catch_up_inbox(handler, progress))
+    assert (progress.state, progress.gap, progress.created) == ("done", 1, 0)
+    assert not list((vault_dir / "Needs_Action").iterdir())
+    assert not (vault_dir / ".state").exists()
+
+
+def test_watcher_catches_up_on_startup_and_reports_status(vault_dir, client):
+    inbox = vault_dir / "Inbox"
+    inbox.mkdir()
+    for i in range(30):
+        (inbox / f"early{i}.txt").write_text("data")
+
+    async def scenario():
+        task = asyncio.create_task(run_filesystem_watcher_async(vault_dir, dry_run=False))
+        await asyncio.sleep(0.05)
+        deadline = time.monotonic() + 10
+        while filesystem_watcher.status.catch_up.state != "done" and time.monotonic() < deadline:
+            await asyncio.sleep(0.02)
+        resp = await asyncio.to_thread(client.get, "/api/watchers/status")
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        return resp
+
+    resp = asyncio.run(scenario())
+    assert resp.status_code == 200
+    fs = resp.json()["filesystem"]
+    assert fs["running"] is True and fs["dry_run"] is False
+    assert fs["catch_up"]["state"] == "done"
+    assert (fs["catch_up"]["gap"], fs["catch_up"]["created"]) == (30, 30)
+    assert set(fs["intake"]) >= {"files", "batches", "files_per_second", "latency_ms", "pending"}
+    assert len(list((vault_dir / "Needs_Action").glob("FILE_early*.md"))) == 30
+    assert (vault_dir / ".state" / "inbox_manifest.json").exists()
@@ -0,0 +1,107 @@
+import os
+import time
+from datetime import date, datetime, timezone
+
+from app.services import frontmatter
+from app.services.frontmatter import coerce_value, get_body, parse_document, parse_file
+
+
+def _legacy_parse(text: str) -> tuple[dict[str, str], str]:
+    """The original split-twice implementation, kept as the behavioural reference."""
+    meta: dict[str, str] = {}
+    lines = text.strip().splitlines()
+    if not lines or lines[0].strip() != "---":
+        return meta, text
+    end_idx = next((i for i in range(1, len(lines)) if lines[i].strip() == "---"), -1)
+    if end_idx == -1:
+        return meta, text
+    for line in lines[1:end_idx]:
+        if ":" in line:
+            key, _, value = line.partition(":")
+            meta[key.strip()] = value.strip()
+    return meta, "\n".join(lines[end_idx + 1:]).strip()
+
+
+SAMPLES = [
+    "---\ntype: email\nfrom: a@b.com\nsubject: Re: hello: world\n---\n\n# Body\n\ntext\n",
+    "\n\n---\nid: 1\n---\nbody",
+    "---  \nkey:value\nnot a field\n  ---  \n\nbody\n---\nmore",
+    "---\r\ntype: email\r\nsubject: crlf\r\n---\r\nbody line\r\n",
+    "---\n---\nonly body",
+    "---\nno: closing\nbody",
+    "no frontmatter at all\n---\nx: y\n---\n",
+    "",
+]
+
+
+def test_parse_document_matches_legacy_parser():
+    """The single-pass parser agrees with the original one on edge cases."""
+    for text in SAMPLES:
+        meta, body_start = parse_document(text)
+        assert (meta, get_body(text, body_start)) == _legacy_parse(text), repr(text)
+
+
+def test_body_start_points_past_header():
+    text = "---\nid: 7\n---\nHello\n"
+    meta, body_start = parse_document(text)
+    assert meta == {"id": "7"}
+    assert text[body_start:] == "Hello\n"
+
+
+def test_typed_values():
+    text = (
+        "---\nlabels: [\"INBOX\", \"IMPORTANT\"]\ncount: 3\nflag: true\n"
+        "day: 2026-02-01\nreceived: 2026-02-01 10:30:00 UTC\nsubject: 2026 plans\n---\n"
+    )
+    meta, _ = parse_document(text, typed=True)
+    assert meta["labels"] == ["INBOX", "IMPORTANT"]
+    assert meta["count"] == 3
+    assert meta["flag"] is True
+    assert meta["day"] == date(2026, 2, 1)
+    assert meta["received"] == datetime(2026, 2, 1, 10, 30, tzinfo=timezone.utc)
+    assert meta["subject"] == "2026 plans"
+    assert coerce_value("[a, 'b']") == ["a", "b"]
+
+
+def test_parse_file_is_memoized_by_stat(tmp_path):
+    path = tmp_path / "EMAIL_x.md"
+    path.write_text("---\nsubject: First\n---\nbody", encoding="utf-8")
+    old = time.time() - 60
+    os.utime(path, (old, old))
+    frontmatter.clear_cache()
+
+    first = parse_file(path)
+    assert parse_file(path) is first
+    assert frontmatter.cache_info()["hits"] == 1
+
+    path.write_text("---\nsubject: Second\n---\nbody", encoding="utf-8")
+    assert parse_file(path).meta["subject"] == "Second"
+
+
+def test_read_header_matches_full_parse(tmp_path):
+    """Streaming header reads agree with a full parse for any chunk size."""
+    from app.services.frontmatter import read_header
+
+    long_body = "---\nsubject: Long\n---\n\n" + "word " * 500
+    for i, text in enumerate(SAMPLES + [long_body, "x" * 300, "   \n" + "y" * 50]):
+        path = tmp_path / f"doc_{i}.md"
+        path.write_bytes(text.encode("utf-8"))
+        # Newlines are normalised by text-mode reads, as with read_text().
+        full = path.read_text(encoding="utf-8")
+        meta, body_start = parse_document(full)
+        for chunk in (1, 2, 3, 7, 64, 4096):
+            parsed = read_header(path, chunk_chars=chunk)
+            assert parsed.meta == meta, (text, chunk)
+            assert parsed.snippet == get_body(full, body_start)[:200], (text, chunk)
+
+
+def test_read_header_does_not_read_whole_body(tmp_path):
+    """Only the header and snippet are read, however large the body is."""
+    from app.services.frontmatter import read_header
+
+    path = tmp_path / "EMAIL_big.md"
+    # Invalid UTF-8 deep in the body: a full read_text() would raise on it.
+    path.write_bytes(b"---\nsubject: Big\n---\n\n" + b"a" * 100_000 + b"\xff\xfe" + b"b" * 100_000)
+    parsed = read_header(path)
+    assert parsed.meta == {"subject": "Big"}
+    assert parsed.snippet == "a" * 200
@@ -0,0 +1,351 @@
+import time
+from collections import Counter
+
+import pytest
+
+from watchers import gmail_watcher
+from watchers.processed_store import BloomFilter, ProcessedStore
+
+
+class FakeHttpError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.resp = type("Resp", (), {"status": status})()
+
+
+class _Call:
+    def __init__(self, fn):
+        self._fn = fn
+
+    def execute(self):
+        return self._fn()
+
+
+class FakeGmail:
+    """In-memory stand-in for the googleapiclient Gmail service (the calls the watcher makes).
+
+    Supports label-only queries plus `after:<epoch>`; history.list returns the
+    messageAdded/labelAdded records after startHistoryId, paged `page_size` at a time.
+    Batch requests run their sub-requests in order; `errors[msg_id]` lists HTTP
+    statuses the next gets of that message fail with.
+    """
+
+    def __init__(self, page_size=2):
+        self.mailbox: dict[str, dict] = {}
+        self.records: list[dict] = []
+        self.history_id = 100
+        self.oldest_history_id = 100
+        self.page_size = page_size
+        self.calls = Counter()
+        self.errors: dict[str, list[int]] = {}
+        self.formats: list[str] = []
+
+    # ── Test helpers ──
+    def deliver(self, msg_id, subject="Hello", labels=("UNREAD", "IMPORTANT"), received=2_000_000_000):
+        self.history_id += 1
+        self.mailbox[msg_id] = {
+            "id": msg_id,
+            "labelIds": list(labels),
+            "snippet": f"snippet {msg_id}",
+            "internalDate": str(received * 1000),
+            "payload": {"headers": [{"name": "From", "value": "a@example.com"}, {"name": "Subject", "value": subject}]},
+        }
+        self.records.append({"id": str(self.history_id), "messagesAdded": [{"message": {"id": msg_id}}]})
+
+    def add_label(self, msg_id, label):
+        self.history_id += 1
+        self.mailbox[msg_id]["labelIds"].append(label)
+        self.records.append({"id": str(self.history_id), "labelsAdded": [{"message": {"id": msg_id}, "labelIds": [label]}]})
+
+    # ── Service surface ──
+    def users(self):
+        return self
+
+    def getProfile(self, userId):
+        self.calls["getProfile"] += 1
+        return _Call(lambda: {"historyId": str(self.history_id)})
+
+    def messages(self):
+        return _Messages(self)
+
+    def history(self):
+        return _History(self)
+
+    def new_batch_http_request(self, callback):
+        return _Batch(self, callback)
+
+    def _matches(self, msg, query):
+        for term in query.replace("(", " ").replace(")", " ").split():
+            if term.startswith("after:"):
+                if int(msg["internalDate"]) // 1000 <= int(term[6:]):
+                    return False
+            elif gmail_watcher._query_labels(term) is None:
+                raise ValueError(f"FakeGmail cannot evaluate {term}")
+            elif not gmail_watcher._query_labels(term) <= set(msg["labelIds"]):
+                return False
+        return True
+
+
+class _Messages:
+    def __init__(self, fake):
+        self.fake = fake
+
+    def list(self, userId, q, pageToken=None):
+        fake = self.fake
+        fake.calls["messages.list"] += 1
+        ids = [m for m, msg in fake.mailbox.items() if fake._matches(msg, q)]
+        start = int(pageToken or 0)
+        page = ids[start:start + fake.page_size]
+        result = {"messages": [{"id": m} for m in page]}
+        if start + fake.page_size < len(ids):
+            result["nextPageToken"] = str(start + fake.page_size)
+        return _Call(lambda: result)
+
+    def get(self, userId, id, format="full", metadataHeaders=None):
+        fake = self.fake
+        fake.calls["messages.get"] += 1
+        fake.formats.append(format)
+        msg = fake.mailbox.get(id)
+
+        def run():
+            if fake.errors.get(id):
+                raise FakeHttpError(fake.errors[id].pop(0))
+            if msg is None:
+                raise FakeHttpError(404)
+            if format != "metadata":
+                return msg
+            headers = [h for h in msg["payload"]["headers"] if h["name"] in (metadataHeaders or [])]
+            return {**msg, "payload": {"headers": headers}}
+        return _Call(run)
+
+
+class _Batch:
+    def __init__(self, fake, callback):
+        self.fake = fake
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        self.fake.calls["batch"] += 1
+        for request_id, request in self.requests:
+            try:
+                response = request.execute()
+            except Exception as e:
+                self.callback(request_id, None, e)
+            else:
+                self.callback(request_id, response, None)
+
+
+class _History:
+    def __init__(self, fake):
+        self.fake = fake
+
+    def list(self, userId, startHistoryId, historyTypes, pageToken=None):
+        fake = self.fake
+        fake.calls["history.list"] += 1
+
+        def run():
+            if int(startHistoryId) < fake.oldest_history_id:
+                raise FakeHttpError(404)
+            records = [h for h in fake.records if int(h["id"]) > int(startHistoryId)]
+            start = int(pageToken or 0)
+            result = {"history": records[start:start + fake.page_size], "historyId": str(fake.history_id)}
+            if start + fake.page_size < len(records):
+                result["nextPageToken"] = str(start + fake.page_size)
+            return result
+        return _Call(run)
+
+
+@pytest.fixture
+def fake():
+    return FakeGmail()
+
+
+def _sync(fake, vault_dir, state, processed=None, query="is:unread is:important"):
+    return gmail_watcher._sync_once(fake, vault_dir, query, state, processed if processed is not None else set(), False)
+
+
+def _written(vault_dir):
+    return sorted(p.name for p in (vault_dir / "Needs_Action").glob("EMAIL_*.md"))
+
+
+def test_first_sync_lists_query_and_records_history_id(fake, vault_dir):
+    for i in range(5):
+        fake.deliver(f"m{i}")
+    fake.deliver("unimportant", labels=("UNREAD",))
+    state = {}
+    assert _sync(fake, vault_dir, state) == 5
+    assert state["history_id"] == str(fake.history_id)
+    assert state["query"] == "is:unread is:important"
+    assert _written(vault_dir) == [f"EMAIL_m{i}.md" for i in range(5)]
+
+
+def test_incremental_sync_cost_follows_new_mail(fake, vault_dir):
+    """After the first sync, polls read history deltas only, never re-listing the mailbox."""
+    for i in range(50):
+        fake.deliver(f"old{i}")
+    state = {}
+    _sync(fake, vault_dir, state)
+
+    fake.calls.clear()
+    assert _sync(fake, vault_dir, state) == 0
+    assert fake.calls == Counter({"history.list": 1})
+
+    fake.deliver("new1")
+    fake.deliver("new2", labels=("UNREAD",))  # does not match the query
+    fake.calls.clear()
+    assert _sync(fake, vault_dir, state) == 1
+    assert fake.calls["messages.list"] == 0
+    assert fake.calls["messages.get"] == 2
+    assert "EMAIL_new1.md" in _written(vault_dir)
+    assert "EMAIL_new2.md" not in _written(vault_dir)
+
+    # A label change that makes an older message match is picked up too.
+    fake.add_label("new2", "IMPORTANT")
+    assert _sync(fake, vault_dir, state) == 1
+    assert "EMAIL_new2.md" in _written(vault_dir)
+
+
+def test_state_survives_restart(fake, vault_dir):
+    """A restarted watcher resumes from the stored historyId instead of refetching everything."""
+    for i in range(4):
+        fake.deliver(f"m{i}")
+    state_path = gmail_watcher._state_path(vault_dir)
+    state = {}
+    _sync(fake, vault_dir, state)
+    gmail_watcher._save_sync_state(state_path, state)
+
+    fake.deliver("after-restart")
+    fake.calls.clear()
+    restored = gmail_watcher._load_sync_state(state_path)
+    assert _sync(fake, vault_dir, restored, processed=set()) == 1
+    assert fake.calls["messages.get"] == 1
+    assert fake.calls["messages.list"] == 0
+
+
+def test_expired_history_falls_back_to_full_resync(fake, vault_dir):
+    fake.deliver("m0")
+    state = {}
+    _sync(fake, vault_dir, state)
+    fake.deliver("m1")
+    fake.oldest_history_id = fake.history_id + 1  # Gmail has dropped our starting point
+
+    fake.calls.clear()
+    assert _sync(fake, vault_dir, state) == 2  # fresh process: nothing in processed_ids
+    assert fake.calls["getProfile"] == 1
+    assert state["history_id"] == str(fake.history_id)
+
+
+def test_changed_query_forces_full_resync(fake, vault_dir):
+    fake.deliver("m0", labels=("UNREAD",))
+    state = {}
+    _sync(fake, vault_dir, state)
+    assert _written(vault_dir) == []
+    assert _sync(fake, vault_dir, state, query="is:unread") == 1
+    assert state["query"] == "is:unread"
+
+
+def test_non_label_query_checks_candidates_with_gmail(fake, vault_dir, monkeypatch):
+    """Queries that cannot be evaluated locally are narrowed with a small after: listing."""
+    state = {"history_id": str(fake.history_id), "query": "from:boss", "synced_at": 1_000}
+    fake.deliver("from-boss")
+    fake.deliver("from-someone-else")
+    seen_queries = []
+
+    def gmail_search(self, userId, q, pageToken=None):
+        seen_queries.append(q)
+        return _Call(lambda: {"messages": [{"id": "from-boss"}]})
+
+    monkeypatch.setattr(_Messages, "list", gmail_search)
+    assert _sync(fake, vault_dir, state, query="from:boss") == 1
+    assert seen_queries == ["(from:boss) after:940"]
+    assert fake.calls["messages.get"] == 1
+    assert _written(vault_dir) == ["EMAIL_from-boss.md"]
+
+
+def test_query_labels():
+    assert gmail_watcher._query_labels("is:unread is:important") == {"UNREAD", "IMPORTANT"}
+    assert gmail_watcher._query_labels("label:Work in:inbox") == {"WORK", "INBOX"}
+    assert gmail_watcher._query_labels("from:boss is:unread") is None
+
+
+def test_fetch_is_batched_metadata_only(fake, vault_dir, monkeypatch):
+    """A large backlog is fetched in BATCH_SIZE batches with format=metadata."""
+    monkeypatch.setattr(gmail_watcher, "BATCH_SIZE", 10)
+    for i in range(25):
+        fake.deliver(f"m{i:02d}")
+    stats = gmail_watcher.PollStats()
+    assert gmail_watcher._sync_once(fake, vault_dir, "is:unread is:important", {}, set(), False, stats) == 25
+    assert fake.calls["batch"] == 3
+    assert set(fake.formats) == {"metadata"}
+    assert (stats.fetched, stats.written, stats.batches) == (25, 25, 3)
+    assert "subject: Hello" in (vault_dir / "Needs_Action" / "EMAIL_m00.md").read_text()
+
+
+def test_fetch_retries_throttled_messages(fake, vault_dir, monkeypatch):
+    """429/5xx responses are retried with backoff; other errors are skipped."""
+    sleeps = []
+    monkeypatch.setattr(gmail_watcher.time, "sleep", sleeps.append)
+    for i in range(3):
+        fake.deliver(f"m{i}")
+    fake.errors = {"m0": [429, 503], "m1": [403]}
+    stats = gmail_watcher.PollStats()
+    assert gmail_watcher._sync_once(fake, vault_dir, "is:unread is:important", {}, set(), False, stats) == 2
+    assert _written(vault_dir) == ["EMAIL_m0.md", "EMAIL_m2.md"]
+    assert stats.retries == 2
+    assert len(sleeps) == 2 and sleeps[1] > sleeps[0] / 2
+
+
+def test_fetch_gives_up_after_max_retries(fake, vault_dir, monkeypatch):
+    monkeypatch.setattr(gmail_watcher.time, "sleep", lambda s: None)
+    monkeypatch.setattr(gmail_watcher, "MAX_RETRIES", 2)
+    fake.deliver("m0")
+    fake.errors = {"m0": [500] * 10}
+    state = {}
+    assert _sync(fake, vault_dir, state) == 0
+    assert fake.calls["messages.get"] == 3
+    assert state["retry_ids"] == ["m0"]
+    # The next incremental poll retries it even though it is not in the new delta.
+    fake.errors = {}
+    assert _sync(fake, vault_dir, state) == 1
+    assert state["retry_ids"] == []
+
+
+def test_processed_store_persists_and_dedupes(fake, vault_dir):
+    """Processed ids survive a restart, so a full resync does not refetch them."""
+    db = vault_dir / ".state" / "gmail_processed.db"
+    store = ProcessedStore(db)
+    for i in range(3):
+        fake.deliver(f"m{i}")
+    assert _sync(fake, vault_dir, {}, processed=store) == 3
+    store.close()
+
+    reopened = ProcessedStore(db)
+    assert "m1" in reopened and "other" not in reopened
+    assert len(reopened) == 3
+    fake.calls.clear()
+    assert _sync(fake, vault_dir, {}, processed=reopened) == 0  # no stored historyId: full resync
+    assert fake.calls["messages.get"] == 0
+
+
+def test_processed_store_retention(vault_dir):
+    store = ProcessedStore(None, retention_days=1)
+    store.add("old")
+    store.add("new")
+    now = time.time()
+    store._db.execute("UPDATE processed SET seen_at = ? WHERE msg_id = 'old'", (int(now - 2 * 86400),))
+    assert store.prune_if_due(now) == 0  # pruned on open; not due again yet
+    assert store.prune(now) == 1
+    assert "old" not in store and "new" in store
+
+
+def test_bloom_filter_error_rate():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(1000):
+        bloom.add(f"id{i}")
+    assert all(f"id{i}" in bloom for i in range(1000))
+    false_positives = sum(f"other{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
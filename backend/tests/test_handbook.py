@@ -1,5 +1,8 @@
 import pytest
 
+from app.config import settings
+from app.services import file_processor, handbook_rules, metadata_store
+
 
 def test_get_handbook(client, initialized_vault):
     """GET /api/handbook returns content with validation after init."""
@@ -49,3 +52,117 @@ def test_handbook_missing_sections(client, initialized_vault):
     assert data["is_complete"] is False
     missing = [v for v in data["validation"] if not v["present"]]
     assert len(missing) == 8
+
+
+# ── Compiled routing rules ─────────────────────────────────────────────────
+
+CUSTOM_HANDBOOK = """\
+# Handbook
+
+## 4. Autonomy Thresholds
+
+| Action | Auto-Approve | Requires Approval |
+|--------|-------------|-------------------|
+| Send payment < $1,000 | Yes | No |
+| Send payment >= $1,000 | No | Yes |
+
+## 5. Priority Keywords
+
+- **Produce**: banana, mango
+"""
+
+
+def _simulate_and_process(client, subject, body, item_type):
+    filename = client.post("/api/simulate/email", json={
+        "sender": "someone@example.com", "subject": subject, "body": body,
+        "type": item_type, "priority": "normal",
+    }).json()["filename"]
+    return client.post("/api/needs-action/process", json={"filename": filename}).json()["action"]
+
+
+def test_rules_default_without_handbook(client):
+    data = client.get("/api/handbook/rules").json()
+    assert data["source"] == "defaults"
+    assert data["approval_thresholds"] == [{"type": "payment", "amount": 0.0, "inclusive": True}]
+
+
+def test_rules_compiled_from_template(client, initialized_vault):
+    data = client.get("/api/handbook/rules").json()
+    assert data["source"] == "handbook"
+    assert data["approval_thresholds"] == [
+        {"type": "payment", "amount": 100.0, "inclusive": True},
+        {"type": "refund", "amount": 50.0, "inclusive": True},
+    ]
+    assert data["keyword_categories"]["legal"] == ["legal", "lawsuit", "compliance", "regulation"]
+    assert set(data) == {"source", "approval_thresholds", "keyword_categories"}
+
+
+def test_payment_routing_follows_thresholds(client, initialized_vault):
+    assert "Moved to Done" in _simulate_and_process(client, "Invoice #1", "Please pay $45.00.", "payment")
+    assert "Routed to approval" in _simulate_and_process(client, "Invoice #2", "Please pay $100.00.", "payment")
+    # No amount to compare against: the owner decides.
+    assert "Routed to approval" in _simulate_and_process(client, "Invoice #3", "Please pay.", "payment")
+
+
+def test_payment_amount_is_the_largest_figure(client, initialized_vault):
+    late_fee = "Late fee of $25 added. Total due: $4,500.00"
+    assert "Routed to approval" in _simulate_and_process(client, "Invoice #5", late_fee, "payment")
+    unit_price = "Invoice for $5 widgets x 2000 = $10,000"
+    assert "Routed to approval" in _simulate_and_process(client, "Invoice #6", unit_price, "payment")
+    assert "Moved to Done" in _simulate_and_process(client, "Invoice #7", "Fee $5, total $45.", "payment")
+
+
+def test_payment_amount_from_frontmatter():
+    assert file_processor._item_amount({"amount": "$4,500.00"}, "Invoice $5", "") == 4500.0
+    assert file_processor._item_amount({"amount": 40}, "Invoice", "Total $4,500") == 40.0
+    assert file_processor._item_amount({"amount": "unknown"}, "Invoice $5", "") is None
+    assert file_processor._item_amount({}, "Invoice", "No figures here, $ only.") is None
+
+
+def test_handbook_keywords_drive_routing(client, initialized_vault):
+    assert "Routed to approval" in _simulate_and_process(client, "Notice", "Possible lawsuit pending.", "email")
+
+
+def test_put_recompiles_rules(client, initialized_vault):
+    first = handbook_rules.get_rules()
+    assert handbook_rules.get_rules() is first  # cached while the file is unchanged
+
+    assert client.put("/api/handbook", json={"content": CUSTOM_HANDBOOK}).status_code == 200
+    rules = handbook_rules.get_rules()
+    assert rules is not first
+    assert rules.approval_thresholds["payment"].amount == 1000.0
+    assert set(rules.keyword_categories) == {"produce"}
+
+    assert "Moved to Done" in _simulate_and_process(client, "Invoice #4", "Please pay $500.", "payment")
+    assert "Routed to approval" in _simulate_and_process(client, "Fruit", "The banana shipment", "email")
+
+
+@pytest.mark.parametrize("store", [False, True])
+def test_handbook_keywords_rerank_the_list(client, initialized_vault, vault_dir, monkeypatch, store):
+    """Items without a priority field move between priority filters when the handbook's keywords change."""
+    monkeypatch.setattr(settings, "METADATA_STORE", store)
+    try:
+        _rerank(client, vault_dir)
+    finally:
+        metadata_store.shutdown()
+
+
+def _rerank(client, vault_dir):
+    (vault_dir / "Needs_Action" / "FILE_zebra.md").write_text(
+        "---\ntype: file_intake\nsubject: Zebra stripes\n---\n\nA new pattern.\n"
+    )
+
+    def names(**params):
+        return [i["filename"] for i in client.get("/api/needs-action", params=params).json()]
+
+    etag = client.get("/api/needs-action").headers["etag"]
+    assert names(priority="normal") == ["FILE_zebra.md"] and names(priority="high") == []
+
+    handbook = client.get("/api/handbook").json()["content"]
+    updated = handbook.replace("- **Urgent**: urgent,", "- **Urgent**: zebra, urgent,")
+    assert updated != handbook
+    client.put("/api/handbook", json={"content": updated})
+
+    resp = client.get("/api/needs-action", headers={"If-None-Match": etag})
+    assert resp.status_code == 200 and resp.json()[0]["priority"] == "high"
+    assert names(priority="high") == ["FILE_zebra.md"] and names(priority="normal") == []
@@ -0,0 +1,98 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.job_queue import jobs
+
+
+@pytest.fixture
+def live_client(initialized_vault):
+    """Test client with the app lifespan running, so job workers are up."""
+    with TestClient(app) as c:
+        yield c
+
+
+def _wait(client, job_id, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed", "cancelled"):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} did not finish: {job}")
+
+
+def test_background_requires_running_queue(client, initialized_vault):
+    """Without the lifespan job workers, background requests are refused."""
+    resp = client.post("/api/needs-action/process-all?background=true")
+    assert resp.status_code == 503
+
+
+def test_background_batch_and_process_all(live_client):
+    """Batch simulation and process-all run as jobs with progress and results."""
+    resp = live_client.post("/api/simulate/batch?background=true", json={"count": 6})
+    assert resp.status_code == 202
+    assert resp.headers["location"] == f"/api/jobs/{resp.json()['id']}"
+    job = _wait(live_client, resp.json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["result"]["count"] == 6
+    assert job["progress"] == {"done": 6, "total": 6, "failed": 0}
+
+    resp = live_client.post("/api/needs-action/process-all?background=true")
+    assert resp.status_code == 202
+    job = _wait(live_client, resp.json()["id"])
+    assert job["status"] == "succeeded"
+    assert job["kind"] == "process_all"
+    assert job["result"]["processed"] == 6
+    assert job["progress"]["done"] == job["progress"]["total"] == 6
+    assert live_client.get("/api/needs-action").json() == []
+
+
+def test_background_dashboard_refresh(live_client, vault_dir):
+    resp = live_client.post("/api/dashboard/refresh?background=true")
+    assert resp.status_code == 202
+    assert _wait(live_client, resp.json()["id"])["status"] == "succeeded"
+    assert (vault_dir / "Dashboard.md").exists()
+
+
+def test_cancel_running_job(live_client):
+    """A running job sees the cancellation and finishes as cancelled."""
+    def slow(job):
+        job.set_total(1000)
+        for _ in range(1000):
+            if job.cancelled:
+                return {"stopped": True}
+            job.advance()
+            time.sleep(0.01)
+
+    job_id = jobs.submit("slow", slow).id
+    while live_client.get(f"/api/jobs/{job_id}").json()["status"] == "queued":
+        time.sleep(0.01)
+    assert live_client.post(f"/api/jobs/{job_id}/cancel").status_code == 200
+    job = _wait(live_client, job_id)
+    assert job["status"] == "cancelled"
+    assert job["result"] == {"stopped": True}
+    assert job["progress"]["done"] < 1000
+    assert live_client.post(f"/api/jobs/{job_id}/cancel").status_code == 409
+
+
+def test_failed_job_and_unknown_id(live_client):
+    def boom(job):
+        raise ValueError("no such folder")
+
+    job = _wait(live_client, jobs.submit("boom", boom).id)
+    assert job["status"] == "failed"
+    assert job["error"] == "no such folder"
+    assert live_client.get("/api/jobs/nope").status_code == 404
+    assert live_client.post("/api/jobs/nope/cancel").status_code == 404
+
+
+def test_history_is_bounded(live_client, monkeypatch):
+    monkeypatch.setattr(jobs, "history_size", 2)
+    ids = [jobs.submit("noop", lambda job: None).id for _ in range(3)]
+    _wait(live_client, ids[-1])
+    listed = [j["id"] for j in live_client.get("/api/jobs").json()]
+    assert len(listed) == 2
+    assert listed[0] == ids[-1]
@@ -0,0 +1,36 @@
+from app.services import keyword_matcher
+from app.services.keyword_matcher import KeywordMatcher
+
+
+def test_scan_returns_every_category_in_one_call():
+    assert keyword_matcher.scan("URGENT: overdue invoice", "customer is unhappy") == {
+        "urgent", "financial", "complaint",
+    }
+    assert keyword_matcher.scan("Team lunch", "see you at noon") == frozenset()
+
+
+def test_keywords_match_at_word_start_only():
+    assert keyword_matcher.scan("Order cancelled") == {"complaint"}
+    assert keyword_matcher.scan("Payments received") == {"financial"}
+    assert keyword_matcher.scan("re: [urgent]") == {"urgent"}
+    assert keyword_matcher.scan("scancel", "nonrefundable") == frozenset()
+
+
+def test_texts_do_not_join_into_a_keyword():
+    matcher = KeywordMatcher({"x": ("ab",)})
+    assert not matcher.matches("xa", "b")
+    assert matcher.matches("x", "ab")
+
+
+def test_matches_agrees_with_scan():
+    for text in ("ASAP please", "hello", "Emergency refund", "prepayment"):
+        assert keyword_matcher.matches(text) == bool(keyword_matcher.scan(text))
+
+
+def test_email_with_keyword_routes_to_approval(client, initialized_vault):
+    created = client.post("/api/simulate/email", json={
+        "sender": "a@example.com", "subject": "Subscription", "body": "Please process my cancellation.",
+        "type": "email", "priority": "normal",
+    }).json()
+    resp = client.post("/api/needs-action/process", json={"filename": created["filename"]})
+    assert "Routed to approval" in resp.json()["action"]
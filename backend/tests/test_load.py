@@ -0,0 +1,14 @@
+import asyncio
+
+from benchmarks.load_mixed import HEALTH, run_load
+
+
+def test_health_stays_responsive_under_mixed_load(vault_dir):
+    """Short mixed-traffic run: no errors, and every kind of request makes progress.
+
+    The health latency limit depends on machine speed; benchmarks/load_mixed.py checks it.
+    """
+    results = asyncio.run(run_load(seconds=1.5, readers=8, writers=4, probes=1))
+    assert all(r["errors"] == 0 for r in results.values()), results
+    assert results["POST /api/needs-action/process"]["count"] > 0
+    assert results[HEALTH]["count"] > 0 and results["GET /api/dashboard"]["count"] > 0
@@ -0,0 +1,132 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from app.config import settings
+from app.services import metadata_store, vault_index
+from app.services.metadata_store import STORE_FILE
+
+
+@pytest.fixture
+def store_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "METADATA_STORE", True)
+    yield
+    metadata_store.shutdown()
+
+
+def _simulate(client, sender, priority, email_type="email", subject="Hello"):
+    return client.post("/api/simulate/email", json={
+        "sender": sender, "subject": subject, "body": "Just checking in.", "type": email_type, "priority": priority,
+    }).json()["filename"]
+
+
+def _rows(vault_dir, folder):
+    with sqlite3.connect(vault_dir / STORE_FILE) as conn:
+        return {name for (name,) in conn.execute("SELECT name FROM items WHERE folder = ?", (folder,))}
+
+
+QUERIES = [
+    {},
+    {"limit": 2},
+    {"priority": "high"},
+    {"priority": "high,low", "type": "payment"},
+    {"sender": "ALICE"},
+    {"since": "2000-01-01"},
+    {"since": "2999-01-01"},
+]
+
+
+def _walk(client, path, params):
+    pages, cursor = [], None
+    while True:
+        resp = client.get(path, params=params | ({"cursor": cursor} if cursor else {}))
+        assert resp.status_code == 200
+        pages.append(resp.json())
+        cursor = resp.headers.get("x-next-cursor")
+        if not cursor:
+            return pages
+
+
+def test_store_answers_listings_like_the_index(client, initialized_vault, monkeypatch):
+    for i, (priority, email_type) in enumerate(
+        [("low", "email"), ("high", "payment"), ("normal", "email"), ("high", "email"), ("low", "payment")]
+    ):
+        _simulate(client, f"alice{i}@example.com" if i % 2 else f"bob{i}@example.com", priority, email_type)
+    for filename in [i["filename"] for i in client.get("/api/needs-action").json() if i["type"] == "payment"][:1]:
+        client.post("/api/needs-action/process", json={"filename": filename})
+
+    expected = {q_id: _walk(client, "/api/needs-action", q) for q_id, q in enumerate(QUERIES)}
+    expected_approvals = _walk(client, "/api/approvals", {"limit": 1})
+    expected_dashboard = client.get("/api/dashboard").json()
+
+    monkeypatch.setattr(settings, "METADATA_STORE", True)
+    try:
+        for q_id, q in enumerate(QUERIES):
+            assert _walk(client, "/api/needs-action", q) == expected[q_id], q
+        assert _walk(client, "/api/approvals", {"limit": 1}) == expected_approvals
+        assert client.get("/api/dashboard").json() == expected_dashboard
+        assert client.get("/api/needs-action", params={"cursor": "WyJ4Il0"}).status_code == 400
+    finally:
+        metadata_store.shutdown()
+
+
+def test_writes_keep_the_store_in_sync(client, initialized_vault, vault_dir, store_enabled):
+    first = _simulate(client, "a@example.com", "normal")
+    second = _simulate(client, "b@example.com", "normal", "payment", "Invoice for $500")
+    assert client.get("/api/dashboard").json()["needs_action"] == 2
+    assert _rows(vault_dir, "Needs_Action") == {first, second}
+
+    client.post("/api/needs-action/process-all")
+    dashboard = client.get("/api/dashboard").json()
+    assert (dashboard["needs_action"], dashboard["pending_approval"], dashboard["done_today"]) == (0, 1, 1)
+    assert _rows(vault_dir, "Done") == {first}
+    assert _rows(vault_dir, "In_Progress") == {second}
+    assert dashboard["recent_activity"][0].startswith(f"[Done] {first[:-3]} - ")
+
+
+def test_store_alerts_on_old_items(client, initialized_vault, vault_dir, store_enabled):
+    filename = _simulate(client, "a@example.com", "normal")
+    _simulate(client, "b@example.com", "normal")
+    stale = vault_dir / "Needs_Action" / filename
+    old = time.time() - 13 * 3600
+    os.utime(stale, (old, old))
+    vault_index.get_index().touch(stale)
+
+    assert client.get("/api/dashboard").json()["alerts"] == [f"Needs action > 12h: {filename}"]
+
+
+def test_reconcile_catches_changes_made_while_down(client, initialized_vault, vault_dir, store_enabled):
+    names = [_simulate(client, f"u{i}@example.com", "normal") for i in range(3)]
+    assert client.get("/api/vault/metadata").json()["folders"]["Needs_Action"] == 3
+
+    # Restart: a fresh index and store, after one file was deleted and one edited offline.
+    metadata_store.shutdown()
+    vault_index._index = None
+    (vault_dir / "Needs_Action" / names[0]).unlink()
+    edited = vault_dir / "Needs_Action" / names[1]
+    edited.write_text(edited.read_text().replace("priority: normal", "priority: high"))
+
+    items = client.get("/api/needs-action").json()
+    assert [(i["filename"], i["priority"]) for i in items] == [(names[1], "high"), (names[2], "normal")]
+    assert _rows(vault_dir, "Needs_Action") == {names[1], names[2]}
+
+
+def test_status_and_rebuild(client, initialized_vault, vault_dir, store_enabled):
+    _simulate(client, "a@example.com", "normal")
+    status = client.get("/api/vault/metadata").json()
+    assert status["enabled"] is True and status["journal_mode"] == "wal"
+    assert status["items"] == status["folders"]["Needs_Action"] == 1
+
+    with sqlite3.connect(vault_dir / STORE_FILE) as conn:
+        conn.execute("DELETE FROM items")
+    resp = client.post("/api/vault/metadata/rebuild")
+    assert resp.status_code == 200 and "1 items" in resp.json()["message"]
+    assert client.get("/api/vault/metadata").json()["items"] == 1
+    assert len(client.get("/api/needs-action").json()) == 1
+
+
+def test_rebuild_requires_the_store(client, initialized_vault):
+    assert client.get("/api/vault/metadata").json()["enabled"] is False
+    assert client.post("/api/vault/metadata/rebuild").status_code == 409
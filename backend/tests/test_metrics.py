@@ -0,0 +1,127 @@
+import re
+
+from app.services import metrics
+from tests.test_gmail_watcher import FakeGmail, FakeHttpError
+from watchers import gmail_watcher
+from watchers.filesystem_watcher import InboxHandler, IntakeQueue
+
+
+def _scrape(client) -> str:
+    resp = client.get("/metrics")
+    assert resp.status_code == 200 and resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    return resp.text
+
+
+def _value(text: str, name: str, **labels) -> float:
+    """The sample for `name` with exactly these labels (0 when absent)."""
+    wanted = ",".join(f'{k}="{v}"' for k, v in labels.items())
+    pattern = rf"^{metrics.PREFIX}{name}{re.escape('{' + wanted + '}') if labels else ''} (\S+)$"
+    match = re.search(pattern, text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+class _GmailDown(FakeGmail):
+    def messages(self):
+        raise FakeHttpError(500)
+
+
+def _simulate(client, **fields):
+    return client.post("/api/simulate/email", json={
+        "sender": "a@example.com", "subject": "Hello", "body": "Just checking in.", **fields,
+    }).json()["filename"]
+
+
+def test_exposition_format():
+    counter = metrics.Counter("test_things_total", "Things.", ("kind",))
+    counter.labels('say "hi"\n').inc(2)
+    histogram = metrics.Histogram("test_seconds", "Durations.", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    gauge = metrics.Gauge("test_depth", "Depth.")
+    gauge.set_function(lambda: 7)
+    try:
+        text = metrics.render()
+    finally:
+        for metric in (counter, histogram, gauge):
+            metrics._registry.remove(metric)
+
+    assert "# TYPE ai_employee_test_things_total counter\n" in text
+    assert 'ai_employee_test_things_total{kind="say \\"hi\\"\\n"} 2.0' in text
+    assert "\n".join([
+        'ai_employee_test_seconds_bucket{le="0.1"} 2',
+        'ai_employee_test_seconds_bucket{le="1.0"} 3',
+        'ai_employee_test_seconds_bucket{le="+Inf"} 4',
+        "ai_employee_test_seconds_sum 3.65",
+        "ai_employee_test_seconds_count 4",
+    ]) in text
+    assert "ai_employee_test_depth 7.0" in text
+
+
+def test_requests_processing_and_approvals_are_counted(client, initialized_vault):
+    before = _scrape(client)
+    _simulate(client)
+    client.post("/api/needs-action/process-all")
+    payment = _simulate(client, subject="Invoice #1", body="Please pay $500.", type="payment")
+    client.post("/api/needs-action/process", json={"filename": payment})
+    client.post("/api/needs-action/process", json={"filename": "EMAIL_missing.md"})
+    approval_id = client.get("/api/approvals").json()[0]["id"]
+    client.post(f"/api/approvals/{approval_id}/approve")
+    client.post(f"/api/approvals/{approval_id}/approve")
+    client.get("/api/dashboard")
+    after = _scrape(client)
+
+    def delta(name, **labels):
+        return _value(after, name, **labels) - _value(before, name, **labels)
+
+    assert delta("items_processed_total", outcome="done") == 1
+    assert delta("items_processed_total", outcome="approval") == 1
+    assert delta("items_processed_total", outcome="not_found") == 1
+    assert delta("approvals_total", decision="approved", outcome="ok") == 1
+    assert delta("approvals_total", decision="approved", outcome="not_found") == 1
+    assert delta("pipeline_lag_seconds_count", path="direct") == 1
+    assert delta("pipeline_lag_seconds_count", path="approval") == 1
+    assert delta("dashboard_metrics_duration_seconds_count", source="aggregator") >= 1
+    assert delta("http_requests_total", method="POST", route="/api/needs-action/process", status="404") == 1
+    assert delta("http_request_duration_seconds_count", method="GET", route="/api/dashboard") == 1
+    assert delta("vault_io_duration_seconds_count", pool="write") >= 5
+    assert delta("vault_write_duration_seconds_count") == 2  # the simulated emails
+    assert delta("vault_commit_duration_seconds_count", kind="process_item") == 2
+
+    client.get("/no/such/path")
+    assert _value(_scrape(client), "http_requests_total", method="GET", route="unmatched", status="404") >= 1
+
+
+def test_watcher_metrics(client, vault_dir):
+    inbox = vault_dir / "Inbox"
+    inbox.mkdir()
+    handler = InboxHandler(vault_dir, dry_run=False, queue=IntakeQueue(debounce=0.0))
+    before = _scrape(client)
+    for name in ("a.txt", "b.txt"):
+        (inbox / name).write_text("hello")
+        handler.queue.note(inbox / name, now=0.0)
+    metrics.WATCHER_QUEUE_DEPTH.labels("filesystem").set_function(handler.queue.__len__)
+    assert _value(_scrape(client), "watcher_queue_depth", watcher="filesystem") == 2
+    handler.queue.take_ready(now=1.0)
+    handler.process_batch(handler.queue.take_ready(now=2.0))
+    metrics.WATCHER_QUEUE_DEPTH.labels("filesystem").set_function(None)
+
+    fake = FakeGmail()
+    fake.deliver("m1")
+    fake.deliver("m2")
+    fake.errors["m2"] = [403]
+    gmail_watcher._poll_once(fake, vault_dir, "is:unread is:important", set(), False)
+    gmail_watcher._poll_once(_GmailDown(), vault_dir, "is:unread", set(), False)
+    after = _scrape(client)
+
+    def delta(name, **labels):
+        return _value(after, name, **labels) - _value(before, name, **labels)
+
+    assert delta("watcher_events_total", watcher="filesystem") == 2
+    assert delta("inbox_files_total", outcome="created") == 2
+    assert delta("inbox_file_duration_seconds_count") == 2
+    assert delta("watcher_events_total", watcher="gmail") == 1
+    assert delta("gmail_polls_total", mode="query", outcome="ok") == 1
+    assert delta("gmail_polls_total", mode="query", outcome="error") == 1
+    assert delta("gmail_api_requests_total", call="messages.list") == 1
+    assert delta("gmail_api_requests_total", call="messages.get") == 2
+    assert delta("gmail_api_errors_total", call="messages.get") == 1
@@ -102,3 +102,126 @@ def test_process_routes_to_approval(client, initialized_vault, vault_dir):
     # There should be an approval file in Pending_Approval
     approval_files = list((vault_dir / "Pending_Approval").glob("APPROVAL_*.md"))
     assert len(approval_files) >= 1
+
+
+def test_process_by_id(client, initialized_vault, vault_dir):
+    """Items can be processed by their frontmatter id instead of filename."""
+    filename = _simulate_normal_email(client)
+    item_id = client.get("/api/needs-action").json()[0]["id"]
+    resp = client.post("/api/needs-action/process", json={"id": item_id})
+    assert resp.status_code == 200
+    assert (vault_dir / "Done" / filename).exists()
+
+
+def test_process_requires_reference(client, initialized_vault):
+    """A process request with neither filename nor id is rejected."""
+    resp = client.post("/api/needs-action/process", json={})
+    assert resp.status_code == 422
+
+
+@pytest.mark.parametrize("mode", ["serial", "thread", "process"])
+def test_process_all_modes(client, initialized_vault, vault_dir, mode):
+    """Every executor mode processes all items and reports results in filename order."""
+    from app.services import file_processor
+
+    filenames = sorted([_simulate_normal_email(client), _simulate_urgent_email(client), _simulate_payment(client)])
+    result = file_processor.process_all(mode=mode, workers=2)
+    assert result.processed == 3
+    assert result.failed == 0
+    assert [a.split(":", 1)[0] for a in result.actions] == filenames
+    assert result.mode == mode
+    assert client.get("/api/needs-action").json() == []
+    assert len(client.get("/api/approvals").json()) == 2
+
+
+def test_process_all_isolates_failures(client, initialized_vault, monkeypatch):
+    """One item raising does not stop the rest of the batch."""
+    from app.services import file_processor
+
+    bad = _simulate_urgent_email(client)
+    _simulate_normal_email(client)
+    real = file_processor.process_item
+
+    def flaky(filename):
+        if filename == bad:
+            raise RuntimeError("disk on fire")
+        return real(filename)
+
+    monkeypatch.setattr(file_processor, "process_item", flaky)
+    resp = client.post("/api/needs-action/process-all")
+    data = resp.json()
+    assert data["processed"] == 2
+    assert data["failed"] == 1
+    assert f"{bad}: Error: disk on fire" in data["actions"]
+    assert [i["filename"] for i in client.get("/api/needs-action").json()] == [bad]
+
+
+def _simulate(client, sender, priority, email_type="email"):
+    return client.post("/api/simulate/email", json={
+        "sender": sender,
+        "subject": "Hello",
+        "body": "Just checking in.",
+        "type": email_type,
+        "priority": priority,
+    }).json()["filename"]
+
+
+def test_list_pagination_walks_every_item(client, initialized_vault):
+    """Paging with limit/cursor returns the full list in order, without repeats."""
+    for i, priority in enumerate(["low", "high", "normal", "high", "normal", "low", "normal"]):
+        _simulate(client, f"user{i}@example.com", priority)
+    everything = client.get("/api/needs-action").json()
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3} | ({"cursor": cursor} if cursor else {})
+        resp = client.get("/api/needs-action", params=params)
+        assert resp.status_code == 200
+        seen.extend(resp.json())
+        cursor = resp.headers.get("x-next-cursor")
+        if not cursor:
+            break
+    assert seen == everything
+    assert [i["priority"] for i in seen] == ["high"] * 2 + ["normal"] * 3 + ["low"] * 2
+
+
+def test_list_cursor_survives_changes(client, initialized_vault, vault_dir):
+    """Items added or removed before the cursor do not shift the next page."""
+    names = sorted(_simulate(client, "a@example.com", "normal") for _ in range(4))
+    resp = client.get("/api/needs-action", params={"limit": 2})
+    assert [i["filename"] for i in resp.json()] == names[:2]
+    cursor = resp.headers["x-next-cursor"]
+
+    (vault_dir / "Needs_Action" / names[0]).unlink()
+    _simulate(client, "b@example.com", "high")
+    resp = client.get("/api/needs-action", params={"limit": 2, "cursor": cursor})
+    assert [i["filename"] for i in resp.json()] == names[2:]
+    assert "x-next-cursor" not in resp.headers
+
+
+def test_list_filters_and_fields(client, initialized_vault):
+    """priority/type/sender/since filters combine, and fields projects the output."""
+    _simulate(client, "Alice@Example.com", "high")
+    _simulate(client, "bob@example.com", "high", "payment")
+    _simulate(client, "alice@other.com", "normal", "payment")
+
+    def senders_for(**params):
+        return [i["sender"] for i in client.get("/api/needs-action", params=params).json()]
+
+    assert sorted(senders_for(priority="high")) == ["Alice@Example.com", "bob@example.com"]
+    assert senders_for(priority="high", type="payment") == ["bob@example.com"]
+    assert sorted(senders_for(sender="alice")) == ["Alice@Example.com", "alice@other.com"]
+    assert len(senders_for(priority="high,normal", since="2000-01-01")) == 3
+    assert senders_for(since="2999-01-01T00:00") == []
+
+    resp = client.get("/api/needs-action", params={"fields": "id,priority", "limit": 1})
+    assert list(resp.json()[0]) == ["id", "priority"]
+
+
+def test_list_rejects_bad_parameters(client, initialized_vault):
+    _simulate(client, "a@example.com", "normal")
+    assert client.get("/api/needs-action", params={"cursor": "garbage!"}).status_code == 400
+    assert client.get("/api/needs-action", params={"cursor": "WyJ4Il0"}).status_code == 400
+    assert client.get("/api/needs-action", params={"fields": "id,nope"}).status_code == 400
+    assert client.get("/api/needs-action", params={"since": "yesterday"}).status_code == 400
+    assert client.get("/api/needs-action", params={"limit": 0}).status_code == 422
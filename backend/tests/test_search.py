@@ -0,0 +1,138 @@
+import pytest
+
+from app.config import settings
+from app.services import search_index, vault_index
+from app.services.search_index import SEARCH_DIR, SearchIndex, parse_query
+from app.services.vault_index import VaultIndex
+
+
+@pytest.fixture(autouse=True)
+def close_search_index():
+    yield
+    search_index.shutdown()
+
+
+def _simulate(client, sender, subject, body, email_type="email"):
+    return client.post("/api/simulate/email", json={
+        "sender": sender, "subject": subject, "body": body, "type": email_type,
+    }).json()["filename"]
+
+
+def _search(client, q, **params):
+    resp = client.get("/api/search", params={"q": q} | params)
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def _hits(client, q, **params):
+    return [(h["folder"], h["filename"]) for h in _search(client, q, **params)["hits"]]
+
+
+def test_matches_subject_sender_and_body(client, initialized_vault):
+    quarterly = _simulate(client, "alice@acme.com", "Quarterly report", "Numbers attached for review.")
+    lunch = _simulate(client, "bob@example.com", "Lunch", "Shall we meet on thursday?")
+
+    result = _search(client, "quarterly")
+    assert result["total"] == 1
+    hit = result["hits"][0]
+    assert (hit["filename"], hit["folder"], hit["sender"], hit["subject"]) == (
+        quarterly, "Needs_Action", "alice@acme.com", "Quarterly report",
+    )
+    assert _hits(client, "acme") == [("Needs_Action", quarterly)]
+    assert _hits(client, "THURSDAY") == [("Needs_Action", lunch)]
+    assert _hits(client, "thursday quarterly") == []
+
+
+def test_ranks_by_bm25(client, initialized_vault):
+    in_body = _simulate(client, "a@example.com", "Status", "The contract draft is attached, plus other notes.")
+    in_subject = _simulate(client, "b@example.com", "Contract", "Please sign.")
+    repeated = _simulate(client, "c@example.com", "Contract contract", "Contract terms for the contract.")
+    for i in range(5):
+        _simulate(client, f"x{i}@example.com", "Other", "Unrelated filler text about lunch.")
+
+    hits = _search(client, "contract")["hits"]
+    assert [h["filename"] for h in hits] == [repeated, in_subject, in_body]
+    assert hits[0]["score"] > hits[1]["score"] > hits[2]["score"] > 0
+
+
+def test_prefix_field_and_folder_filters(client, initialized_vault):
+    invoice = _simulate(client, "billing@vendor.com", "Invoice #12", "Payment due for $50.", "payment")
+    invoicing = _simulate(client, "ops@example.com", "Invoicing question", "How do you bill?")
+    mention = _simulate(client, "billing@other.com", "Hello", "The invoice follows.")
+
+    assert {f for _, f in _hits(client, "invoic*")} == {invoice, invoicing, mention}
+    assert _hits(client, "subject:invoice") == [("Needs_Action", invoice)]
+    assert {f for _, f in _hits(client, "from:billing")} == {invoice, mention}
+    assert _hits(client, "invoice type:payment") == [("Needs_Action", invoice)]
+    assert _hits(client, "invoice", type="email") == [("Needs_Action", mention)]
+    assert _hits(client, "invoice before:2000-01-01") == []
+    assert len(_hits(client, "invoice", since="2000-01-01")) == 2
+
+    client.post("/api/needs-action/process", json={"filename": invoicing})
+    assert _hits(client, "invoicing folder:Done") == [("Done", invoicing)]
+    assert ("Needs_Action", invoicing) not in _hits(client, "invoicing")
+    plans = _hits(client, "invoicing", folder="Plans")
+    assert len(plans) == 1 and plans[0][1].startswith("PLAN_")
+
+
+def test_tracks_moves_and_deletes(client, initialized_vault, vault_dir):
+    keep = _simulate(client, "a@example.com", "Renewal", "Subscription renewal notice.")
+    gone = _simulate(client, "b@example.com", "Renewal", "Another renewal.")
+    assert _search(client, "renewal")["total"] == 2
+
+    client.post("/api/needs-action/process-all")
+    (vault_dir / "Done" / gone).unlink()
+    hits = _hits(client, "renewal folder:Done")
+    assert hits == [("Done", keep)]
+    assert _search(client, "renewal folder:Needs_Action")["total"] == 0
+
+
+def test_index_persists_and_reconciles_on_restart(client, initialized_vault, vault_dir):
+    names = [_simulate(client, f"u{i}@example.com", f"Shipment {i}", "Tracking number inside.") for i in range(3)]
+    assert _search(client, "shipment")["total"] == 3
+
+    # Restart after one file was deleted and one edited while the app was down.
+    search_index.shutdown()
+    vault_index._index = None
+    assert (vault_dir / SEARCH_DIR / "manifest.json").exists()
+    (vault_dir / "Needs_Action" / names[0]).unlink()
+    edited = vault_dir / "Needs_Action" / names[1]
+    edited.write_text(edited.read_text().replace("Tracking number inside.", "Courier delayed."))
+
+    assert {f for _, f in _hits(client, "shipment")} == {names[1], names[2]}
+    assert _hits(client, "courier") == [("Needs_Action", names[1])]
+    assert _hits(client, "tracking") == [("Needs_Action", names[2])]
+    stats = client.get("/api/search/stats").json()
+    assert stats["enabled"] is True and stats["documents"] == 2 and stats["segments"] == 1
+
+
+def test_segments_merge_and_reload_without_changing_results(tmp_path, monkeypatch):
+    monkeypatch.setattr(search_index, "SEGMENT_DOCS", 25)
+    monkeypatch.setattr(search_index, "MAX_SEGMENTS", 3)
+    engine = SearchIndex(VaultIndex(tmp_path))
+    words = ["alpha", "beta", "gamma", "delta"]
+    for i in range(200):
+        body = " ".join(words[j % 4] for j in range(i % 7 + 1)) + f" filler{i % 5}"
+        engine.add_document("Done", f"EMAIL_{i}.md", i, 1, f"---\nsubject: Item {i}\n---\n{body}\n")
+    for i in range(0, 200, 3):
+        engine.add_document("Done", f"EMAIL_{i}.md", 1000 + i, 1, f"---\nsubject: Item {i}\n---\nrewritten alpha\n")
+
+    queries = [parse_query(q) for q in ("alpha", "alpha beta", "gam*", "subject:item filler2")]
+    before = [engine.search(q, 5) for q in queries]
+    exhaustive = [engine.search(q, 1000) for q in queries]
+    for (top, total), (everything, all_total) in zip(before, exhaustive):
+        assert total == all_total == len(everything)
+        assert [m.score for m in top] == [m.score for m in everything[:5]]
+    assert len(engine._segments) <= 3
+
+    engine.close()
+    reloaded = SearchIndex(VaultIndex(tmp_path))
+    assert [reloaded.search(q, 5) for q in queries] == before
+
+
+def test_bad_queries(client, initialized_vault, monkeypatch):
+    assert client.get("/api/search", params={"q": "folder:Done"}).status_code == 400
+    assert client.get("/api/search", params={"q": "x after:yesterday"}).status_code == 400
+    monkeypatch.setattr(settings, "SEARCH_INDEX", False)
+    assert client.get("/api/search", params={"q": "invoice"}).status_code == 409
+    assert client.get("/api/search/stats").json()["enabled"] is False
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from app.models.action_item import ActionItem
+from app.services import serialization
+from app.services.serialization import dump_models, dumps, negotiate
+from benchmarks.bench_responses import bench, build_items
+
+
+def _fill(client, count):
+    client.post("/api/simulate/batch", json={"count": count})
+
+
+def test_encoders_match_the_standard_library():
+    items = build_items(20)
+    expected = [item.model_dump() for item in items]
+    assert json.loads(dump_models(ActionItem, items)) == expected
+    assert json.loads(dump_models(ActionItem, items, {"id", "subject"})) == [
+        {"id": i["id"], "subject": i["subject"]} for i in expected
+    ]
+    content = {"items": items[:2], "n": 1, "ratio": 0.5, "text": "naïve ✓", 3: None}
+    assert json.loads(dumps(content)) == {
+        "items": expected[:2], "n": 1, "ratio": 0.5, "text": "naïve ✓", "3": None,
+    }
+
+
+def test_negotiate(monkeypatch):
+    monkeypatch.setattr(serialization, "ENCODINGS", ("br", "gzip"))
+    assert negotiate("gzip, deflate, br") == "br"
+    assert negotiate("gzip;q=0.5, br;q=0") == "gzip"
+    assert negotiate("*") == "br"
+    assert negotiate("identity") is None and negotiate(None) is None
+    monkeypatch.setattr(serialization, "ENCODINGS", ("gzip",))
+    assert negotiate("br") is None
+
+
+def test_large_lists_are_compressed_and_revalidate(client, initialized_vault):
+    _fill(client, 30)
+    plain = client.get("/api/needs-action", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers
+
+    packed = client.get("/api/needs-action", headers={"Accept-Encoding": "gzip"})
+    assert packed.headers["content-encoding"] == "gzip" and "Accept-Encoding" in packed.headers["vary"]
+    assert packed.json() == plain.json()
+    assert int(packed.headers["content-length"]) < len(plain.content) / 3
+    assert packed.headers["etag"] == plain.headers["etag"][:-1] + '-gzip"'
+
+    for etag in (plain.headers["etag"], packed.headers["etag"]):
+        resp = client.get("/api/needs-action", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+        assert resp.status_code == 304
+
+    small = client.get("/api/needs-action", params={"limit": 1}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+    assert client.get("/api/needs-action", params={"fields": "id,bogus"}).status_code == 400
+
+
+def test_other_endpoints_are_gzipped_by_the_middleware(client, initialized_vault):
+    _fill(client, 30)
+    resp = client.get("/api/search", params={"q": "the", "limit": 50}, headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["content-encoding"] == "gzip" and resp.json()["total"] > 0
+    raw = client.get("/api/health", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in raw.headers
+
+
+@pytest.mark.parametrize("count", [1000, 10000])
+def test_list_payload_sizes(count):
+    """bench() checks the two encoders agree; timings are left to benchmarks/bench_responses.py."""
+    results = bench(count)
+    legacy = results["legacy json"]["bytes"]
+    assert results["fast json"]["bytes"] == legacy
+    for encoding in serialization.ENCODINGS:
+        assert results[f"fast json + {encoding}"]["bytes"] < legacy / 4
@@ -37,3 +37,72 @@ def test_simulate_batch_files_on_disk(client, initialized_vault, vault_dir):
     resp = client.post("/api/simulate/batch", json={"count": 4})
     for fname in resp.json()["files"]:
         assert (vault_dir / "Needs_Action" / fname).exists()
+
+
+def _strip_timestamps(text):
+    return "\n".join(line for line in text.splitlines() if "received:" not in line and "**Date**" not in line)
+
+
+def test_bulk_batch_writes_and_indexes(client, initialized_vault, vault_dir):
+    """Bulk mode writes every email, lists only the first names, and the index sees them all."""
+    resp = client.post("/api/simulate/batch", json={"count": 2000, "bulk": True, "seed": 7})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["count"] == 2000 and data["seed"] == 7
+    assert len(data["files"]) == 100
+    assert data["items_per_second"] > 0
+    assert len(list((vault_dir / "Needs_Action").glob("EMAIL_*.md"))) == 2000
+    assert client.get("/api/dashboard").json()["needs_action"] == 2000
+
+
+def test_bulk_output_is_reproducible(client, initialized_vault):
+    """The same seed produces the same files; frontmatter parses like single emails."""
+    from app.services import email_simulator
+
+    first = dict(email_simulator.generate_emails(200, seed=42))
+    second = dict(email_simulator.generate_emails(200, seed=42))
+    assert list(first) == list(second)
+    assert all(_strip_timestamps(first[f]) == _strip_timestamps(second[f]) for f in first)
+    assert list(first) != list(dict(email_simulator.generate_emails(200, seed=43)))
+
+    data = client.post("/api/simulate/batch", json={"count": 200, "bulk": True, "seed": 42}).json()
+    items = {i["filename"]: i for i in client.get("/api/needs-action").json()}
+    assert set(items) == set(first) and data["files"] == list(first)[:100]
+    assert all("{" not in i["subject"] and i["sender"] != "unknown" for i in items.values())
+
+
+def test_seeded_regular_batch_is_reproducible(client, initialized_vault):
+    def subjects():
+        files = client.post("/api/simulate/batch", json={"count": 10, "seed": 3}).json()["files"]
+        items = {i["filename"]: i["subject"] for i in client.get("/api/needs-action").json()}
+        return [items[f] for f in files]
+
+    assert subjects() == subjects()
+
+
+def test_bulk_rerun_never_overwrites(client, initialized_vault, vault_dir):
+    """Rerunning a seed skips the files that already exist instead of rewriting them."""
+    first = client.post("/api/simulate/batch", json={"count": 300, "bulk": True, "seed": 1}).json()
+    assert first["count"] == 300 and first["skipped"] == 0
+    assert first["files"][0] == "EMAIL_SIM1_000000.md"
+    processed = first["files"][0]
+    client.post("/api/needs-action/process", json={"filename": processed})
+    edited = vault_dir / "Needs_Action" / first["files"][1]
+    edited.write_text(edited.read_text() + "\nowner note\n")
+
+    again = client.post("/api/simulate/batch", json={"count": 500, "bulk": True, "seed": 1}).json()
+    assert again["count"] == 201 and again["skipped"] == 299
+    assert "299 skipped" in again["message"]
+    assert edited.read_text().endswith("owner note\n")
+    assert len(list((vault_dir / "Needs_Action").glob("EMAIL_*.md"))) == 500
+    assert not list((vault_dir / "Needs_Action").glob(".*"))  # no temp files left behind
+
+
+def test_batch_count_limit(client, initialized_vault, monkeypatch):
+    from app.config import settings
+
+    assert client.post("/api/simulate/batch", json={"count": 0}).status_code == 422
+    assert client.post("/api/simulate/batch", json={"count": 200_000, "bulk": True}).status_code == 422
+    monkeypatch.setattr(settings, "SIMULATOR_SYNC_BATCH", 10)
+    resp = client.post("/api/simulate/batch", json={"count": 11, "bulk": True})
+    assert resp.status_code == 400 and "background=true" in resp.json()["detail"]
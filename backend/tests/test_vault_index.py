@@ -0,0 +1,119 @@
+from app.services.vault_index import VaultIndex, get_index
+
+
+def _write(path, subject, body="Hello there."):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(
+        f"---\ntype: email\nid: {path.stem}\nsubject: {subject}\n---\n\n{body}\n",
+        encoding="utf-8",
+    )
+
+
+def test_index_lists_and_parses(vault_dir):
+    """Entries expose frontmatter, body offset and snippet."""
+    _write(vault_dir / "Needs_Action" / "EMAIL_a.md", "First")
+    _write(vault_dir / "Needs_Action" / "EMAIL_b.md", "Second")
+    index = VaultIndex(vault_dir)
+
+    entries = index.entries("Needs_Action")
+    assert [e.name for e in entries] == ["EMAIL_a.md", "EMAIL_b.md"]
+    assert entries[0].meta["subject"] == "First"
+    assert entries[0].snippet == "Hello there."
+    text = entries[0].path.read_text(encoding="utf-8")
+    assert text[entries[0].body_offset:].strip() == "Hello there."
+
+
+def test_index_missing_folder(vault_dir):
+    """A folder that does not exist is simply empty."""
+    index = VaultIndex(vault_dir)
+    assert index.entries("Done") == []
+    assert index.count("Done") == 0
+
+
+def test_index_picks_up_touched_changes(vault_dir):
+    """Writers that touch the index are reflected on the next read."""
+    path = vault_dir / "Pending_Approval" / "APPROVAL_x.md"
+    _write(path, "Before")
+    index = VaultIndex(vault_dir)
+    assert index.get("Pending_Approval", path.name).meta["subject"] == "Before"
+
+    _write(path, "After")
+    index.touch(path)
+    assert index.get("Pending_Approval", path.name).meta["subject"] == "After"
+
+    path.unlink()
+    index.touch(path)
+    assert index.count("Pending_Approval") == 0
+
+
+def test_index_reuses_unchanged_entries(vault_dir):
+    """A rescan keeps already-parsed entries whose stat did not change."""
+    _write(vault_dir / "Done" / "EMAIL_a.md", "Kept")
+    index = VaultIndex(vault_dir)
+    first = index.get("Done", "EMAIL_a.md")
+    _write(vault_dir / "Done" / "EMAIL_b.md", "New")
+    index.invalidate("Done")
+    assert index.get("Done", "EMAIL_a.md") is first
+    assert index.count("Done") == 2
+
+
+def test_get_index_follows_vault_dir(vault_dir):
+    """The shared index is bound to the configured vault."""
+    assert get_index().root == vault_dir
+    assert get_index() is get_index()
+
+
+def test_find_by_id_tracks_changes(vault_dir):
+    """The id map follows files as they are added and removed."""
+    _write(vault_dir / "Pending_Approval" / "APPROVAL_abc.md", "One")
+    index = VaultIndex(vault_dir)
+    assert index.find_by_id("Pending_Approval", "APPROVAL_abc").name == "APPROVAL_abc.md"
+    assert index.find_by_id("Pending_Approval", "abc").name == "APPROVAL_abc.md"
+    assert index.find_by_id("Pending_Approval", "nope") is None
+
+    new = vault_dir / "Pending_Approval" / "APPROVAL_def.md"
+    _write(new, "Two")
+    index.touch(new)
+    assert index.find_by_id("Pending_Approval", "def").name == "APPROVAL_def.md"
+
+    new.unlink()
+    index.touch(new)
+    assert index.find_by_id("Pending_Approval", "def") is None
+
+
+def test_watched_index_trusts_events(vault_dir):
+    """With a watcher attached, only touched files are re-read."""
+    _write(vault_dir / "Done" / "EMAIL_a.md", "A")
+    index = VaultIndex(vault_dir)
+    assert index.count("Done") == 1
+    index.watched = True
+
+    unseen = vault_dir / "Done" / "EMAIL_b.md"
+    _write(unseen, "B")
+    assert index.count("Done") == 1
+    index.touch(unseen)
+    assert index.count("Done") == 2
+
+
+def test_select_keeps_sorted_view_current(vault_dir):
+    """Sorted views follow adds/removes and page from a key without rescanning order."""
+    folder = vault_dir / "Needs_Action"
+    for name in ("EMAIL_c", "EMAIL_a", "EMAIL_b"):
+        _write(folder / f"{name}.md", name)
+    index = VaultIndex(vault_dir)
+
+    def by_subject_length(entry):
+        return (len(entry.meta["subject"]),)
+
+    page, more = index.select("Needs_Action", by_subject_length, limit=2)
+    assert [e.name for _, e in page] == ["EMAIL_a.md", "EMAIL_b.md"]
+    assert more
+
+    _write(folder / "EMAIL_0.md", "x")
+    (folder / "EMAIL_b.md").unlink()
+    index.touch(folder / "EMAIL_0.md", folder / "EMAIL_b.md")
+    page, more = index.select("Needs_Action", by_subject_length, after=page[-1][0])
+    assert [e.name for _, e in page] == ["EMAIL_c.md"]
+    assert not more
+    page, _ = index.select("Needs_Action", by_subject_length, until=(7,))
+    assert [e.name for _, e in page] == ["EMAIL_0.md"]
@@ -0,0 +1,158 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from app.services import file_processor, vault_journal
+from app.services.vault_journal import JOURNAL_DIR, Transition, TransitionConflict, atomic_write, recover
+
+
+def _hidden(directory):
+    return [p.name for p in directory.iterdir() if p.name.startswith(".")]
+
+
+def _simulate(client, **overrides):
+    email = {"sender": "a@example.com", "subject": "Hello", "body": "Just checking in.", "type": "email"}
+    email.update(overrides)
+    return client.post("/api/simulate/email", json=email).json()["filename"]
+
+
+def test_atomic_write_replaces_and_leaves_no_temp_files(vault_dir):
+    path = vault_dir / "Plans" / "PLAN_x.md"
+    assert atomic_write(path, "one")
+    assert atomic_write(path, "two")
+    assert path.read_text() == "two"
+    assert _hidden(path.parent) == []
+
+
+def test_atomic_write_exclusive_keeps_existing_file(vault_dir):
+    path = vault_dir / "Needs_Action" / "FILE_a.md"
+    assert atomic_write(path, "first", exclusive=True)
+    assert not atomic_write(path, "second", exclusive=True)
+    assert path.read_text() == "first"
+    assert _hidden(path.parent) == []
+
+
+def test_transition_is_invisible_until_commit(vault_dir):
+    src = vault_dir / "Needs_Action" / "EMAIL_1.md"
+    atomic_write(src, "item")
+    with Transition("process_item", "Needs_Action/EMAIL_1.md") as tx:
+        tx.write(vault_dir / "Plans" / "PLAN_1.md", "plan")
+        tx.move(src, vault_dir / "Done" / "EMAIL_1.md")
+        assert not (vault_dir / "Plans" / "PLAN_1.md").exists() and src.exists()
+        with pytest.raises(TransitionConflict):
+            with Transition("process_item", "Needs_Action/EMAIL_1.md"):
+                pass
+        tx.commit()
+
+    assert (vault_dir / "Plans" / "PLAN_1.md").read_text() == "plan"
+    assert (vault_dir / "Done" / "EMAIL_1.md").read_text() == "item"
+    assert not src.exists()
+    assert list((vault_dir / JOURNAL_DIR).iterdir()) == []
+
+
+def test_abandoned_transition_rolls_back(vault_dir):
+    src = vault_dir / "Needs_Action" / "EMAIL_1.md"
+    atomic_write(src, "item")
+    with pytest.raises(RuntimeError):
+        with Transition("process_item", "Needs_Action/EMAIL_1.md") as tx:
+            tx.write(vault_dir / "Plans" / "PLAN_1.md", "plan")
+            tx.move(src, vault_dir / "Done" / "EMAIL_1.md")
+            raise RuntimeError("crash before commit")
+
+    assert src.exists()
+    assert list((vault_dir / "Plans").iterdir()) == []
+    assert list((vault_dir / JOURNAL_DIR).iterdir()) == []
+
+
+def test_recover_rolls_committed_journal_forward(vault_dir, monkeypatch):
+    src = vault_dir / "Needs_Action" / "EMAIL_1.md"
+    atomic_write(src, "item")
+    real_apply = vault_journal._apply
+
+    def crash_after_first_rename(vault, renames):
+        real_apply(vault, renames[:1])
+        raise OSError("power lost")
+
+    monkeypatch.setattr(vault_journal, "_apply", crash_after_first_rename)
+    with pytest.raises(OSError):
+        with Transition("process_item", "Needs_Action/EMAIL_1.md") as tx:
+            tx.write(vault_dir / "Plans" / "PLAN_1.md", "plan")
+            tx.write(vault_dir / "Pending_Approval" / "APPROVAL_1.md", "approval")
+            tx.move(src, vault_dir / "In_Progress" / "EMAIL_1.md")
+            tx.commit()
+    monkeypatch.setattr(vault_journal, "_apply", real_apply)
+
+    assert (vault_dir / "Plans" / "PLAN_1.md").exists() and src.exists()
+    journal = json.loads(next((vault_dir / JOURNAL_DIR).iterdir()).read_text())
+    assert journal["state"] == "committed" and len(journal["renames"]) == 3
+
+    stats = recover()
+    assert stats["rolled_forward"] == 1
+    assert (vault_dir / "Pending_Approval" / "APPROVAL_1.md").read_text() == "approval"
+    assert (vault_dir / "In_Progress" / "EMAIL_1.md").read_text() == "item"
+    assert not src.exists()
+    assert list((vault_dir / JOURNAL_DIR).iterdir()) == []
+    assert _hidden(vault_dir / "Pending_Approval") == []
+    assert recover() == {"rolled_forward": 0, "rolled_back": 0, "temp_files_removed": 0, "orphans_repaired": 0}
+
+
+def test_recover_drops_uncommitted_journals_and_temp_files(vault_dir):
+    (vault_dir / JOURNAL_DIR).mkdir(parents=True)
+    (vault_dir / JOURNAL_DIR / "Needs_Action__EMAIL_1.md.json").write_text('{"state": "preparing", "renames": []}')
+    (vault_dir / "Plans").mkdir()
+    (vault_dir / "Plans" / ".PLAN_1.md.tmp-abc123").write_text("half a plan")
+    (vault_dir / ".Dashboard.md.tmp-def456").write_text("half a dashboard")
+
+    stats = recover()
+    assert (stats["rolled_back"], stats["temp_files_removed"]) == (1, 2)
+    assert _hidden(vault_dir / "Plans") == []
+    assert not (vault_dir / ".Dashboard.md.tmp-def456").exists()
+    # The claim is released: the item can be processed again.
+    with Transition("process_item", "Needs_Action/EMAIL_1.md"):
+        pass
+
+
+def test_recover_repairs_orphaned_approval(client, initialized_vault, vault_dir):
+    filename = _simulate(client, type="payment", subject="Invoice", body="Please pay $500.")
+    # A pre-journal crash: approval written, source never moved out of Needs_Action.
+    atomic_write(
+        vault_dir / "Pending_Approval" / "APPROVAL_x.md",
+        f"---\ntype: approval\nid: x\nsource_file: {filename}\nstatus: pending\n---\n",
+    )
+
+    assert recover()["orphans_repaired"] == 1
+    assert (vault_dir / "In_Progress" / filename).exists()
+    assert not (vault_dir / "Needs_Action" / filename).exists()
+    assert client.post("/api/approvals/x/approve").status_code == 200
+    assert (vault_dir / "Done" / filename).exists()
+
+
+def test_concurrent_processing_of_one_item_runs_once(client, initialized_vault, vault_dir):
+    filename = _simulate(client)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(file_processor.process_item, [filename] * 8))
+
+    assert sum(r.startswith("Completed") for r in results) == 1
+    assert all(r.startswith(("Completed", "Already being processed", "File not found")) for r in results)
+    assert (vault_dir / "Done" / filename).exists()
+    assert len(list((vault_dir / "Plans").glob("PLAN_*.md"))) == 1
+    assert _hidden(vault_dir / "Plans") == []
+
+
+def test_process_conflict_returns_409(client, initialized_vault):
+    filename = _simulate(client)
+    with Transition("process_item", f"Needs_Action/{filename}"):
+        resp = client.post("/api/needs-action/process", json={"filename": filename})
+    assert resp.status_code == 409
+    assert client.post("/api/needs-action/process", json={"filename": filename}).status_code == 200
+
+
+def test_approval_conflict_returns_409(client, initialized_vault, vault_dir):
+    filename = _simulate(client, type="payment", subject="Invoice", body="Please pay $500.")
+    client.post("/api/needs-action/process", json={"filename": filename})
+    approval = client.get("/api/approvals").json()[0]
+    with Transition("approval_approved", f"Pending_Approval/{approval['filename']}"):
+        assert client.post(f"/api/approvals/{approval['id']}/reject").status_code == 409
+    assert client.post(f"/api/approvals/{approval['id']}/reject").status_code == 200
+    assert (vault_dir / "Needs_Action" / filename).exists()
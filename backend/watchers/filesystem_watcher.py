@@ -3,44 +3,334 @@ filesystem_watcher.py — Watch vault/Inbox/ for new files and create action ite
 
 Runs as a background async task inside FastAPI's lifespan.
 When a new file lands in Inbox/, creates a corresponding FILE_<name>.md in Needs_Action/.
+Also forwards every change under the vault to the in-memory VaultIndex so that
+API reads never have to touch disk for files that have not changed.
+
+Inbox events are not handled on the observer thread. They are coalesced per
+path in an IntakeQueue; once a path has been quiet for the debounce window
+and its size/mtime are unchanged between two checks (so half-copied files are
+not picked up), it is handed to an asyncio consumer that writes action files
+in batches on a worker thread.
+
+On startup, a catch-up pass diffs Inbox/ against the FILE_*.md action files
+in Needs_Action/, In_Progress/ and Done/ and a persisted manifest of
+(name, size, mtime), and processes whatever arrived while the watcher was
+down in parallel batches, without holding up server startup. Progress is
+kept in the module-level `status` (served at /api/watchers/status).
 """
 
 import asyncio
+import json
 import logging
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable
 
-from watchdog.events import FileSystemEventHandler, FileCreatedEvent
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
 from watchdog.observers import Observer
 
+from app.services import metrics
+from app.services.vault_index import VaultIndex, get_index
+from app.services.vault_journal import atomic_write
+
 logger = logging.getLogger("fs-watcher")
 
+DEBOUNCE_SECONDS = 0.25   # quiet time after the last event for a path
+CHECK_INTERVAL = 0.1      # how often pending paths are re-checked for stability
+BATCH_SIZE = 256          # action files written per worker-thread call
+LATENCY_SAMPLES = 2048    # recent event-to-action-file latencies kept for percentiles
+CATCH_UP_BATCH_SIZE = 64  # action files per catch-up batch (batches run in parallel)
+CATCH_UP_WORKERS = 4
+
+STATE_DIR = ".state"
+MANIFEST_FILE = "inbox_manifest.json"
+ACTION_FOLDERS = ("Needs_Action", "In_Progress", "Done")
+
+
+class VaultIndexHandler(FileSystemEventHandler):
+    """Invalidate VaultIndex entries for every change anywhere in the vault."""
+
+    def __init__(self, index: VaultIndex):
+        super().__init__()
+        self.index = index
+
+    def on_any_event(self, event: FileSystemEvent):
+        if event.event_type in ("opened", "closed", "closed_no_write"):
+            return
+        paths = [Path(event.src_path)]
+        dest = getattr(event, "dest_path", "")
+        if dest:
+            paths.append(Path(dest))
+        self.index.touch(*paths)
+
+
+@dataclass
+class _Pending:
+    first_seen: float
+    last_event: float
+    signature: tuple[int, int] | None = None
+
+
+@dataclass
+class ReadyFile:
+    path: Path
+    size: int
+    first_seen: float
+    mtime_ns: int = 0
+
+
+class IntakeQueue:
+    """Thread-safe, per-path coalescing queue between watchdog and the intake consumer.
+
+    `note()` is called from the observer thread for every create/modify/move;
+    repeated events for a path only push back its debounce deadline.
+    `take_ready()` returns paths that have been quiet for `debounce` seconds and
+    whose (size, mtime) matched on two consecutive checks.
+    """
+
+    def __init__(self, debounce: float = DEBOUNCE_SECONDS):
+        self.debounce = debounce
+        self.events = 0
+        self.coalesced = 0
+        self._pending: dict[Path, _Pending] = {}
+        self._lock = threading.Lock()
+        self._wakeup: Callable[[], None] | None = None
+
+    def bind(self, wakeup: Callable[[], None] | None):
+        """Register a thread-safe callback invoked whenever a new path is queued."""
+        self._wakeup = wakeup
+
+    def note(self, path: Path, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        metrics.WATCHER_EVENTS.labels("filesystem").inc()
+        with self._lock:
+            self.events += 1
+            pending = self._pending.get(path)
+            if pending is not None:
+                self.coalesced += 1
+                pending.last_event = now
+                return
+            self._pending[path] = _Pending(first_seen=now, last_event=now)
+        if self._wakeup is not None:
+            self._wakeup()
+
+    def discard(self, path: Path):
+        with self._lock:
+            self._pending.pop(path, None)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def take_ready(self, now: float | None = None, limit: int = BATCH_SIZE) -> list[ReadyFile]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            quiet = [(p, s) for p, s in self._pending.items() if now - s.last_event >= self.debounce]
+
+        ready: list[ReadyFile] = []
+        for path, pending in quiet:
+            try:
+                st = path.stat()
+            except OSError:
+                self.discard(path)
+                continue
+            signature = (st.st_size, st.st_mtime_ns)
+            if pending.signature != signature:
+                # First look, or still being written: check again next round.
+                pending.signature = signature
+                continue
+            with self._lock:
+                current = self._pending.get(path)
+                if current is not pending or now - pending.last_event < self.debounce:
+                    continue  # a new event arrived while we were stat-ing
+                del self._pending[path]
+            ready.append(ReadyFile(path, st.st_size, pending.first_seen, st.st_mtime_ns))
+            if len(ready) >= limit:
+                break
+        return ready
+
+
+def _percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+@dataclass
+class IntakeStats:
+    """Throughput and event-to-action-file latency of the Inbox intake."""
+
+    files: int = 0
+    batches: int = 0
+    busy_seconds: float = 0.0
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LATENCY_SAMPLES))
+
+    def record_batch(self, count: int, elapsed: float, latencies: list[float]):
+        self.files += count
+        self.batches += 1
+        self.busy_seconds += elapsed
+        self.latencies.extend(latencies)
+
+    def snapshot(self, queue: IntakeQueue | None = None) -> dict:
+        samples = list(self.latencies)
+        snap = {
+            "files": self.files,
+            "batches": self.batches,
+            "files_per_second": round(self.files / self.busy_seconds, 1) if self.busy_seconds else 0.0,
+            "latency_ms": {
+                "p50": round(_percentile(samples, 50) * 1000, 1),
+                "p95": round(_percentile(samples, 95) * 1000, 1),
+                "p99": round(_percentile(samples, 99) * 1000, 1),
+                "max": round(max(samples, default=0.0) * 1000, 1),
+            },
+        }
+        if queue is not None:
+            snap.update(events=queue.events, coalesced=queue.coalesced, pending=len(queue))
+        return snap
+
+
+def _action_name(filepath: Path) -> str:
+    return f"FILE_{filepath.stem.replace(' ', '_')}.md"
+
+
+class InboxManifest:
+    """Inbox files already matched to an action file, as {name: [size, mtime_ns]}.
+
+    Persisted as JSON under <vault>/.state/ (in memory only when `path` is None),
+    so the startup catch-up can tell handled files from ones that arrived while
+    the watcher was down.
+    """
+
+    def __init__(self, path: Path | None):
+        self.path = path
+        self._entries: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if path is not None:
+            try:
+                self._entries = json.loads(path.read_text(encoding="utf-8"))
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                logger.warning("[FS] Ignoring unreadable manifest %s: %s", path, e)
+
+    def matches(self, name: str, size: int, mtime_ns: int) -> bool:
+        with self._lock:
+            return self._entries.get(name) == [size, mtime_ns]
+
+    def record(self, name: str, size: int, mtime_ns: int):
+        with self._lock:
+            if self._entries.get(name) != [size, mtime_ns]:
+                self._entries[name] = [size, mtime_ns]
+                self._dirty = True
+
+    def retain(self, names: set[str]):
+        """Forget files that are no longer in Inbox."""
+        with self._lock:
+            stale = self._entries.keys() - names
+            for name in stale:
+                del self._entries[name]
+            self._dirty = self._dirty or bool(stale)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def save(self):
+        """Write the manifest atomically (temp file + rename) if it changed."""
+        with self._lock:
+            if self.path is None or not self._dirty:
+                return
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._entries), encoding="utf-8")
+            os.replace(tmp, self.path)
+            self._dirty = False
+
 
 class InboxHandler(FileSystemEventHandler):
-    """React to new files created in the Inbox folder."""
+    """Feed Inbox create/modify/move events into the intake queue."""
 
-    def __init__(self, vault_path: Path, dry_run: bool = True):
+    def __init__(
+        self,
+        vault_path: Path,
+        dry_run: bool = True,
+        queue: IntakeQueue | None = None,
+        manifest: InboxManifest | None = None,
+    ):
         super().__init__()
         self.vault_path = vault_path
+        self.inbox = vault_path / "Inbox"
         self.dry_run = dry_run
+        self.queue = queue if queue is not None else IntakeQueue()
+        self.manifest = manifest if manifest is not None else InboxManifest(None)
+
+    def _accept(self, path: Path) -> bool:
+        # Dot-files are editor/copy temporaries (".~lock.x#", ".x.swp", ".part" staging names).
+        return path.parent == self.inbox and not path.name.startswith(".")
+
+    def on_created(self, event: FileSystemEvent):
+        if not event.is_directory and self._accept(Path(event.src_path)):
+            self.queue.note(Path(event.src_path))
 
-    def on_created(self, event: FileCreatedEvent):
+    def on_modified(self, event: FileSystemEvent):
+        self.on_created(event)
+
+    def on_moved(self, event: FileSystemEvent):
         if event.is_directory:
             return
+        self.queue.discard(Path(event.src_path))
+        dest = Path(event.dest_path)
+        if self._accept(dest):
+            self.queue.note(dest)
 
-        src = Path(event.src_path)
-        self._process_file(src)
+    def on_deleted(self, event: FileSystemEvent):
+        if not event.is_directory:
+            self.queue.discard(Path(event.src_path))
 
-    def _process_file(self, filepath: Path):
+    def process_batch(self, files: list[ReadyFile], save_manifest: bool = True) -> list[Path]:
+        """Write action files for settled Inbox files. Returns the action files created."""
         needs_action = self.vault_path / "Needs_Action"
         needs_action.mkdir(parents=True, exist_ok=True)
+        existing = set(os.listdir(needs_action))
+
+        created: list[Path] = []
+        for ready in files:
+            if self.manifest.matches(ready.path.name, ready.size, ready.mtime_ns):
+                continue  # already handled in an earlier run
+            action_file = self._process_file(ready.path, ready.size, existing)
+            if action_file is not None:
+                existing.add(action_file.name)
+                created.append(action_file)
+            if not self.dry_run:
+                self.manifest.record(ready.path.name, ready.size, ready.mtime_ns)
+
+        if created and not self.dry_run:
+            get_index(self.vault_path).touch(*created)
+        if save_manifest:
+            self.manifest.save()
+        return created
 
-        safe_name = filepath.stem.replace(" ", "_")
-        action_file = needs_action / f"FILE_{safe_name}.md"
+    def _process_file(self, filepath: Path, size: int, existing: set[str]) -> Path | None:
+        start = time.perf_counter()
+        action_file, outcome = self._write_action_file(filepath, size, existing)
+        metrics.INBOX_FILES.labels(outcome).inc()
+        metrics.INBOX_FILE_SECONDS.observe(time.perf_counter() - start)
+        return action_file
 
-        if action_file.exists():
+    def _write_action_file(self, filepath: Path, size: int, existing: set[str]) -> tuple[Path | None, str]:
+        """Create the Needs_Action file for an Inbox file. Returns it (if written) and the outcome label."""
+        action_file = self.vault_path / "Needs_Action" / _action_name(filepath)
+
+        if action_file.name in existing:
             logger.debug("Action file already exists: %s", action_file.name)
-            return
+            return None, "exists"
 
         timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
@@ -55,7 +345,7 @@ status: pending
 
 ## File Received
 - **Name**: {filepath.name}
-- **Size**: {filepath.stat().st_size} bytes
+- **Size**: {size} bytes
 - **Received**: {timestamp}
 
 ## Suggested Actions
@@ -69,29 +359,216 @@ status: pending
                 "[DRY RUN] Would create: %s for inbox file: %s",
                 action_file.name, filepath.name,
             )
-        else:
-            action_file.write_text(content, encoding="utf-8")
-            logger.info("Created: %s (source=%s)", action_file.name, filepath.name)
+            return None, "dry_run"
+        # Exclusive: live intake and catch-up batches may race on the same name.
+        if not atomic_write(action_file, content, exclusive=True):
+            return None, "raced"
+        logger.debug("Created: %s (source=%s)", action_file.name, filepath.name)
+        return action_file, "created"
+
+
+def scan_inbox_gap(handler: InboxHandler) -> tuple[int, list[ReadyFile]]:
+    """Diff Inbox/ against existing action files and the manifest.
+
+    Returns (inbox file count, files that still need an action file). Inbox files
+    whose action file exists but which predate the manifest are recorded in it.
+    """
+    actioned: set[str] = set()
+    for folder in ACTION_FOLDERS:
+        try:
+            actioned.update(n for n in os.listdir(handler.vault_path / folder) if n.startswith("FILE_"))
+        except FileNotFoundError:
+            pass
+
+    now = time.monotonic()
+    names: set[str] = set()
+    gap: list[ReadyFile] = []
+    claimed: set[str] = set()
+    with os.scandir(handler.inbox) as it:
+        for entry in sorted(it, key=lambda e: e.name):
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+            names.add(entry.name)
+            st = entry.stat()
+            if handler.manifest.matches(entry.name, st.st_size, st.st_mtime_ns):
+                continue
+            path = Path(entry.path)
+            action = _action_name(path)
+            if action in actioned:
+                if not handler.dry_run:
+                    handler.manifest.record(entry.name, st.st_size, st.st_mtime_ns)
+                continue
+            if action in claimed:
+                continue  # "x.pdf" and "x.txt" share FILE_x.md; the first one wins, as with live intake
+            claimed.add(action)
+            gap.append(ReadyFile(path, st.st_size, now, st.st_mtime_ns))
+
+    handler.manifest.retain(names)
+    return len(names), gap
+
+
+@dataclass
+class CatchUpProgress:
+    state: str = "idle"  # "idle", "scanning", "running", "done" or "failed"
+    inbox_files: int = 0
+    gap: int = 0
+    processed: int = 0
+    created: int = 0
+    started: str | None = None
+    finished: str | None = None
+    duration_ms: float = 0.0
+    error: str | None = None
+
+
+async def catch_up_inbox(
+    handler: InboxHandler,
+    progress: CatchUpProgress,
+    workers: int = CATCH_UP_WORKERS,
+    batch_size: int = CATCH_UP_BATCH_SIZE,
+):
+    """Create action files for Inbox files that arrived while the watcher was down."""
+    start = time.perf_counter()
+    progress.state = "scanning"
+    progress.started = datetime.now(timezone.utc).isoformat()
+    try:
+        progress.inbox_files, gap = await asyncio.to_thread(scan_inbox_gap, handler)
+        progress.gap = len(gap)
+        progress.state = "running"
+        logger.info("[FS] Catch-up: %d Inbox file(s), %d without an action file", progress.inbox_files, len(gap))
 
+        slots = asyncio.Semaphore(max(1, workers))
 
-async def run_filesystem_watcher_async(vault_path: Path, dry_run: bool = True):
-    """Long-running async task that watches vault/Inbox/ for new files."""
+        async def run_batch(batch: list[ReadyFile]):
+            async with slots:
+                created = await asyncio.to_thread(handler.process_batch, batch, False)
+            progress.processed += len(batch)
+            progress.created += len(created)
+
+        await asyncio.gather(*(run_batch(gap[i:i + batch_size]) for i in range(0, len(gap), batch_size)))
+        await asyncio.to_thread(handler.manifest.save)
+        progress.state = "done"
+    except asyncio.CancelledError:
+        progress.state = "failed"
+        progress.error = "cancelled"
+        raise
+    except Exception as e:
+        logger.exception("[FS] Catch-up failed")
+        progress.state = "failed"
+        progress.error = str(e)
+    finally:
+        progress.finished = datetime.now(timezone.utc).isoformat()
+        progress.duration_ms = round((time.perf_counter() - start) * 1000, 2)
+    if progress.state == "done":
+        logger.info(
+            "[FS] Catch-up done: %d action file(s) for %d file(s) in %.0f ms",
+            progress.created, progress.processed, progress.duration_ms,
+        )
+
+
+@dataclass
+class WatcherStatus:
+    """Live state of the filesystem watcher, for the status endpoint."""
+
+    running: bool = False
+    dry_run: bool = True
+    inbox: str = ""
+    intake: IntakeStats = field(default_factory=IntakeStats)
+    queue: IntakeQueue | None = None
+    catch_up: CatchUpProgress = field(default_factory=CatchUpProgress)
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self.running,
+            "dry_run": self.dry_run,
+            "inbox": self.inbox,
+            "intake": self.intake.snapshot(self.queue),
+            "catch_up": asdict(self.catch_up),
+        }
+
+
+status = WatcherStatus()
+
+
+async def consume_intake(
+    handler: InboxHandler,
+    stats: IntakeStats,
+    check_interval: float = CHECK_INTERVAL,
+    batch_size: int = BATCH_SIZE,
+):
+    """Drain settled Inbox files from the handler's queue in batches until cancelled."""
+    loop = asyncio.get_running_loop()
+    queue = handler.queue
+    wakeup = asyncio.Event()
+    queue.bind(lambda: loop.call_soon_threadsafe(wakeup.set))
+    try:
+        while True:
+            if not len(queue):
+                await wakeup.wait()
+            wakeup.clear()
+            await asyncio.sleep(check_interval)
+
+            while True:
+                ready = await asyncio.to_thread(queue.take_ready, None, batch_size)
+                if not ready:
+                    break
+                start = time.perf_counter()
+                created = await asyncio.to_thread(handler.process_batch, ready)
+                elapsed = time.perf_counter() - start
+                done = time.monotonic()
+                stats.record_batch(len(ready), elapsed, [done - r.first_seen for r in ready])
+                snap = stats.snapshot(queue)
+                logger.info(
+                    "[FS] Intake batch: %d file(s), %d action file(s) in %.1f ms | "
+                    "%.0f files/s | latency p50=%.0f ms p99=%.0f ms | pending=%d",
+                    len(ready), len(created), elapsed * 1000, snap["files_per_second"],
+                    snap["latency_ms"]["p50"], snap["latency_ms"]["p99"], snap["pending"],
+                )
+    finally:
+        queue.bind(None)
+
+
+async def run_filesystem_watcher_async(
+    vault_path: Path,
+    dry_run: bool = True,
+    debounce: float = DEBOUNCE_SECONDS,
+    batch_size: int = BATCH_SIZE,
+    stats: IntakeStats | None = None,
+    catch_up_workers: int = CATCH_UP_WORKERS,
+):
+    """Long-running async task that watches vault/Inbox/ and keeps the vault index current."""
     inbox = vault_path / "Inbox"
     inbox.mkdir(parents=True, exist_ok=True)
 
-    logger.info("[FS] Starting | watching=%s | dry_run=%s", inbox, dry_run)
+    logger.info("[FS] Starting | watching=%s | dry_run=%s | debounce=%.2fs", inbox, dry_run, debounce)
 
-    handler = InboxHandler(vault_path, dry_run=dry_run)
+    manifest = InboxManifest(None if dry_run else vault_path / STATE_DIR / MANIFEST_FILE)
+    handler = InboxHandler(vault_path, dry_run=dry_run, queue=IntakeQueue(debounce), manifest=manifest)
+    stats = stats if stats is not None else IntakeStats()
+    status.running, status.dry_run, status.inbox = True, dry_run, str(inbox)
+    status.intake, status.queue, status.catch_up = stats, handler.queue, CatchUpProgress()
+    metrics.WATCHER_QUEUE_DEPTH.labels("filesystem").set_function(handler.queue.__len__)
+
+    consumer = asyncio.create_task(consume_intake(handler, stats, batch_size=batch_size))
     observer = Observer()
     observer.schedule(handler, str(inbox), recursive=False)
+    index = get_index(vault_path)
+    observer.schedule(VaultIndexHandler(index), str(vault_path), recursive=True)
     observer.start()
+    index.watched = True
+    # Started after the observer so nothing dropped during the scan is missed.
+    catch_up = asyncio.create_task(catch_up_inbox(handler, status.catch_up, workers=catch_up_workers))
 
     try:
-        while True:
-            await asyncio.sleep(1)
+        await consumer
     except asyncio.CancelledError:
         logger.info("[FS] Watcher stopping...")
     finally:
+        for task in (catch_up, consumer):
+            task.cancel()
+        await asyncio.gather(catch_up, consumer, return_exceptions=True)
+        status.running = False
+        metrics.WATCHER_QUEUE_DEPTH.labels("filesystem").set_function(None)
+        index.watched = False
         observer.stop()
         observer.join()
-        logger.info("[FS] Watcher stopped")
+        logger.info("[FS] Watcher stopped | %s", stats.snapshot(handler.queue))
@@ -5,6 +5,14 @@ Runs as a background task inside FastAPI's lifespan.
 Falls back gracefully if credentials.json is missing.
 In DRY_RUN mode, logs what *would* happen without writing files.
 
+Two sync modes (GMAIL_SYNC_MODE):
+- "history" (default): the first poll lists the query once and records the
+  mailbox historyId in <vault>/.state/gmail_sync.json; later polls only read
+  users.history.list deltas since then, so their cost follows new mail, not
+  mailbox size. An expired historyId (404) or a changed query falls back to a
+  full resync.
+- "query": re-list the query every poll (the original behaviour).
+
 Standalone usage:
     python -m watchers.gmail_watcher --setup   # First-time OAuth
     python -m watchers.gmail_watcher            # Start polling (blocking)
@@ -13,20 +21,48 @@ Standalone usage:
 import asyncio
 import json
 import logging
+import os
+import random
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+from app.services import handbook_rules, keyword_matcher, metrics
+from app.services.vault_journal import atomic_write
+from watchers.processed_store import ProcessedStore
+
 logger = logging.getLogger("gmail-watcher")
 
-PRIORITY_KEYWORDS = [
-    "urgent", "asap", "immediately", "emergency",
-    "invoice", "payment", "overdue", "refund",
-    "complaint", "unhappy", "cancel",
-]
+PRIORITY_KEYWORDS = keyword_matcher.PRIORITY_KEYWORDS
 
 SCOPES = ["https://www.googleapis.com/auth/gmail.readonly"]
 
+# Only these headers are requested (format=metadata); the body is never downloaded.
+METADATA_HEADERS = ["From", "Subject", "Date"]
+BATCH_SIZE = 50  # Gmail's recommended maximum per batch request
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 0.5
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+STATE_DIR = ".state"
+SYNC_STATE_FILE = "gmail_sync.json"
+PROCESSED_DB_FILE = "gmail_processed.db"
+
+# Anything supporting `in` and .add(): the ProcessedStore in production, a set in tests.
+ProcessedIds = set[str] | ProcessedStore
+
+# Query terms that are plain label checks, so history deltas can be filtered locally.
+_LABEL_TERMS = {
+    "is:unread": "UNREAD",
+    "is:important": "IMPORTANT",
+    "is:starred": "STARRED",
+    "in:inbox": "INBOX",
+    "in:sent": "SENT",
+    "in:spam": "SPAM",
+    "in:trash": "TRASH",
+}
+
 
 # ── OAuth helpers ────────────────────────────────────────────────────────────
 
@@ -62,9 +98,9 @@ def _get_gmail_service(credentials_path: Path, token_path: Path):
 
 # ── Priority detection ───────────────────────────────────────────────────────
 
-def _detect_priority(text: str) -> str:
-    text_lower = text.lower()
-    return "high" if any(kw in text_lower for kw in PRIORITY_KEYWORDS) else "medium"
+def _detect_priority(text: str, vault_path: Path | None = None) -> str:
+    matcher = handbook_rules.get_rules(vault_path).matcher if vault_path else keyword_matcher.matcher
+    return "high" if matcher.matches(text) else "medium"
 
 
 # ── Action file writer ───────────────────────────────────────────────────────
@@ -84,7 +120,7 @@ def _create_action_file(
         logger.debug("Already exists, skipping: %s", filepath.name)
         return filepath
 
-    priority = _detect_priority(f"{headers.get('Subject', '')} {snippet}")
+    priority = _detect_priority(f"{headers.get('Subject', '')} {snippet}", vault_path)
     timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
     content = f"""---
@@ -113,44 +149,326 @@ labels: {json.dumps(label_ids)}
             filepath.name, headers.get("From"), headers.get("Subject"), priority,
         )
     else:
-        filepath.write_text(content, encoding="utf-8")
+        atomic_write(filepath, content)
         logger.info("Created: %s (priority=%s)", filepath.name, priority)
 
     return filepath
 
 
-# ── Single poll ──────────────────────────────────────────────────────────────
+# ── Batched metadata fetch ───────────────────────────────────────────────────
+
+class PollStats:
+    """Timing and counters for one poll, logged when the poll finishes."""
 
-def _poll_once(service, vault_path: Path, query: str, processed_ids: set, dry_run: bool) -> int:
-    """Poll Gmail once, return count of new messages processed."""
+    __slots__ = ("list_ms", "fetch_ms", "write_ms", "fetched", "written", "batches", "retries", "started")
+
+    def __init__(self):
+        self.list_ms = self.fetch_ms = self.write_ms = 0.0
+        self.fetched = self.written = self.batches = self.retries = 0
+        self.started = time.perf_counter()
+
+    def summary(self) -> str:
+        total_ms = (time.perf_counter() - self.started) * 1000
+        return (
+            f"{self.written} new | fetched {self.fetched} in {self.batches} batch(es), "
+            f"{self.retries} retried | list {self.list_ms:.0f}ms fetch {self.fetch_ms:.0f}ms "
+            f"write {self.write_ms:.0f}ms total {total_ms:.0f}ms"
+        )
+
+
+def _http_status(error: Exception) -> int | None:
+    resp = getattr(error, "resp", None)
+    status = getattr(resp, "status", None) or getattr(error, "status_code", None)
+    return int(status) if status else None
+
+
+def _execute(call: str, request):
+    """Run one Gmail API request, counting it (and its failure) in the metrics."""
+    metrics.GMAIL_API_REQUESTS.labels(call).inc()
     try:
-        result = service.users().messages().list(userId="me", q=query).execute()
-        messages = result.get("messages", [])
-    except Exception as e:
-        logger.error("Gmail API error: %s", e)
-        return 0
+        return request.execute()
+    except Exception:
+        metrics.GMAIL_API_ERRORS.labels(call).inc()
+        raise
+
+
+def _record_poll(mode: str, outcome: str, stats: PollStats):
+    metrics.GMAIL_POLLS.labels(mode, outcome).inc()
+    metrics.GMAIL_POLL_SECONDS.labels(mode).observe(time.perf_counter() - stats.started)
+
+
+def _get_request(service, msg_id: str):
+    return service.users().messages().get(
+        userId="me", id=msg_id, format="metadata", metadataHeaders=METADATA_HEADERS,
+    )
+
 
-    new_count = 0
-    for msg_stub in messages:
-        msg_id = msg_stub["id"]
-        if msg_id in processed_ids:
+def _fetch_chunk(service, chunk: list[str], fetched: dict[str, dict]) -> list[str]:
+    """Fetch one chunk of messages into `fetched`; returns the ids worth retrying."""
+    retry: list[str] = []
+
+    def on_response(request_id: str, response: dict | None, exception: Exception | None):
+        if exception is None:
+            fetched[request_id] = response
+            return
+        metrics.GMAIL_API_ERRORS.labels("messages.get").inc()
+        if _http_status(exception) in RETRYABLE_STATUSES:
+            retry.append(request_id)
+        else:
+            logger.warning("Could not fetch message %s: %s", request_id, exception)
+
+    new_batch = getattr(service, "new_batch_http_request", None)
+    if new_batch is None:
+        # Service without batch support: one request at a time, same retry rules.
+        for msg_id in chunk:
+            metrics.GMAIL_API_REQUESTS.labels("messages.get").inc()
+            try:
+                on_response(msg_id, _get_request(service, msg_id).execute(), None)
+            except Exception as e:
+                on_response(msg_id, None, e)
+        return retry
+
+    batch = new_batch(callback=on_response)
+    for msg_id in chunk:
+        batch.add(_get_request(service, msg_id), request_id=msg_id)
+    metrics.GMAIL_API_REQUESTS.labels("messages.get").inc(len(chunk))
+    try:
+        _execute("batch", batch)
+    except Exception as e:
+        status = _http_status(e)
+        if status is not None and status not in RETRYABLE_STATUSES:
+            raise
+        # The whole batch failed (throttled, 5xx or a dropped connection): retry what is missing.
+        return [m for m in chunk if m not in fetched and m not in retry] + retry
+    return retry
+
+
+def _fetch_messages(service, msg_ids: list[str], stats: PollStats) -> tuple[dict[str, dict], list[str]]:
+    """Fetch headers/snippet/labels for msg_ids with format=metadata.
+
+    Requests go out in batches of BATCH_SIZE; ids that hit 429 or 5xx are retried
+    with jittered exponential backoff, up to MAX_RETRIES rounds. Returns the
+    fetched messages and the ids still failing when the retries ran out.
+    """
+    fetched: dict[str, dict] = {}
+    pending = list(msg_ids)
+    retry: list[str] = []
+    start = time.perf_counter()
+    for attempt in range(MAX_RETRIES + 1):
+        retry: list[str] = []
+        for i in range(0, len(pending), BATCH_SIZE):
+            stats.batches += 1
+            retry.extend(_fetch_chunk(service, pending[i:i + BATCH_SIZE], fetched))
+        if not retry:
+            break
+        if attempt == MAX_RETRIES:
+            logger.warning("[Gmail] Giving up on %d message(s) after %d retries", len(retry), MAX_RETRIES)
+            break
+        stats.retries += len(retry)
+        time.sleep(BACKOFF_SECONDS * 2 ** attempt * (1 + random.random()))
+        pending = retry
+    stats.fetch_ms += (time.perf_counter() - start) * 1000
+    stats.fetched += len(fetched)
+    return fetched, retry
+
+
+def _write_messages(
+    vault_path: Path, msg_ids: list[str], fetched: dict[str, dict], processed_ids: ProcessedIds,
+    dry_run: bool, stats: PollStats, required_labels: set[str] | None = None,
+) -> int:
+    """Write action files for fetched messages, in msg_ids order. Returns count written."""
+    start = time.perf_counter()
+    count = 0
+    for msg_id in msg_ids:
+        msg = fetched.get(msg_id)
+        if msg is None:
+            continue
+        label_ids = msg.get("labelIds", [])
+        if required_labels is not None and not required_labels <= set(label_ids):
             continue
+        headers = {h["name"]: h["value"] for h in msg.get("payload", {}).get("headers", [])}
+        _create_action_file(vault_path, {"id": msg_id}, headers, msg.get("snippet", ""), label_ids, dry_run)
+        processed_ids.add(msg_id)
+        count += 1
+    stats.write_ms += (time.perf_counter() - start) * 1000
+    stats.written += count
+    metrics.WATCHER_EVENTS.labels("gmail").inc(count)
+    return count
+
+
+# ── Single poll ──────────────────────────────────────────────────────────────
 
+def _poll_once(
+    service, vault_path: Path, query: str, processed_ids: ProcessedIds, dry_run: bool,
+    stats: PollStats | None = None,
+) -> int:
+    """Poll Gmail once by re-listing the query ("query" mode), return count of new messages processed."""
+    stats = stats or PollStats()
+    outcome = "error"
+    try:
+        start = time.perf_counter()
         try:
-            msg = service.users().messages().get(userId="me", id=msg_id).execute()
+            new_ids = [m for m in _list_message_ids(service, query) if m not in processed_ids]
         except Exception as e:
-            logger.warning("Could not fetch message %s: %s", msg_id, e)
-            continue
+            logger.error("Gmail API error: %s", e)
+            return 0
+        stats.list_ms += (time.perf_counter() - start) * 1000
 
-        headers = {h["name"]: h["value"] for h in msg.get("payload", {}).get("headers", [])}
-        snippet = msg.get("snippet", "")
-        label_ids = msg.get("labelIds", [])
+        fetched, _ = _fetch_messages(service, new_ids, stats)
+        count = _write_messages(vault_path, new_ids, fetched, processed_ids, dry_run, stats)
+        outcome = "ok"
+        return count
+    finally:
+        _record_poll("query", outcome, stats)
+
+
+# ── Incremental sync (historyId) ─────────────────────────────────────────────
+
+def _state_path(vault_path: Path) -> Path:
+    return vault_path / STATE_DIR / SYNC_STATE_FILE
+
+
+def _load_sync_state(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("[Gmail] Ignoring unreadable sync state %s: %s", path, e)
+        return {}
+
+
+def _save_sync_state(path: Path, state: dict):
+    """Write the sync state atomically (temp file + rename)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _query_labels(query: str) -> set[str] | None:
+    """Labels a message must carry to match `query`, or None if the query is not label-only."""
+    labels: set[str] = set()
+    for term in query.lower().split():
+        if term in _LABEL_TERMS:
+            labels.add(_LABEL_TERMS[term])
+        elif term.startswith("label:") and len(term) > 6:
+            labels.add(term[6:].upper())
+        else:
+            return None
+    return labels
 
-        _create_action_file(vault_path, msg_stub, headers, snippet, label_ids, dry_run)
-        processed_ids.add(msg_id)
-        new_count += 1
 
-    return new_count
+def _is_history_expired(error: Exception) -> bool:
+    """history.list answers 404 when startHistoryId is older than Gmail keeps."""
+    return _http_status(error) == 404
+
+
+def _list_message_ids(service, query: str) -> list[str]:
+    ids: list[str] = []
+    page_token = None
+    while True:
+        kwargs = {"userId": "me", "q": query}
+        if page_token:
+            kwargs["pageToken"] = page_token
+        result = _execute("messages.list", service.users().messages().list(**kwargs))
+        ids.extend(m["id"] for m in result.get("messages", []))
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return ids
+
+
+def _history_message_ids(service, start_history_id: str) -> tuple[list[str], str]:
+    """Ids of messages added (or newly labelled) since start_history_id, and the latest historyId."""
+    ids: list[str] = []
+    seen: set[str] = set()
+    latest = start_history_id
+    page_token = None
+    while True:
+        kwargs = {
+            "userId": "me",
+            "startHistoryId": start_history_id,
+            "historyTypes": ["messageAdded", "labelAdded"],
+        }
+        if page_token:
+            kwargs["pageToken"] = page_token
+        result = _execute("history.list", service.users().history().list(**kwargs))
+        for record in result.get("history", []):
+            for change in record.get("messagesAdded", []) + record.get("labelsAdded", []):
+                msg_id = change["message"]["id"]
+                if msg_id not in seen:
+                    seen.add(msg_id)
+                    ids.append(msg_id)
+        latest = result.get("historyId", latest)
+        page_token = result.get("nextPageToken")
+        if not page_token:
+            return ids, latest
+
+
+def _full_sync(
+    service, vault_path: Path, query: str, state: dict, processed_ids: ProcessedIds, dry_run: bool, stats: PollStats,
+) -> int:
+    start = time.perf_counter()
+    # Take the historyId before listing, so mail arriving mid-listing shows up in the next delta.
+    history_id = _execute("getProfile", service.users().getProfile(userId="me"))["historyId"]
+    new_ids = [m for m in _list_message_ids(service, query) if m not in processed_ids]
+    stats.list_ms += (time.perf_counter() - start) * 1000
+
+    fetched, failed = _fetch_messages(service, new_ids, stats)
+    count = _write_messages(vault_path, new_ids, fetched, processed_ids, dry_run, stats)
+    state.update(history_id=str(history_id), query=query, synced_at=int(time.time()), retry_ids=failed)
+    return count
+
+
+def _incremental_sync(
+    service, vault_path: Path, query: str, state: dict, processed_ids: ProcessedIds, dry_run: bool, stats: PollStats,
+) -> int:
+    start = time.perf_counter()
+    candidates, latest = _history_message_ids(service, state["history_id"])
+    # Messages whose fetch kept failing last time are not in the new delta; retry them too.
+    retry_ids = [m for m in state.get("retry_ids", []) if m not in candidates]
+    candidates = [m for m in retry_ids + candidates if m not in processed_ids]
+
+    required_labels = _query_labels(query)
+    if candidates and required_labels is None:
+        # Arbitrary search syntax cannot be checked locally: ask Gmail which of the
+        # messages since the last sync match (a short list, bounded by new mail).
+        since = state.get("synced_at", 0) - 60
+        matching = set(_list_message_ids(service, f"({query}) after:{since}"))
+        candidates = [m for m in candidates if m in matching]
+    stats.list_ms += (time.perf_counter() - start) * 1000
+
+    fetched, failed = _fetch_messages(service, candidates, stats)
+    count = _write_messages(vault_path, candidates, fetched, processed_ids, dry_run, stats, required_labels)
+    state.update(history_id=str(latest), synced_at=int(time.time()), retry_ids=failed)
+    return count
+
+
+def _sync_once(
+    service, vault_path: Path, query: str, state: dict, processed_ids: ProcessedIds, dry_run: bool,
+    stats: PollStats | None = None,
+) -> int:
+    """One "history" mode poll. Updates `state` in place; returns count of new messages processed."""
+    stats = stats or PollStats()
+    outcome = "error"
+    try:
+        if state.get("history_id") and state.get("query") == query:
+            try:
+                count = _incremental_sync(service, vault_path, query, state, processed_ids, dry_run, stats)
+                outcome = "ok"
+                return count
+            except Exception as e:
+                if not _is_history_expired(e):
+                    raise
+                logger.warning("[Gmail] historyId %s expired — running a full resync", state["history_id"])
+        count = _full_sync(service, vault_path, query, state, processed_ids, dry_run, stats)
+        outcome = "ok"
+        return count
+    except Exception as e:
+        logger.error("Gmail API error: %s", e)
+        return 0
+    finally:
+        _record_poll("history", outcome, stats)
 
 
 # ── Async background task (called from FastAPI lifespan) ─────────────────────
@@ -162,14 +480,17 @@ async def run_gmail_watcher_async(
     poll_interval: int,
     query: str,
     dry_run: bool,
+    sync_mode: str = "history",
+    processed_retention_days: int = 90,
+    processed_capacity: int = 200_000,
 ):
     """Long-running async task that polls Gmail on an interval."""
     if dry_run:
         logger.info("[Gmail] DRY RUN mode — no files will be written")
 
     logger.info(
-        "[Gmail] Starting | vault=%s | interval=%ds | query='%s'",
-        vault_path, poll_interval, query,
+        "[Gmail] Starting | vault=%s | interval=%ds | query='%s' | sync=%s",
+        vault_path, poll_interval, query, sync_mode,
     )
 
     if not vault_path.exists():
@@ -189,22 +510,44 @@ async def run_gmail_watcher_async(
         logger.error("[Gmail] Auth failed: %s — watcher disabled", e)
         return
 
-    processed_ids: set = set()
-
-    while True:
-        try:
-            count = await loop.run_in_executor(
-                None, _poll_once, service, vault_path, query, processed_ids, dry_run,
-            )
-            if count > 0:
-                logger.info("[Gmail] Processed %d new message(s)", count)
-        except asyncio.CancelledError:
-            logger.info("[Gmail] Watcher stopped")
-            return
-        except Exception as e:
-            logger.error("[Gmail] Unexpected error: %s", e)
+    # Dry runs keep the sync state and processed ids in memory only, so a later
+    # real run still fetches everything.
+    state_path = _state_path(vault_path)
+    state = {} if dry_run else _load_sync_state(state_path)
+    processed_ids = await loop.run_in_executor(
+        None, ProcessedStore,
+        None if dry_run else vault_path / STATE_DIR / PROCESSED_DB_FILE,
+        processed_retention_days, processed_capacity,
+    )
 
-        await asyncio.sleep(poll_interval)
+    try:
+        while True:
+            stats = PollStats()
+            try:
+                await loop.run_in_executor(None, processed_ids.prune_if_due)
+                if sync_mode == "history":
+                    count = await loop.run_in_executor(
+                        None, _sync_once, service, vault_path, query, state, processed_ids, dry_run, stats,
+                    )
+                    if not dry_run and state:
+                        await loop.run_in_executor(None, _save_sync_state, state_path, dict(state))
+                else:
+                    count = await loop.run_in_executor(
+                        None, _poll_once, service, vault_path, query, processed_ids, dry_run, stats,
+                    )
+                if count > 0 or stats.retries:
+                    logger.info("[Gmail] Poll: %s", stats.summary())
+                else:
+                    logger.debug("[Gmail] Poll: %s", stats.summary())
+            except asyncio.CancelledError:
+                logger.info("[Gmail] Watcher stopped")
+                return
+            except Exception as e:
+                logger.error("[Gmail] Unexpected error: %s", e)
+
+            await asyncio.sleep(poll_interval)
+    finally:
+        processed_ids.close()
 
 
 # ── Standalone entry point ───────────────────────────────────────────────────
@@ -220,7 +563,6 @@ def _run_oauth_setup(credentials_path: Path, token_path: Path):
 if __name__ == "__main__":
     import argparse
     from dotenv import load_dotenv
-    import os
 
     load_dotenv()
 
@@ -244,4 +586,5 @@ if __name__ == "__main__":
         interval = int(os.getenv("GMAIL_POLL_INTERVAL", "120"))
         query = os.getenv("GMAIL_QUERY", "is:unread is:important")
         dry_run = os.getenv("DRY_RUN", "true").lower() == "true"
-        asyncio.run(run_gmail_watcher_async(vault, creds_path, tok_path, interval, query, dry_run))
+        sync_mode = os.getenv("GMAIL_SYNC_MODE", "history")
+        asyncio.run(run_gmail_watcher_async(vault, creds_path, tok_path, interval, query, dry_run, sync_mode))
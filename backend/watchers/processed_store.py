@@ -0,0 +1,122 @@
+"""
+processed_store.py — Durable, bounded record of Gmail messages already turned into action files.
+
+Ids live in a SQLite table under <vault>/.state/ (or in memory for dry runs),
+so a restart does not re-fetch the whole query result. Membership checks go
+through a fixed-size Bloom filter first: a miss (the common case for new mail)
+never touches the database, and a hit is confirmed with a primary-key lookup.
+Rows older than the retention window are pruned at most once a day, and the
+filter is rebuilt from what remains, so memory stays flat however long the
+watcher runs.
+"""
+
+import hashlib
+import logging
+import math
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+logger = logging.getLogger("gmail-watcher")
+
+PRUNE_INTERVAL_SECONDS = 24 * 3600
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings (double hashing on one blake2b digest)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self._bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def clear(self):
+        self._bits = bytearray(len(self._bits))
+
+
+class ProcessedStore:
+    """Set-like store of processed message ids: `msg_id in store`, `store.add(msg_id)`."""
+
+    def __init__(
+        self,
+        path: Path | None,
+        retention_days: int = 90,
+        capacity: int = 200_000,
+    ):
+        self.path = path
+        self.retention_seconds = retention_days * 86400
+        self._lock = threading.Lock()
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path) if path else ":memory:", check_same_thread=False)
+        if path is not None:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS processed (msg_id TEXT PRIMARY KEY, seen_at INTEGER NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS processed_seen_at ON processed (seen_at)")
+        self._db.commit()
+        self._bloom = BloomFilter(capacity)
+        self._last_prune = 0.0
+        self.prune()
+
+    def __contains__(self, msg_id: str) -> bool:
+        with self._lock:
+            if msg_id not in self._bloom:
+                return False
+            return self._db.execute("SELECT 1 FROM processed WHERE msg_id = ?", (msg_id,)).fetchone() is not None
+
+    def add(self, msg_id: str):
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO processed (msg_id, seen_at) VALUES (?, ?)", (msg_id, int(time.time())),
+            )
+            self._db.commit()
+            self._bloom.add(msg_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM processed").fetchone()[0]
+
+    def prune(self, now: float | None = None) -> int:
+        """Drop ids older than the retention window and rebuild the filter. Returns rows removed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            removed = self._db.execute(
+                "DELETE FROM processed WHERE seen_at < ?", (int(now - self.retention_seconds),),
+            ).rowcount
+            self._db.commit()
+            self._bloom.clear()
+            for (msg_id,) in self._db.execute("SELECT msg_id FROM processed"):
+                self._bloom.add(msg_id)
+            self._last_prune = now
+        if removed:
+            logger.info("[Gmail] Pruned %d processed id(s) older than %d days", removed, self.retention_seconds // 86400)
+        return removed
+
+    def prune_if_due(self, now: float | None = None) -> int:
+        now = time.time() if now is None else now
+        if now - self._last_prune < PRUNE_INTERVAL_SECONDS:
+            return 0
+        return self.prune(now)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -3,6 +3,7 @@
 import { useCallback, useState } from "react";
 import { getDashboard, refreshDashboard } from "@/lib/api";
 import { usePolling } from "@/hooks/usePolling";
+import { applyDashboardEvent } from "@/lib/liveReducers";
 import { StatusCard } from "@/components/StatusCard";
 import { AlertBanner } from "@/components/AlertBanner";
 import { ActivityFeed } from "@/components/ActivityFeed";
@@ -10,7 +11,7 @@ import { SimulateEmailDialog } from "@/components/SimulateEmailDialog";
 
 export default function DashboardPage() {
   const fetcher = useCallback(() => getDashboard(), []);
-  const { data, loading, refresh } = usePolling(fetcher, 5000);
+  const { data, loading, refresh } = usePolling(fetcher, 5000, applyDashboardEvent);
   const [showSimulate, setShowSimulate] = useState(false);
   const [refreshing, setRefreshing] = useState(false);
 
@@ -1,8 +1,9 @@
 "use client";
 
 import { useCallback, useState } from "react";
-import { getNeedsAction, processItem, processAll } from "@/lib/api";
+import { getNeedsAction, processItem, processAllInBackground, waitForJob } from "@/lib/api";
 import { usePolling } from "@/hooks/usePolling";
+import { applyActionItemEvent } from "@/lib/liveReducers";
 import { SimulateEmailDialog } from "@/components/SimulateEmailDialog";
 import type { ActionItem } from "@/lib/types";
 
@@ -15,7 +16,7 @@ const PRIORITY_COLORS: Record<string, string> = {
 
 export default function NeedsActionPage() {
   const fetcher = useCallback(() => getNeedsAction(), []);
-  const { data: items, loading, refresh } = usePolling(fetcher, 5000);
+  const { data: items, loading, refresh } = usePolling(fetcher, 5000, applyActionItemEvent);
   const [processing, setProcessing] = useState<string | null>(null);
   const [processingAll, setProcessingAll] = useState(false);
   const [showSimulate, setShowSimulate] = useState(false);
@@ -33,7 +34,9 @@ export default function NeedsActionPage() {
   async function handleProcessAll() {
     setProcessingAll(true);
     try {
-      await processAll();
+      // Large backlogs can take minutes; run as a job instead of holding the request open.
+      const job = await processAllInBackground();
+      await waitForJob(job);
       refresh();
     } finally {
       setProcessingAll(false);
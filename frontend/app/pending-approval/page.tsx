@@ -3,6 +3,7 @@
 import { useCallback, useState } from "react";
 import { getApprovals, approveItem, rejectItem } from "@/lib/api";
 import { usePolling } from "@/hooks/usePolling";
+import { applyApprovalEvent } from "@/lib/liveReducers";
 import type { Approval } from "@/lib/types";
 
 const PRIORITY_COLORS: Record<string, string> = {
@@ -14,7 +15,7 @@ const PRIORITY_COLORS: Record<string, string> = {
 
 export default function PendingApprovalPage() {
   const fetcher = useCallback(() => getApprovals(), []);
-  const { data: approvals, loading, refresh } = usePolling(fetcher, 5000);
+  const { data: approvals, loading, refresh } = usePolling(fetcher, 5000, applyApprovalEvent);
   const [acting, setActing] = useState<string | null>(null);
 
   async function handleApprove(approval: Approval) {
@@ -1,18 +1,27 @@
 "use client";
 import { useEffect, useRef, useCallback, useState } from "react";
+import { subscribeEvents } from "@/lib/events";
+import type { EventReducer } from "@/lib/types";
+
+// While the event stream is connected, polling only runs as a slow safety net.
+const LIVE_FALLBACK_MS = 60000;
 
 export function usePolling<T>(
   fetcher: () => Promise<T>,
-  intervalMs = 5000
+  intervalMs = 5000,
+  reducer?: EventReducer<T>
 ): { data: T | null; loading: boolean; error: string | null; refresh: () => void } {
   const [data, setData] = useState<T | null>(null);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
+  const [live, setLive] = useState(false);
   const timer = useRef<ReturnType<typeof setInterval> | null>(null);
+  const current = useRef<T | null>(null);
 
   const load = useCallback(async () => {
     try {
       const result = await fetcher();
+      current.current = result;
       setData(result);
       setError(null);
     } catch (e: unknown) {
@@ -22,13 +31,31 @@ export function usePolling<T>(
     }
   }, [fetcher]);
 
+  useEffect(() => {
+    if (!reducer) return;
+    return subscribeEvents((type, payload) => {
+      if (type === "resync") {
+        load();
+        return;
+      }
+      if (current.current === null) return;
+      const next = reducer(current.current, type, payload);
+      if (next === null) {
+        load();
+      } else if (next !== current.current) {
+        current.current = next;
+        setData(next);
+      }
+    }, setLive);
+  }, [reducer, load]);
+
   useEffect(() => {
     load();
-    timer.current = setInterval(load, intervalMs);
+    timer.current = setInterval(load, live ? Math.max(intervalMs, LIVE_FALLBACK_MS) : intervalMs);
     return () => {
       if (timer.current) clearInterval(timer.current);
     };
-  }, [load, intervalMs]);
+  }, [load, intervalMs, live]);
 
   return { data, loading, error, refresh: load };
 }
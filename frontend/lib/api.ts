@@ -1,15 +1,50 @@
 import type {
+  ArchiveResult,
+  ArchiveStatus,
   VaultStatus,
   ActionItem,
+  BulkSimulationResult,
   ProcessResult,
   Approval,
   DashboardMetrics,
   HandbookData,
+  HandbookRules,
+  Job,
+  ListQuery,
+  MetadataStoreStatus,
+  Page,
+  SearchQuery,
+  SearchResult,
+  SearchStats,
+  WatchersStatus,
 } from "./types";
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
+// Last ETag and parsed body per GET URL. Read endpoints answer a matching
+// If-None-Match with an empty 304, so polling an unchanged resource reuses
+// the body we already have instead of downloading and parsing it again.
+type Validated = { etag: string; body: unknown; nextCursor: string | null };
+const validated = new Map<string, Validated>();
+
+async function fetchValidated(url: string): Promise<Omit<Validated, "etag">> {
+  const cached = validated.get(url);
+  const res = await fetch(url, cached ? { headers: { "If-None-Match": cached.etag } } : undefined);
+  if (res.status === 304 && cached) return cached;
+  if (!res.ok) {
+    const error = await res.text();
+    throw new Error(error || res.statusText);
+  }
+  const body = await res.json();
+  const nextCursor = res.headers.get("X-Next-Cursor");
+  const etag = res.headers.get("ETag");
+  if (etag) validated.set(url, { etag, body, nextCursor });
+  else validated.delete(url);
+  return { body, nextCursor };
+}
+
 async function fetchAPI<T>(path: string, options?: RequestInit): Promise<T> {
+  if (!options) return (await fetchValidated(`${API_BASE}${path}`)).body as T;
   const res = await fetch(`${API_BASE}${path}`, {
     headers: { "Content-Type": "application/json" },
     ...options,
@@ -21,6 +56,16 @@ async function fetchAPI<T>(path: string, options?: RequestInit): Promise<T> {
   return res.json();
 }
 
+async function fetchPage<T>(path: string, query: ListQuery = {}): Promise<Page<T>> {
+  const params = new URLSearchParams();
+  for (const [key, value] of Object.entries(query)) {
+    if (value !== undefined && value !== "") params.set(key, String(value));
+  }
+  const qs = params.toString();
+  const { body, nextCursor } = await fetchValidated(`${API_BASE}${path}${qs ? `?${qs}` : ""}`);
+  return { items: body as T[], nextCursor };
+}
+
 // Health
 export const checkHealth = () => fetchAPI<{ status: string }>("/api/health");
 
@@ -31,10 +76,25 @@ export const initVault = (owner: string, business: string) =>
     method: "POST",
     body: JSON.stringify({ owner, business }),
   });
+export const getMetadataStoreStatus = () => fetchAPI<MetadataStoreStatus>("/api/vault/metadata");
+export const rebuildMetadataStore = () =>
+  fetchAPI<{ message: string }>("/api/vault/metadata/rebuild", { method: "POST" });
+export const getArchiveStatus = () => fetchAPI<ArchiveStatus>("/api/vault/archive");
+export const archiveOldItems = (olderThanDays?: number) =>
+  fetchAPI<ArchiveResult>(
+    `/api/vault/archive${olderThanDays ? `?older_than_days=${olderThanDays}` : ""}`,
+    { method: "POST" }
+  );
+export const getArchivedItem = (folder: string, filename: string, month?: string) =>
+  fetchAPI<{ folder: string; month: string; filename: string; content: string }>(
+    `/api/vault/archive/${folder}/${month ? `${month}/` : ""}${encodeURIComponent(filename)}`
+  );
 
 // Needs Action
 export const getNeedsAction = () =>
   fetchAPI<ActionItem[]>("/api/needs-action");
+export const getNeedsActionPage = (query?: ListQuery) =>
+  fetchPage<ActionItem>("/api/needs-action", query);
 export const processItem = (filename: string) =>
   fetchAPI<{ action: string }>("/api/needs-action/process", {
     method: "POST",
@@ -44,9 +104,15 @@ export const processAll = () =>
   fetchAPI<ProcessResult>("/api/needs-action/process-all", {
     method: "POST",
   });
+export const processAllInBackground = () =>
+  fetchAPI<Job<ProcessResult>>("/api/needs-action/process-all?background=true", {
+    method: "POST",
+  });
 
 // Approvals
 export const getApprovals = () => fetchAPI<Approval[]>("/api/approvals");
+export const getApprovalsPage = (query?: ListQuery) =>
+  fetchPage<Approval>("/api/approvals", query);
 export const approveItem = (id: string) =>
   fetchAPI<{ message: string }>(`/api/approvals/${id}/approve`, {
     method: "POST",
@@ -71,6 +137,7 @@ export const updateHandbook = (content: string) =>
   });
 export const validateHandbook = () =>
   fetchAPI<HandbookData>("/api/handbook/validate", { method: "POST" });
+export const getHandbookRules = () => fetchAPI<HandbookRules>("/api/handbook/rules");
 
 // Simulate
 export const simulateEmail = (data: {
@@ -89,3 +156,47 @@ export const simulateBatch = (count = 5) =>
     "/api/simulate/batch",
     { method: "POST", body: JSON.stringify({ count }) }
   );
+export const simulateBatchInBackground = (count = 5) =>
+  fetchAPI<Job<{ message: string; count: number; files: string[] }>>(
+    "/api/simulate/batch?background=true",
+    { method: "POST", body: JSON.stringify({ count }) }
+  );
+export const simulateBulk = (count: number, options: { seed?: number } = {}) =>
+  fetchAPI<BulkSimulationResult>("/api/simulate/batch", {
+    method: "POST",
+    body: JSON.stringify({ count, bulk: true, ...options }),
+  });
+
+// Search
+export const search = (query: SearchQuery) => {
+  const params = new URLSearchParams();
+  for (const [key, value] of Object.entries(query)) {
+    if (value !== undefined && value !== "") params.set(key, String(value));
+  }
+  return fetchAPI<SearchResult>(`/api/search?${params}`);
+};
+export const getSearchStats = () => fetchAPI<SearchStats>("/api/search/stats");
+
+// Watchers
+export const getWatchersStatus = () => fetchAPI<WatchersStatus>("/api/watchers/status");
+
+// Jobs
+export const getJobs = () => fetchAPI<Job[]>("/api/jobs");
+export const getJob = <R = unknown>(id: string) => fetchAPI<Job<R>>(`/api/jobs/${id}`);
+export const cancelJob = (id: string) =>
+  fetchAPI<Job>(`/api/jobs/${id}/cancel`, { method: "POST" });
+
+/** Poll a background job until it finishes, reporting progress along the way. */
+export async function waitForJob<R>(
+  job: Job<R>,
+  onProgress?: (job: Job<R>) => void,
+  intervalMs = 500
+): Promise<Job<R>> {
+  let current = job;
+  while (current.status === "queued" || current.status === "running") {
+    onProgress?.(current);
+    await new Promise((resolve) => setTimeout(resolve, intervalMs));
+    current = await getJob<R>(job.id);
+  }
+  return current;
+}
@@ -0,0 +1,53 @@
+import type { VaultEventType } from "./types";
+
+const API_BASE = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+
+type Handler = (type: VaultEventType, data: unknown) => void;
+
+const EVENT_TYPES: VaultEventType[] = [
+  "item_created",
+  "item_removed",
+  "item_processed",
+  "approval_created",
+  "approval_removed",
+  "approval_approved",
+  "approval_rejected",
+  "dashboard",
+  "resync",
+];
+
+// One EventSource per tab, shared by every page/hook that subscribes.
+let source: EventSource | null = null;
+const handlers = new Set<Handler>();
+const statusListeners = new Set<(connected: boolean) => void>();
+
+function open() {
+  source = new EventSource(`${API_BASE}/api/events`);
+  source.onopen = () => statusListeners.forEach((l) => l(true));
+  source.onerror = () => statusListeners.forEach((l) => l(false));
+  for (const type of EVENT_TYPES) {
+    source.addEventListener(type, (e) => {
+      const data = JSON.parse((e as MessageEvent).data);
+      handlers.forEach((h) => h(type, data));
+    });
+  }
+}
+
+export function subscribeEvents(
+  handler: Handler,
+  onStatus?: (connected: boolean) => void
+): () => void {
+  handlers.add(handler);
+  if (onStatus) statusListeners.add(onStatus);
+  if (!source && typeof EventSource !== "undefined") open();
+  if (onStatus && source?.readyState === EventSource.OPEN) onStatus(true);
+
+  return () => {
+    handlers.delete(handler);
+    if (onStatus) statusListeners.delete(onStatus);
+    if (handlers.size === 0 && source) {
+      source.close();
+      source = null;
+    }
+  };
+}
@@ -0,0 +1,43 @@
+import type { ActionItem, Approval, DashboardMetrics, EventReducer } from "./types";
+
+const PRIORITY_ORDER: Record<string, number> = { high: 0, medium: 1, normal: 2, low: 3 };
+
+function byPriority(a: ActionItem, b: ActionItem) {
+  return (
+    (PRIORITY_ORDER[a.priority] ?? 99) - (PRIORITY_ORDER[b.priority] ?? 99) ||
+    a.filename.localeCompare(b.filename)
+  );
+}
+
+type Removed = { filename: string };
+
+export const applyActionItemEvent: EventReducer<ActionItem[]> = (items, type, payload) => {
+  switch (type) {
+    case "item_created": {
+      const item = payload as ActionItem;
+      return [...items.filter((i) => i.filename !== item.filename), item].sort(byPriority);
+    }
+    case "item_removed":
+      return items.filter((i) => i.filename !== (payload as Removed).filename);
+    default:
+      return items;
+  }
+};
+
+export const applyApprovalEvent: EventReducer<Approval[]> = (approvals, type, payload) => {
+  switch (type) {
+    case "approval_created": {
+      const approval = payload as Approval;
+      return [...approvals.filter((a) => a.filename !== approval.filename), approval].sort((a, b) =>
+        a.filename.localeCompare(b.filename)
+      );
+    }
+    case "approval_removed":
+      return approvals.filter((a) => a.filename !== (payload as Removed).filename);
+    default:
+      return approvals;
+  }
+};
+
+export const applyDashboardEvent: EventReducer<DashboardMetrics> = (metrics, type, payload) =>
+  type === "dashboard" ? { ...metrics, ...(payload as Partial<DashboardMetrics>) } : metrics;
@@ -1,6 +1,7 @@
 export interface FolderStatus {
   name: string;
   count: number;
+  archived: number;
 }
 
 export interface CoreFileStatus {
@@ -14,6 +15,35 @@ export interface VaultStatus {
   core_files: CoreFileStatus[];
 }
 
+export interface MetadataStoreStatus {
+  enabled: boolean;
+  path: string;
+  journal_mode: string | null;
+  items: number;
+  folders: Record<string, number>;
+}
+
+export interface ArchivePack {
+  folder: string;
+  month: string;
+  items: number;
+  bytes: number;
+}
+
+export interface ArchiveStatus {
+  after_days: number;
+  items: number;
+  bytes: number;
+  packs: ArchivePack[];
+}
+
+export interface ArchiveResult {
+  message: string;
+  archived: number;
+  packs: number;
+  duration_ms: number;
+}
+
 export interface ActionItem {
   id: string;
   filename: string;
@@ -29,6 +59,63 @@ export interface ActionItem {
 export interface ProcessResult {
   processed: number;
   actions: string[];
+  failed: number;
+  mode: "serial" | "thread" | "process";
+  workers: number;
+  duration_ms: number;
+  items_per_second: number;
+}
+
+export interface BulkSimulationResult {
+  message: string;
+  count: number;
+  skipped: number;
+  files: string[];
+  seed: number;
+  duration_ms: number;
+  items_per_second: number;
+}
+
+export type JobStatus = "queued" | "running" | "succeeded" | "failed" | "cancelled";
+
+export interface Job<R = unknown> {
+  id: string;
+  kind: string;
+  status: JobStatus;
+  progress: { done: number; total: number; failed: number };
+  created: string;
+  started: string | null;
+  finished: string | null;
+  result: R | null;
+  error: string | null;
+}
+
+export interface WatchersStatus {
+  filesystem: {
+    running: boolean;
+    dry_run: boolean;
+    inbox: string;
+    intake: {
+      files: number;
+      batches: number;
+      files_per_second: number;
+      latency_ms: { p50: number; p95: number; p99: number; max: number };
+      events: number;
+      coalesced: number;
+      pending: number;
+    };
+    catch_up: {
+      state: "idle" | "scanning" | "running" | "done" | "failed";
+      inbox_files: number;
+      gap: number;
+      processed: number;
+      created: number;
+      started: string | null;
+      finished: string | null;
+      duration_ms: number;
+      error: string | null;
+    };
+  };
 }
 
 export interface Approval {
@@ -67,3 +154,79 @@ export interface HandbookData {
   validation: SectionValidation[];
   is_complete: boolean;
 }
+
+export interface HandbookRules {
+  source: "handbook" | "defaults";
+  approval_thresholds: { type: string; amount: number; inclusive: boolean }[];
+  keyword_categories: Record<string, string[]>;
+}
+
+export type VaultEventType =
+  | "item_created"
+  | "item_removed"
+  | "item_processed"
+  | "approval_created"
+  | "approval_removed"
+  | "approval_approved"
+  | "approval_rejected"
+  | "dashboard"
+  | "resync";
+
+// Applies a pushed event to the current data. Return the new data, the same
+// object if the event is irrelevant, or null to force a full refetch.
+export type EventReducer<T> = (data: T, type: VaultEventType, payload: unknown) => T | null;
+
+export interface ListQuery {
+  limit?: number;
+  cursor?: string;
+  priority?: string;
+  type?: string;
+  sender?: string;
+  since?: string;
+  fields?: string;
+}
+
+export interface Page<T> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export interface SearchQuery {
+  q: string;
+  folder?: string;
+  type?: string;
+  since?: string;
+  until?: string;
+  limit?: number;
+}
+
+export interface SearchHit {
+  folder: string;
+  filename: string;
+  id: string;
+  type: string;
+  subject: string;
+  sender: string;
+  date: string;
+  score: number;
+  snippet: string;
+  archived: boolean;
+  month: string | null;
+}
+
+export interface SearchResult {
+  query: string;
+  total: number;
+  hits: SearchHit[];
+  took_ms: number;
+}
+
+export interface SearchStats {
+  enabled: boolean;
+  documents: number;
+  segments: number;
+  live_documents: number;
+  deleted: number;
+  pending: number;
+  size_bytes: number;
+}